@@ -0,0 +1,218 @@
+import json
+import mmap
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+from chart import Chart
+
+MAGIC = b'ATLAS\x00\x00\x01'
+ALIGNMENT = 8
+ATTRIBUTES = ('coast', 'shore', 'terrain') # island attributes with a few distinct values, stored as one byte per island
+MEASURES = ('latitude', 'longitude', 'area') # island attributes stored as doubles
+
+def save_map(map: Dict, path: str) -> None:
+    '''
+    Writes a map to a binary atlas file that Atlas can open without parsing it.
+
+    The file is MAGIC, the length of a JSON header as 8 bytes, the header, and then every section, each starting on a multiple of 8 bytes.
+    The header gives the byte order, the number of islands with attributes, the values of every categorical attribute,
+    and the (offset, typecode, length) of every section. The sections are:
+        names_bytes, name_offsets: the island names, in Chart id order, as UTF-8 and where each one starts
+        offsets, targets, weights: the routes in compressed sparse row form, exactly as Chart builds them
+        latitude, longitude, area: the measures of every island on the map
+        coast, shore, terrain: the index of every island's attribute in the header's list of values
+
+    Parameters:
+        map (Map): The map (a graph), including all known islands and routes, like map.json
+        path (str): where to write the atlas
+    '''
+
+    from array import array
+
+    chart = Chart(map)
+    islands = list(map['islands'].values())
+
+    encoded = [name.encode('utf-8') for name in chart.names]
+    name_offsets = array('q', [0])
+    for name in encoded:
+        name_offsets.append(name_offsets[-1] + len(name))
+
+    sections = {
+        'names_bytes': array('B', b''.join(encoded)),
+        'name_offsets': name_offsets,
+        'offsets': array('q', chart.offsets),
+        'targets': array('q', chart.targets),
+        'weights': array('d', chart.weights),
+    }
+    for measure in MEASURES:
+        sections[measure] = array('d', [island[measure] for island in islands])
+
+    values = {}
+    for attribute in ATTRIBUTES:
+        values[attribute] = sorted({island[attribute] for island in islands})
+        if len(values[attribute]) > 256:
+            raise ValueError(f'an atlas can hold at most 256 values of {attribute}')
+        codes = {value: i for i, value in enumerate(values[attribute])}
+        sections[attribute] = array('B', [codes[island[attribute]] for island in islands])
+
+    # lay the sections out after the header, each on a multiple of ALIGNMENT
+    def layout(start: int) -> Dict[str, list]:
+        table, position = {}, start
+        for name, data in sections.items():
+            position += -position % ALIGNMENT
+            table[name] = [position, data.typecode, len(data)]
+            position += len(data) * data.itemsize
+        return table
+
+    # the header's own length moves the sections, so lay them out until the header stops growing
+    header, length = b'', -1
+    while len(header) != length:
+        length = len(header)
+        start = len(MAGIC) + 8 + length
+        header = json.dumps({'byteorder': sys.byteorder, 'islands': len(islands), 'values': values,
+                             'sections': layout(start + -start % ALIGNMENT)}).encode('utf-8')
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for name, (offset, _, _) in json.loads(header)['sections'].items():
+            f.write(b'\x00' * (offset - f.tell()))
+            sections[name].tofile(f)
+
+class Atlas(Mapping):
+    def __init__(self, path: str) -> None:
+        '''
+        Open a binary atlas file written by save_map. The file is memory-mapped rather than read, so opening it takes about
+        as long as decoding the island names, and every process that opens the same file shares one copy of it in memory.
+
+        An atlas can be used wherever a map is, e.g. Captain(atlas) or Hunch(atlas): atlas['islands'] and atlas['routes']
+        look up islands and routes in the file as they are asked for. The routes can't be changed; use to_map for a map that can.
+
+        Parameters:
+            path (str): the atlas file
+        '''
+
+        self.path = path
+        with open(path, 'rb') as f:
+            self.file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self.file)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f'{path} is not an atlas file')
+        length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], 'little')
+        header = json.loads(bytes(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + length]))
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f'{path} was written on a {header["byteorder"]}-endian machine')
+
+        # every section is a view straight into the file
+        self.sections = {}
+        for name, (offset, typecode, count) in header['sections'].items():
+            size = memoryview(b'').cast(typecode).itemsize
+            self.sections[name] = buffer[offset:offset + count * size].cast(typecode)
+
+        self.count = header['islands'] # the number of islands with attributes
+        self.values = header['values']
+
+        # decode every name at once and cut them apart at their offsets
+        text = bytes(self.sections['names_bytes'])
+        ends = self.sections['name_offsets']
+        self.names: List[str] = [text[ends[i]:ends[i + 1]].decode('utf-8') for i in range(len(ends) - 1)]
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+        self.views = {'islands': Islands(self), 'routes': Routes(self)}
+        self.compiled = None
+
+    def __reduce__(self):
+        # other processes open the same file instead of being sent a copy of it
+        return Atlas, (self.path,)
+
+    def __getitem__(self, key: str) -> Mapping:
+        return self.views[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.views)
+
+    def __len__(self) -> int:
+        return len(self.views)
+
+    def chart(self) -> Chart:
+        '''
+        Provides the chart of the atlas, whose routes are read straight from the file
+
+        Parameters:
+            self
+
+        Returns:
+            Chart: the same chart Chart(map) builds from the map the atlas was written from
+        '''
+
+        if self.compiled is None:
+            chart = Chart.__new__(Chart)
+            chart.names, chart.ids = self.names, self.ids
+            chart.offsets, chart.targets, chart.weights = self.sections['offsets'], self.sections['targets'], self.sections['weights']
+            chart.reversed = None
+            self.compiled = chart
+        return self.compiled
+
+    def to_map(self) -> Dict:
+        '''
+        Builds an ordinary map from the atlas, e.g. to change its routes
+
+        Parameters:
+            self
+
+        Returns:
+            Map: the map, with 'islands' and 'routes' like map.json
+        '''
+
+        return {'islands': dict(self['islands']), 'routes': dict(self['routes'])}
+
+class Islands(Mapping):
+    def __init__(self, atlas: Atlas) -> None:
+        self.atlas = atlas
+
+    def __getitem__(self, name: str) -> Dict:
+        i = self.atlas.ids[name]
+        if i >= self.atlas.count:
+            raise KeyError(name)
+
+        sections = self.atlas.sections
+        island = {measure: sections[measure][i] for measure in MEASURES}
+        island.update((attribute, self.atlas.values[attribute][sections[attribute][i]]) for attribute in ATTRIBUTES)
+        return island
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.atlas.names[:self.atlas.count])
+
+    def __len__(self) -> int:
+        return self.atlas.count
+
+class Routes(Mapping):
+    def __init__(self, atlas: Atlas) -> None:
+        self.atlas = atlas
+
+    def __getitem__(self, name: str) -> Dict[str, float]:
+        names = self.atlas.names
+        return {names[j]: travel_cost for j, travel_cost in self.atlas.chart().routes(self.atlas.ids[name])}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.atlas.names)
+
+    def __len__(self) -> int:
+        return len(self.atlas.names)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert a JSON map like map.json into a binary atlas.')
+    parser.add_argument('source', help='the JSON map')
+    parser.add_argument('destination', help='where to write the atlas')
+    args = parser.parse_args(argv)
+
+    with open(args.source, 'r') as f:
+        save_map(json.load(f), args.destination)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
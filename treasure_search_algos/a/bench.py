@@ -0,0 +1,227 @@
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+from hunch import Hunch
+from captain import Captain
+
+COASTS = ('calm', 'choppy', 'reef')
+SHORES = ('port', 'sandy', 'marshy', 'cliff', 'rocky')
+TERRAINS = ('savanna', 'desert', 'jungle', 'swamp', 'moutain', 'volcano') # spelled the same as in map.json
+
+# every search method and how to call it for one (start, goal) query
+METHODS: Dict[str, Callable] = {
+    'uniform_cost_search': lambda captain, hunch, start, goal: captain.uniform_cost_search(start, goal),
+    'greedy_best_first_search': lambda captain, hunch, start, goal: captain.greedy_best_first_search(start, goal, hunch),
+    'a_star_search': lambda captain, hunch, start, goal: captain.a_star_search(start, goal, hunch, 1),
+    'bidirectional_search': lambda captain, hunch, start, goal: captain.bidirectional_search(start, goal, hunch),
+    'ida_star_search': lambda captain, hunch, start, goal: captain.ida_star_search(start, goal, hunch, 1),
+    'sma_star_search': lambda captain, hunch, start, goal: captain.sma_star_search(start, goal, hunch, 1),
+}
+
+def synthetic_map(islands: int, degree: int = 12, seed: int = 0) -> Dict:
+    '''
+    Generates a random map shaped like map.json: islands scattered over the same stretch of sea, with the same
+    kinds of coast, shore and terrain, and routes to nearby islands that cost roughly 3000 per unit of distance.
+    The same arguments always give the same map.
+
+    Parameters:
+        islands (int): the number of islands
+        degree (int): the number of routes leaving every island
+        seed (int): the seed of the random number generator
+
+    Returns:
+        Map: the map, with 'islands' and 'routes' like map.json
+    '''
+
+    rng = random.Random(seed)
+    lat_range, lon_range = (0.0, 20.0), (-80.0, -60.0)
+
+    names = [f'Isle{i}' for i in range(islands)]
+    positions = [(rng.uniform(*lat_range), rng.uniform(*lon_range)) for _ in range(islands)]
+
+    map = {'islands': {}, 'routes': {}}
+    for name, (lat, lon) in zip(names, positions):
+        map['islands'][name] = {
+            'latitude': round(lat, 4),
+            'longitude': round(lon, 4),
+            'area': round(rng.uniform(1, 100), 2),
+            'coast': rng.choice(COASTS),
+            'shore': rng.choice(SHORES),
+            'terrain': rng.choice(TERRAINS),
+        }
+
+    # bucket the islands into a grid with about 2 * degree islands per cell, so that neighbors are found near each island
+    cells = max(1, int(math.sqrt(islands / (2 * degree))))
+    size = (lat_range[1] - lat_range[0]) / cells, (lon_range[1] - lon_range[0]) / cells
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for i, (lat, lon) in enumerate(positions):
+        cell = (min(int((lat - lat_range[0]) / size[0]), cells - 1), min(int((lon - lon_range[0]) / size[1]), cells - 1))
+        grid.setdefault(cell, []).append(i)
+
+    for cell, members in grid.items():
+        # candidate destinations are the islands in this cell and the 8 around it
+        nearby = [j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in grid.get((cell[0] + dx, cell[1] + dy), ())]
+
+        for i in members:
+            lat, lon = positions[i]
+            choices = rng.sample(nearby, min(degree + 1, len(nearby)))
+            routes = map['routes'][names[i]] = {}
+            for j in choices:
+                if j != i and len(routes) < degree:
+                    dist = math.hypot(positions[j][0] - lat, positions[j][1] - lon)
+                    routes[names[j]] = max(1, int(dist * rng.uniform(1200, 6000)))
+
+    return map
+
+def percentile(values: List[float], q: float) -> float:
+    '''
+    Returns the q-th percentile of the values, interpolating between the closest two
+
+    Parameters:
+        values (List[float]): the values, in any order
+        q (float): the percentile, from 0 to 100
+
+    Returns:
+        float: the percentile
+    '''
+
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    lo = int(position)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (position - lo)
+
+def measure(run: Callable[[object], object], queries: List) -> Dict[str, float]:
+    '''
+    Times a search over a batch of queries, then runs the first query again under tracemalloc for its peak memory
+
+    Parameters:
+        run (Callable): runs the search for one query
+        queries (List): the queries
+
+    Returns:
+        dict: throughput in queries per second, latency percentiles in milliseconds, and peak memory in bytes
+    '''
+
+    latencies = []
+    for query in queries:
+        begin = time.perf_counter()
+        run(query)
+        latencies.append((time.perf_counter() - begin) * 1000)
+    total = sum(latencies) / 1000
+
+    # tracemalloc slows the search down, so memory is measured apart from the timed runs
+    tracemalloc.start()
+    run(queries[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'queries': len(queries),
+        'throughput': len(queries) / total if total else float('inf'),
+        'p50_ms': percentile(latencies, 50),
+        'p90_ms': percentile(latencies, 90),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies),
+        'peak_bytes': peak,
+    }
+
+def sum_latency(result: Dict[str, float]) -> float:
+    # the total time of a measured batch of queries
+    return result['queries'] / result['throughput']
+
+def environment() -> Dict[str, Optional[str]]:
+    '''
+    Describes where the benchmark ran, so that results from different versions can be told apart
+
+    Returns:
+        dict: the git commit (if any), Python version, platform and time
+    '''
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    '''
+    Finds benchmarks whose median latency got worse than the baseline by more than the tolerance
+
+    Parameters:
+        results (List[Dict]): the results of this run
+        baseline (List[Dict]): the results of an earlier run
+        tolerance (float): the allowed slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        List[str]: a description of every regression
+    '''
+
+    before = {(r['method'], r['size']): r for r in baseline}
+    regressions = []
+
+    for r in results:
+        old = before.get((r['method'], r['size']))
+        if old is not None and r['p50_ms'] > old['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{r['method']} at {r['size']}: p50 {old['p50_ms']:.3f} ms -> {r['p50_ms']:.3f} ms")
+
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the Captain search methods on synthetic maps.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help='numbers of islands, up to 10**6')
+    parser.add_argument('--degree', type=int, default=12, help='routes leaving every island')
+    parser.add_argument('--queries', type=int, default=50, help='random (start, goal) queries per method and size')
+    parser.add_argument('--methods', nargs='+', default=list(METHODS), choices=list(METHODS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results.json', help='where to write the results as JSON')
+    parser.add_argument('--baseline', help='results of an earlier run to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown against the baseline')
+    parser.add_argument('--reference', action='store_true', help='also time every method with Captain(fast=False), and report the speedup')
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        map = synthetic_map(size, args.degree, args.seed)
+        captain, hunch = Captain(map), Hunch(map)
+        reference = Captain(map, fast=False)
+
+        rng = random.Random(args.seed)
+        names = list(map['islands'])
+        queries = [(rng.choice(names), rng.choice(names)) for _ in range(args.queries)]
+
+        for method in args.methods:
+            search = METHODS[method]
+            result = measure(lambda query: search(captain, hunch, *query), queries)
+            result.update(method=method, size=size)
+            results.append(result)
+            print(f"{method:26} {size:>8} islands  {result['throughput']:10.1f} q/s  p50 {result['p50_ms']:9.3f} ms  "
+                  f"p99 {result['p99_ms']:9.3f} ms  peak {result['peak_bytes'] / 1e6:8.2f} MB")
+
+            if args.reference:
+                slow = measure(lambda query: search(reference, hunch, *query), queries)
+                result.update(reference_p50_ms=slow['p50_ms'], speedup=sum_latency(slow) / sum_latency(result))
+                print(f"{'':26} {'':>8}  fast=False  {slow['throughput']:10.1f} q/s  p50 {slow['p50_ms']:9.3f} ms  speedup {result['speedup']:.2f}x")
+
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'seed': args.seed, 'degree': args.degree, 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for regression in regressions:
+            print('regression:', regression)
+        return 1 if regressions else 0
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
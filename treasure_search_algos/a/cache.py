@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+class RouteCache:
+    def __init__(self, size: int = 1024) -> None:
+        '''
+        Initialize a bounded cache of search results that evicts the least recently used result when full.
+
+        Parameters:
+            size (int): The maximum number of results to keep.
+        '''
+
+        self.size = size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def get(self, key: Hashable, search: Callable[[], tuple]) -> tuple:
+        '''
+        Return the cached result for a key, or run the search and cache its result
+
+        Parameters:
+            self
+            key (Hashable): identifies the search, e.g. (algorithm, start, goal, stubbornness, hunch)
+            search (Callable[[], tuple]): runs the search if the result isn't cached
+
+        Returns:
+            tuple[list[str], int, int]: the path, its cost, and the number of islands visited
+        '''
+
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            path, cost, expanded = self.results[key]
+        else:
+            self.misses += 1
+            path, cost, expanded = search()
+            self.results[key] = (path, cost, expanded)
+            if len(self.results) > self.size:
+                self.results.popitem(last=False)
+
+        # hand out a copy of the path so that callers can't change the cached one
+        return list(path), cost, expanded
+
+    def clear(self) -> None:
+        '''
+        Drop every cached result, e.g. after the routes of the map have changed
+
+        Parameters:
+            self
+        '''
+
+        self.results.clear()
+
+    def stats(self) -> Dict[str, float]:
+        '''
+        Return the hit and miss counters of the cache
+
+        Parameters:
+            self
+
+        Returns:
+            dict: the hits, misses, hit rate and number of cached results
+        '''
+
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0, 'size': len(self.results)}
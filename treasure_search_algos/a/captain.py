@@ -1,16 +1,204 @@
-from typing import Dict, List
+import asyncio
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from hunch import Hunch
+from frontier import HeapFrontier
+from chart import Chart
+from atlas import Atlas
+from landmarks import Landmarks
+from cache import RouteCache
+from probe import Probe
+import fastpath
 
 class Captain:
-    def __init__(self, map: Dict) -> None:
+    def __init__(self, map: Dict, cache_size: int = 0, probe: Optional[Probe] = None, fast: bool = True) -> None:
         '''
         Initialize the captian (agent) with a map (graph).
 
         Parameters:
-            map (Map): The map (a graph), including all known islands and routes.
+            map (Map): The map (a graph), including all known islands and routes. Or an Atlas opened from a binary map file,
+                whose routes are read straight from the file (and can't be changed).
+            cache_size (int): The number of search results to keep in an LRU cache. 0 turns the cache off.
+            probe (Probe): Instrumentation to record searches with, e.g. a Recorder. None turns instrumentation off.
+            fast (bool): Run uniform cost, greedy best-first, A* and multi-goal searches with the specialized loops in fastpath.py,
+                which find exactly the same paths. False runs them on best_first_search. A probe always uses best_first_search.
         '''
 
         self.map = map
+        self.chart = map.chart() if isinstance(map, Atlas) else Chart(map) # the map compiled into integer island ids and CSR routes
+        self.version = 0 # bumped every time the routes change
+        self.cache = RouteCache(cache_size) if cache_size else None
+        self.probe = probe
+        self.fast = fast
+        self.inflight = {} # the async searches running right now, by key, with the number of callers waiting on each
+
+    def update_route(self, origin: str, destination: str, travel_cost: float) -> None:
+        '''
+        Sets the cost of a route, adding the route if it doesn't exist yet.
+        Cached results are dropped. Precomputed landmarks or hierarchies are not updated and must be rebuilt.
+
+        Parameters:
+            self
+            origin (str): the name of the island the route leaves from
+            destination (str): the name of the island the route arrives at
+            travel_cost (float): the cost to sail the route
+        '''
+
+        self.map['routes'].setdefault(origin, {})[destination] = travel_cost
+
+        # an existing route is changed in place, anything else needs the chart compiled again
+        ids = self.chart.ids
+        if origin not in ids or destination not in ids or not self.chart.set_weight(ids[origin], ids[destination], travel_cost):
+            self.chart = Chart(self.map)
+
+        self.changed()
+
+    def close_route(self, origin: str, destination: str) -> None:
+        '''
+        Removes a route from the map.
+        Cached results are dropped. Precomputed landmarks or hierarchies are not updated and must be rebuilt.
+
+        Parameters:
+            self
+            origin (str): the name of the island the route leaves from
+            destination (str): the name of the island the route arrives at
+        '''
+
+        del self.map['routes'][origin][destination]
+
+        # the route is taken out of the chart in place, the chart is only compiled again if it lost track of the route
+        ids = self.chart.ids
+        if not self.chart.remove_route(ids[origin], ids[destination]):
+            self.chart = Chart(self.map)
+
+        self.changed()
+
+    def changed(self) -> None:
+        '''
+        Records that the routes of the map have changed, and drops every cached result.
+        Call this after editing map['routes'] directly, after compiling the chart again with self.chart = Chart(self.map).
+
+        Parameters:
+            self
+        '''
+
+        self.version += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+    def search_key(self, algorithm: str, starting_island_name: str, treasure_island_name: Union[str, Iterable[str]],
+                   hunch: Optional[Hunch] = None, stubbornness: float = 1) -> tuple:
+        '''
+        Helper function that builds the key identifying a search, the same for the search and for its async and streamed forms,
+        so that they share cached results. Only what the algorithm actually uses is part of the key.
+
+        Parameters:
+            self
+            algorithm (str): the name of the search method
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island, or the names of all of them for multi_goal_search.
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal).
+            stubbornness (float): A multiplier on the hunch's influence, equivalent to heuristic weight.
+
+        Returns:
+            tuple: (algorithm, start, goal, stubbornness, hunch)
+        '''
+
+        if algorithm == 'uniform_cost_search':
+            hunch = None
+        if algorithm == 'multi_goal_search':
+            treasure_island_name = tuple(treasure_island_name)
+        weighted = algorithm == 'a_star_search' or (algorithm == 'multi_goal_search' and hunch is not None)
+        return (algorithm, starting_island_name, treasure_island_name, stubbornness if weighted else None, hunch)
+
+    def cached(self, key: tuple, search) -> tuple:
+        '''
+        Helper function that answers a search from the cache if there is one
+
+        Parameters:
+            self
+            key (tuple): (algorithm, start, goal, stubbornness, hunch), identifies the search
+            search: runs the search when it isn't cached
+
+        Returns:
+            tuple[list[str], int, int]: the path, its cost, and the number of islands visited
+        '''
+
+        return self.observe(key, search) if self.cache is None else self.cache.get(key, lambda: self.observe(key, search))
+
+    def observe(self, key: tuple, search) -> tuple:
+        '''
+        Helper function that runs a search, recording it with the probe if there is one
+
+        Parameters:
+            self
+            key (tuple): (algorithm, start, goal, stubbornness, hunch), identifies the search
+            search: runs the search
+
+        Returns:
+            tuple[list[str], int, int]: the path, its cost, and the number of islands visited
+        '''
+
+        if self.probe is None:
+            return search()
+        return self.probe.watch(key, search)()
+
+    def hunch_by_id(self, hunch: Hunch, treasure_island_name: str, reverse: bool = False):
+        '''
+        Turns a hunch into a heuristic over island ids for a fixed treasure island.
+        A Hunch built from the same map is evaluated on ids directly (or read from its table if it was precomputed),
+        Landmarks are read from their table, and any other callable is given island names.
+
+        Parameters:
+            self
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal).
+            treasure_island_name (str): The name of the island with treasure (goal).
+            reverse (bool): Estimate the cost from the given island to every island instead, as a backward search needs.
+
+        Returns:
+            Callable[[int], float]: the estimated cost from an island id to the treasure island
+        '''
+
+        if self.probe is None:
+            return self.compile_hunch(hunch, treasure_island_name, reverse)
+
+        # building the hunch (e.g. its table for this goal) is timed separately from calling it
+        with self.probe.phase('hunch'):
+            h = self.compile_hunch(hunch, treasure_island_name, reverse)
+        return self.probe.hunch(h)
+
+    def compile_hunch(self, hunch: Hunch, treasure_island_name: str, reverse: bool = False):
+        '''
+        Helper function for hunch_by_id that builds the heuristic over island ids
+
+        Parameters:
+            self
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal).
+            treasure_island_name (str): The name of the island with treasure (goal).
+            reverse (bool): Estimate the cost from the given island to every island instead.
+
+        Returns:
+            Callable[[int], float]: the estimated cost from an island id to the treasure island
+        '''
+
+        if isinstance(hunch, Hunch) and hunch.map is self.map:
+            goal = self.chart.ids[treasure_island_name]
+            if reverse:
+                return lambda n: hunch.estimate(goal, n)
+
+            # a precomputed hunch answers with a plain read from its table for this goal
+            if hunch.arrays is not None:
+                return hunch.table(goal).__getitem__
+            return lambda n: hunch.estimate(n, goal)
+
+        # landmarks built for this map already work on ids
+        if isinstance(hunch, Landmarks) and hunch.map is self.map:
+            return hunch.table(self.chart.ids[treasure_island_name], reverse).__getitem__
+
+        names = self.chart.names
+        if reverse:
+            return lambda n: hunch(treasure_island_name, names[n])
+        return lambda n: hunch(names[n], treasure_island_name)
 
     '''
     Helper function that performs best first search
@@ -18,85 +206,188 @@ class Captain:
     Parameters:
         self
         start (str): the starting node of the graph that we will explore
-        goal (str): the node of the graph that we would like to reacj
-        f_func: the evaluation function (f(n))
+        goal (str): the node of the graph that we would like to reacj, or a collection of nodes if any of them will do
+        f_func: the evaluation function (f(n)), called with an island name and the path cost (g(n))
+        frontier: the frontier class to use, HeapFrontier (lazy deletion) or IndexedHeapFrontier (decrease-key)
 
     Returns:
         tuple[list[str], int, int]: tuples of the path that we have taken so far, the cost of the path, 
         and the number of nodes expanded
     '''
-    def best_first_search(self, start: str, goal: str, f_func) -> tuple[list[str], int, int]:
-         class Node:
-              def __init__(self, state: str, parent=None, cost=None) -> None:
-                   '''
-                   Intiialize the node class
-
-                   Parameters:
-                        self
-                        state (str): contains the current state of the node
-                            start - at the starting node
-                            goal - reached the goal node
-                            neighbor - exploring the a neighbor node
-                        parent: the parent node of the node
-                        cost: the cost of the path (g(n))
-                   '''
-                   
-                   self.state = state
-                   self.parent = parent
-                   self.cost = cost
-
-              def path(self) -> list[str]:
-                   '''
-                   Reconstructing the path from the root node to the current node
-
-                   Parameters:
-                        self
-
-                   Returns
-                        list[str]: a list of the nodes' states from the root to the current node
-                   '''
-                   
-                   # result is a list of strings that will store the states of the nodes
-                   node, result = self, []
+    def best_first_search(self, start: str, goal: Union[str, Iterable[str]], f_func, frontier=HeapFrontier) -> tuple[list[str], int, int]:
+         names = self.chart.names
+         return self.best_first_search_by_id(start, goal, lambda n, g: f_func(names[n], g), frontier)
 
-                   while node is not None:
-                        # work from the current node up the graph to find the path
-                        result.append(node.state)
-                        node = node.parent
+    def best_first_search_by_id(self, start: str, goal: Union[str, Iterable[str]], f_func, frontier=HeapFrontier) -> tuple[list[str], int, int]:
+         '''
+         The search behind best_first_search, with an evaluation function over island ids that the searches of the captain
+         build from hunch_by_id, so that no island name is looked up while searching
 
-                   # reverse result so that you get the path from the root to the current node,
-                   # not the current node to the root
-                   return list(reversed(result))
-              
-         start_node = Node(state=start, cost=0)
-         frontier = [(f_func(start, 0), start_node)] # intiializing frontier with the evaluation function and starting node
-         reached = {start: start_node} # the list that stores all the nodes we expanded
+         Parameters:
+              self
+              start (str): the name of the starting island
+              goal (str): the name of the goal island, or a collection of names if any of them will do
+              f_func: the evaluation function (f(n)), called with an island id and the path cost (g(n))
+              frontier: the frontier class to use, HeapFrontier (lazy deletion) or IndexedHeapFrontier (decrease-key)
+
+         Returns:
+              tuple[list[str], int, int]: the path, its cost, and the number of islands reached
+         '''
+
+         chart = self.chart
+         start = chart.ids[start]
+         goals = {chart.ids[goal]} if isinstance(goal, str) else {chart.ids[name] for name in goal}
+         if self.probe is not None:
+              frontier = self.probe.frontier(frontier)
+
+         # every push is its own entry, keyed by (island, path cost), like the nodes of the original search:
+         # an island reached again more cheaply keeps its older entry, which is still expanded in its turn
+         cost = {start: 0} # the cheapest known path cost (g(n)) to every island we reached
+         parent = {(start, 0): None} # the entry every entry was pushed from
+         expanded = {} # the path cost every island was last expanded at
+         frontier = frontier() # priority queue ordered by the evaluation function, ties go to the earliest push
+         frontier.push((start, 0), f_func(start, 0), None) # intiializing frontier with the evaluation function and starting island
 
          while frontier:
-              frontier.sort(key=lambda x: x[0]) # order the frontier from lowest to highest f(n) value
-              _, node = frontier.pop(0) # take the starting node off the frontier
+              node, _ = frontier.pop() # take the entry with the lowest f(n) off the frontier
+              state, g = node
+
+              # an island already expanded at a path cost no higher would push nothing new, so its entry is skipped.
+              # one reached more cheaply after it was expanded is expanded again (reopened)
+              if expanded.get(state, g + 1) <= g:
+                   continue
+              expanded[state] = g
 
-              # when we reach our goal, return the path that we took, its cost, and the number of nodes we expanded
-              if node.state == goal:
-                   return node.path(), int(node.cost), len(reached)
+              # when we reach our goal, return the path that we took, its cost, and the number of islands we reached
+              if state in goals:
+                   path = []
+                   while node is not None:
+                        path.append(node[0])
+                        node = parent[node]
+                   return chart.path(path[::-1]), int(g), len(cost)
               
-              # exploring all of the neighbors of the current node
-              for neighbor, travel_cost in self.map['routes'][node.state].items():
-                   new_cost = node.cost + travel_cost
-                   
-                   # make the neighbor a child node of the current node
-                   child = Node(state=neighbor, parent=node, cost=new_cost)
-
-                   # if the state is new or we found a cheaper path, add to frontier
-                   if neighbor not in reached or new_cost < reached[neighbor].cost:
-                        reached[neighbor] = child
-                        frontier.append((f_func(neighbor, new_cost), child))   
+              # exploring all of the neighbors of the current island
+              for neighbor, travel_cost in chart.routes(state):
+                   new_cost = g + travel_cost
+
+                   # if the island is new or we found a cheaper path, add to frontier
+                   if neighbor not in cost or new_cost < cost[neighbor]:
+                        cost[neighbor] = new_cost
+                        parent[(neighbor, new_cost)] = node
+                        frontier.push((neighbor, new_cost), f_func(neighbor, new_cost), None)
 
          
          # default return if we weren't able to reach any other nodes
-         return [], 0, len(reached)         
+         return [], 0, len(cost)         
+
+
+    def best_first_steps(self, start: str, goal: Union[str, Iterable[str]], f_func, h=None, frontier=HeapFrontier) -> Iterator[dict]:
+        '''
+        The same search as best_first_search_by_id, but as a generator that reports every island as it is expanded.
+        Nothing runs between steps, so the caller can pause by not asking for the next one, stop with close() or break,
+        and put a limit on the number of steps or the time spent.
+
+        Parameters:
+            self
+            start (str): the starting node of the graph that we will explore
+            goal (str): the node of the graph that we would like to reach, or a collection of nodes if any of them will do
+            f_func: the evaluation function (f(n)), called with an island id and the path cost (g(n))
+            h: the estimated cost from an island id to the goal, used to report the most promising island so far. None if there is no estimate.
+            frontier: the frontier class to use, HeapFrontier (lazy deletion) or IndexedHeapFrontier (decrease-key)
+
+        Returns:
+            Iterator[dict]: one event per expanded island, with
+                'island': the island expanded, 'cost': its path cost, 'frontier': the size of the frontier,
+                'reached': the number of islands reached, 'best': the expanded island with the lowest estimate to the goal (None without h),
+                'done': True on the last event, which also has 'path', the path found ([] if there is none)
+        '''
+
+        chart = self.chart
+        names = chart.names
+        start = chart.ids[start]
+        goals = {chart.ids[goal]} if isinstance(goal, str) else {chart.ids[name] for name in goal}
+
+        cost = {start: 0} # the cheapest known path cost (g(n)) to every island we reached
+        parent = {(start, 0): None} # the entry every entry was pushed from, as in best_first_search
+        expanded = {} # the path cost every island was last expanded at
+        frontier = frontier()
+        frontier.push((start, 0), f_func(start, 0), None)
+        best, best_estimate = None, float('inf')
+
+        while frontier:
+            node, _ = frontier.pop()
+            state, g = node
+
+            if expanded.get(state, g + 1) <= g:
+                continue
+            expanded[state] = g
+
+            # the most promising island so far, by the estimate to the goal
+            if h is not None:
+                estimate = h(state)
+                if estimate < best_estimate:
+                    best, best_estimate = names[state], estimate
+
+            event = {'island': names[state], 'cost': g, 'frontier': len(frontier), 'reached': len(cost), 'best': best, 'done': False}
+
+            if state in goals:
+                path = []
+                while node is not None:
+                    path.append(node[0])
+                    node = parent[node]
+                event.update(done=True, path=chart.path(path[::-1]))
+                yield event
+                return
+
+            yield event
+
+            for neighbor, travel_cost in chart.routes(state):
+                new_cost = g + travel_cost
+
+                if neighbor not in cost or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[(neighbor, new_cost)] = node
+                    frontier.push((neighbor, new_cost), f_func(neighbor, new_cost), None)
+
+        # the frontier ran out without reaching the goal
+        yield {'island': None, 'cost': 0, 'frontier': 0, 'reached': len(cost), 'best': best, 'done': True, 'path': []}
+
+    def stream(self, algorithm: str, starting_island_name: str, treasure_island_name: Union[str, Iterable[str]],
+               hunch: Optional[Hunch] = None, stubbornness: float = 1) -> Iterator[dict]:
+        '''
+        Runs one of the best-first searches step by step, see best_first_steps for the events.
+        The last event has the same path as the search itself. Streamed searches skip the cache and the probe.
+
+        Parameters:
+            algorithm (str): 'uniform_cost_search', 'greedy_best_first_search', 'a_star_search' or 'multi_goal_search'
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the island with treasure (goal), or the names of all of them for multi_goal_search.
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal). Needed by greedy best-first and A* search.
+            stubbornness (float): A multiplier on the hunch's influence, equivalent to heuristic weight.
+
+        Returns:
+            Iterator[dict]: one event per expanded island
+        '''
+
+        if algorithm == 'uniform_cost_search':
+            return self.best_first_steps(starting_island_name, treasure_island_name, f_func=lambda n, g: g)
+
+        if algorithm == 'multi_goal_search':
+            treasure_island_names = list(treasure_island_name)
+            if hunch is None:
+                return self.best_first_steps(starting_island_name, treasure_island_names, f_func=lambda n, g: g)
+            hs = [self.hunch_by_id(hunch, name) for name in treasure_island_names]
+            h = lambda n: min(estimate(n) for estimate in hs)
+            return self.best_first_steps(starting_island_name, treasure_island_names, f_func=lambda n, g: g + stubbornness * h(n), h=h)
+
+        if algorithm not in ('greedy_best_first_search', 'a_star_search'):
+            raise ValueError(f'{algorithm} cannot be streamed')
+
+        h = self.hunch_by_id(hunch, treasure_island_name)
+        if algorithm == 'greedy_best_first_search':
+            return self.best_first_steps(starting_island_name, treasure_island_name, f_func=lambda n, g: h(n), h=h)
+        return self.best_first_steps(starting_island_name, treasure_island_name, f_func=lambda n, g: g + stubbornness * h(n), h=h)
 
-    
     def uniform_cost_search(self, starting_island_name: str, treasure_island_name: str) -> List[str]:
         '''
         This method should implement the uniform cost search algorithm.
@@ -114,8 +405,11 @@ class Captain:
 
         # using path cost g to get from starting island to treasure island
         # call to best first search
-        return self.best_first_search(starting_island_name, treasure_island_name, f_func=lambda n, g: g)
-        
+        key = self.search_key('uniform_cost_search', starting_island_name, treasure_island_name)
+        if self.fast and self.probe is None:
+            return self.cached(key, lambda: fastpath.uniform_cost_search(self.chart, starting_island_name, treasure_island_name))
+        return self.cached(key, lambda: self.best_first_search_by_id(starting_island_name, treasure_island_name, f_func=lambda n, g: g))
+
     def greedy_best_first_search(self, starting_island_name: str, treasure_island_name: str, hunch: Hunch) -> List[str]:
         '''
         This method should implement the greedy best-first search algorithm.
@@ -135,7 +429,13 @@ class Captain:
         
         # uses only hunch value to get to the treasure island
         # call to best first search
-        return self.best_first_search(starting_island_name, treasure_island_name, f_func=lambda n, g: hunch(n, treasure_island_name))
+        def search():
+            h = self.hunch_by_id(hunch, treasure_island_name)
+            if self.fast and self.probe is None:
+                return fastpath.greedy_best_first_search(self.chart, starting_island_name, treasure_island_name, h)
+            return self.best_first_search_by_id(starting_island_name, treasure_island_name, f_func=lambda n, g: h(n))
+
+        return self.cached(self.search_key('greedy_best_first_search', starting_island_name, treasure_island_name, hunch), search)
 
     def a_star_search(self, starting_island_name: str, treasure_island_name: str, hunch: Hunch, stubbornness: float) -> List[str]:
         '''
@@ -154,4 +454,826 @@ class Captain:
         '''
 
         # uses the hunch value, stubborness (the weight for the heuristic), and the path cost to get to treasure island
-        return self.best_first_search(starting_island_name, treasure_island_name, f_func=lambda n, g: g + stubbornness * hunch(n, treasure_island_name))
+        def search():
+            h = self.hunch_by_id(hunch, treasure_island_name)
+            if self.fast and self.probe is None:
+                return fastpath.a_star_search(self.chart, starting_island_name, treasure_island_name, h, stubbornness)
+            return self.best_first_search_by_id(starting_island_name, treasure_island_name, f_func=lambda n, g: g + stubbornness * h(n))
+
+        return self.cached(self.search_key('a_star_search', starting_island_name, treasure_island_name, hunch, stubbornness), search)
+
+    def multi_goal_search(self, starting_island_name: str, treasure_island_names: Iterable[str], hunch: Optional[Hunch] = None, stubbornness: float = 1) -> List[str]:
+        '''
+        This method searches for the cheapest path to whichever of several treasure islands is nearest,
+        stopping at the first treasure island it expands.
+
+        Parameters:
+            starting_island_name (str): The name of the starting island.
+            treasure_island_names (Iterable[str]): The names of the islands that may hold the treasure (goals).
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal). If None, this is uniform cost search.
+            stubbornness (float): A multiplier on the hunch's influence, equivalent to heuristic weight.
+
+        Returns:
+            List[str]: A list of island names representing the path taken from the starting island to the treasure island. If no valid path exists, return an empty list.
+            int: The cost of the path. If no valid path exits, return 0.
+            int: The number of islands (nodes) visited.
+        '''
+
+        treasure_island_names = list(treasure_island_names)
+
+        def search():
+            # uniform cost search towards all of the treasure islands at once
+            if hunch is None:
+                if self.fast and self.probe is None:
+                    return fastpath.uniform_cost_search(self.chart, starting_island_name, treasure_island_names)
+                return self.best_first_search_by_id(starting_island_name, treasure_island_names, f_func=lambda n, g: g)
+
+            # the estimate to the nearest treasure island is admissible whenever the hunch is
+            hs = [self.hunch_by_id(hunch, name) for name in treasure_island_names]
+            if self.fast and self.probe is None:
+                return fastpath.a_star_search(self.chart, starting_island_name, treasure_island_names, lambda n: min(h(n) for h in hs), stubbornness)
+            return self.best_first_search_by_id(starting_island_name, treasure_island_names, f_func=lambda n, g: g + stubbornness * min(h(n) for h in hs))
+
+        key = self.search_key('multi_goal_search', starting_island_name, treasure_island_names, hunch, stubbornness)
+        return self.observe(key, search)
+
+    async def search_async(self, algorithm: str, starting_island_name: str, treasure_island_name: str, hunch: Optional[Hunch] = None,
+                           stubbornness: float = 1, timeout: Optional[float] = None, executor=None, every: int = 256) -> tuple:
+        '''
+        Runs a best-first search without blocking the event loop, for use from asyncio code such as a web service.
+        The search expands a chunk of islands at a time, in the executor if there is one and otherwise on the event loop itself,
+        handing control back to the event loop between chunks. Callers asking for the same search while it runs share it,
+        and the search is only cancelled once every one of them has given up on it.
+
+        Parameters:
+            algorithm (str): 'uniform_cost_search', 'greedy_best_first_search' or 'a_star_search'
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the island with treasure (goal).
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal). Needed by greedy best-first and A* search.
+            stubbornness (float): A multiplier on the hunch's influence, equivalent to heuristic weight.
+            timeout (float): The most seconds to wait for the result, raising asyncio.TimeoutError after. None waits as long as it takes.
+            executor (concurrent.futures.Executor): where to run the search, e.g. a ThreadPoolExecutor with a few workers. None runs it on the event loop.
+            every (int): the number of islands to expand before handing control back to the event loop
+
+        Returns:
+            tuple[list[str], int, int]: the path, its cost, and the number of islands visited, the same as the search itself
+        '''
+
+        key = self.search_key(algorithm, starting_island_name, treasure_island_name, hunch, stubbornness)
+
+        if self.cache is not None and key in self.cache.results:
+            return self.cache.get(key, None)
+
+        # join the same search if it is already running on the current routes
+        running = key + (self.version,)
+        entry = self.inflight.get(running)
+        if entry is None:
+            task = asyncio.ensure_future(self.run_async(key, lambda: self.stream(*key[:3], hunch, stubbornness), executor, every))
+            entry = self.inflight[running] = [task, 0]
+
+            # a finished search stops taking new callers, unless the routes changed and another one took its place
+            def finished(done: asyncio.Future) -> None:
+                if self.inflight.get(running, (None,))[0] is done:
+                    del self.inflight[running]
+            task.add_done_callback(finished)
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            path, cost, visited = await asyncio.wait_for(asyncio.shield(task), timeout)
+        finally:
+            # the last caller to give up on an unfinished search stops it
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                task.cancel()
+                if self.inflight.get(running) is entry:
+                    del self.inflight[running]
+
+        # every caller gets a copy of the path
+        return list(path), cost, visited
+
+    async def run_async(self, key: tuple, start, executor, every: int) -> tuple:
+        '''
+        Helper function for search_async that runs a streamed search to the end, a chunk of steps at a time.
+        If the routes change while it runs, the search starts over on the new routes, so that it never returns
+        (or caches) a path found partly on the old routes.
+
+        Parameters:
+            self
+            key (tuple): (algorithm, start, goal, stubbornness, hunch), identifies the search
+            start (Callable[[], Iterator[dict]]): starts the streamed search on the current routes
+            executor (concurrent.futures.Executor): where to run the chunks, None for the event loop
+            every (int): the number of steps in a chunk
+
+        Returns:
+            tuple[list[str], int, int]: the path, its cost, and the number of islands visited
+        '''
+
+        loop = asyncio.get_running_loop()
+        routes, steps = (self.version, self.chart), start()
+        while True:
+            if executor is None:
+                event = advance(steps, every)
+                await asyncio.sleep(0)
+            else:
+                # a cancelled search stops after the chunk that is running, which the executor thread finishes on its own
+                event = await loop.run_in_executor(executor, advance, steps, every)
+
+            # the routes changed under the search (even during the last chunk), start it over on the new routes
+            if (self.version, self.chart) != routes:
+                routes, steps = (self.version, self.chart), start()
+                continue
+            if event['done']:
+                break
+
+        result = event['path'], int(event['cost']) if event['path'] else 0, event['reached']
+        if self.cache is not None:
+            self.cache.get(key, lambda: result)
+        return result
+
+    async def uniform_cost_search_async(self, starting_island_name: str, treasure_island_name: str, **options) -> tuple:
+        '''
+        uniform_cost_search for asyncio code, see search_async for the options (timeout, executor, every)
+        '''
+
+        return await self.search_async('uniform_cost_search', starting_island_name, treasure_island_name, **options)
+
+    async def greedy_best_first_search_async(self, starting_island_name: str, treasure_island_name: str, hunch: Hunch, **options) -> tuple:
+        '''
+        greedy_best_first_search for asyncio code, see search_async for the options (timeout, executor, every)
+        '''
+
+        return await self.search_async('greedy_best_first_search', starting_island_name, treasure_island_name, hunch, **options)
+
+    async def a_star_search_async(self, starting_island_name: str, treasure_island_name: str, hunch: Hunch, stubbornness: float, **options) -> tuple:
+        '''
+        a_star_search for asyncio code, see search_async for the options (timeout, executor, every)
+        '''
+
+        return await self.search_async('a_star_search', starting_island_name, treasure_island_name, hunch, stubbornness, **options)
+
+    def bidirectional_search(self, starting_island_name: str, treasure_island_name: str, hunch: Optional[Hunch] = None) -> List[str]:
+        '''
+        This method searches forwards from the starting island and backwards from the treasure island at the same time,
+        and stops once no path through the two frontiers can be cheaper than the best meeting point found so far.
+
+        Without a hunch this is bidirectional uniform cost search. With a hunch it is bidirectional A* using the
+        average of the forward and backward hunches as the potential, which finds the cheapest path when the hunch is consistent.
+        Routes may cost more one way than the other, so the backward hunch estimates the cost from the starting island, not to it.
+
+        Parameters:
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island.
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal). If None, both searches are uniform cost.
+
+        Returns:
+            List[str]: A list of island names representing the path taken from the starting island to the treasure island. If no valid path exists, return an empty list.
+            int: The cost of the path. If no valid path exits, return 0.
+            int: The number of islands (nodes) visited by either search.
+        '''
+
+        chart = self.chart
+        start, goal = chart.ids[starting_island_name], chart.ids[treasure_island_name]
+
+        # the forward potential, the backward search uses its negative
+        if hunch is None:
+            potential = lambda n: 0
+        else:
+            to_goal = self.hunch_by_id(hunch, treasure_island_name)
+            from_start = self.hunch_by_id(hunch, starting_island_name, reverse=True)
+            potential = lambda n: (to_goal(n) - from_start(n)) / 2
+
+        # each side is (chart to search, sign of the potential, cost, parent, frontier, closed)
+        forward = (chart, 1, {start: 0}, {start: None}, HeapFrontier(), set())
+        backward = (chart.reverse(), -1, {goal: 0}, {goal: None}, HeapFrontier(), set())
+        forward[4].push(start, potential(start), 0)
+        backward[4].push(goal, -potential(goal), 0)
+
+        # the cheapest path found so far and the island where its two halves meet
+        best, meeting = (0, start) if start == goal else (float('inf'), None)
+
+        while forward[4] and backward[4]:
+            # meet-in-the-middle stopping rule: nothing left on the frontiers can lead to a cheaper path
+            if forward[4].peek() + backward[4].peek() >= best:
+                break
+
+            # expand from whichever side has the smaller frontier
+            side, other = (forward, backward) if len(forward[4]) <= len(backward[4]) else (backward, forward)
+            side_chart, sign, cost, parent, frontier, closed = side
+            other_cost = other[2]
+
+            state, g = frontier.pop()
+            if state in closed:
+                continue
+            closed.add(state)
+
+            for neighbor, travel_cost in side_chart.routes(state):
+                new_cost = g + travel_cost
+
+                if neighbor not in cost or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = state
+                    frontier.push(neighbor, new_cost + sign * potential(neighbor), new_cost)
+
+                # a path through an island the other side has reached
+                if neighbor in other_cost and cost[neighbor] + other_cost[neighbor] < best:
+                    best, meeting = cost[neighbor] + other_cost[neighbor], neighbor
+
+        visited = len(forward[2].keys() | backward[2].keys())
+
+        if meeting is None:
+            return [], 0, visited
+
+        # walk back to the start on the forward side, then on to the treasure island on the backward side
+        path, state = [], meeting
+        while state is not None:
+            path.append(state)
+            state = forward[3][state]
+        path.reverse()
+
+        state = backward[3][meeting]
+        while state is not None:
+            path.append(state)
+            state = backward[3][state]
+
+        return chart.path(path), int(best), visited
+
+    def ida_star_search(self, starting_island_name: str, treasure_island_name: str, hunch: Hunch, stubbornness: float, memory: int = 100000) -> Tuple[List[str], int, int, int]:
+        '''
+        This method implements iterative deepening A*: repeated depth-first searches that only follow paths
+        whose f(n) stays under a threshold, raising the threshold to the smallest f(n) that went over it each time.
+        Besides the current path, only a bounded table of the cheapest path cost each island was reached with
+        during the current iteration is kept. Arriving at an island again at no lower cost can't find anything new,
+        so that branch is skipped, which keeps iterations from re-walking every path on a densely connected map.
+        The threshold at least doubles each iteration, and the last iteration keeps searching for paths cheaper
+        than the first one it finds, so the path is still the cheapest when the hunch is admissible and stubbornness is 1.
+
+        Parameters:
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island.
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal).
+            stubbornness (float): A multiplier on the hunch's influence, equivalent to heuristic weight.
+            memory (int): The most islands to keep in the table of path costs.
+
+        Returns:
+            List[str]: A list of island names representing the path taken from the starting island to the treasure island. If no valid path exists, return an empty list.
+            int: The cost of the path. If no valid path exits, return 0.
+            int: The number of islands (nodes) expanded over all iterations.
+            int: The largest number of nodes held in memory at once.
+        '''
+
+        chart = self.chart
+        start, goal = chart.ids[starting_island_name], chart.ids[treasure_island_name]
+        h = self.hunch_by_id(hunch, treasure_island_name)
+
+        threshold = stubbornness * h(start)
+        expanded, peak = 0, 2
+        solution, solution_cost = None, float('inf')
+
+        while True:
+            # each entry on the stack is (island, path cost, routes still to try)
+            stack = [(start, 0, iter(chart.routes(start)))]
+            on_path = {start}
+            best = {start: 0} # the cheapest path cost each island was reached with in this iteration
+            next_threshold = float('inf')
+
+            while stack:
+                state, g, routes = stack[-1]
+
+                # keep the cheapest path to the treasure found so far, and keep looking for a cheaper one
+                if state == goal:
+                    solution, solution_cost = [entry[0] for entry in stack], g
+                    stack.pop()
+                    on_path.discard(state)
+                    continue
+
+                route = next(routes, None)
+                if route is None:
+                    # every route from this island has been tried, backtrack
+                    stack.pop()
+                    on_path.discard(state)
+                    continue
+
+                neighbor, travel_cost = route
+                new_cost = g + travel_cost
+                if neighbor in on_path or new_cost >= solution_cost:
+                    continue
+
+                # remember the cheapest f(n) over the threshold for the next iteration
+                f = new_cost + stubbornness * h(neighbor)
+                if f > threshold:
+                    next_threshold = min(next_threshold, f)
+                    continue
+
+                # this island was already searched from a path that was no more expensive
+                if new_cost >= best.get(neighbor, float('inf')):
+                    continue
+                if neighbor in best or len(best) < memory:
+                    best[neighbor] = new_cost
+
+                expanded += 1
+                stack.append((neighbor, new_cost, iter(chart.routes(neighbor))))
+                on_path.add(neighbor)
+                peak = max(peak, len(stack) + len(best))
+
+            # every path under the threshold has been searched, so nothing left can beat the solution
+            if solution is not None:
+                return chart.path(solution), int(solution_cost), expanded, peak
+            if next_threshold == float('inf'):
+                return [], 0, expanded, peak
+
+            # at least double the threshold so that a map with many distinct path costs takes few iterations
+            threshold = max(next_threshold, 2 * threshold)
+
+    def sma_star_search(self, starting_island_name: str, treasure_island_name: str, hunch: Hunch, stubbornness: float, memory: int = 10000) -> Tuple[List[str], int, int, int]:
+        '''
+        This method implements simplified memory-bounded A* (SMA*). It searches like A* over paths, but never keeps more than
+        memory nodes. When it runs out, it forgets the leaf with the highest f(n) and backs that f(n) up into the leaf's parent,
+        so the parent is expanded again if the forgotten branch becomes the most promising one.
+
+        Parameters:
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island.
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal).
+            stubbornness (float): A multiplier on the hunch's influence, equivalent to heuristic weight.
+            memory (int): The most nodes to keep in memory at once. Paths with more islands than this can't be found.
+
+        Returns:
+            List[str]: A list of island names representing the path taken from the starting island to the treasure island. If no valid path exists, return an empty list.
+            int: The cost of the path. If no valid path exits, return 0.
+            int: The number of nodes expanded, counting every time a node is expanded again.
+            int: The largest number of nodes held in memory at once.
+        '''
+
+        class Node:
+            __slots__ = ('state', 'parent', 'g', 'f', 'depth', 'children', 'forgotten', 'pending')
+
+            def __init__(self, state: int, parent, g: float, f: float) -> None:
+                self.state, self.parent, self.g, self.f = state, parent, g, f
+                self.depth = parent.depth + 1 if parent is not None else 0
+                self.children = {} # the successors in memory, by island
+                self.forgotten = {} # the backed-up f(n) of successors that were forgotten, by island
+                self.pending = inf # the lowest f(n) of the successors not generated yet
+
+        chart = self.chart
+        start, goal = chart.ids[starting_island_name], chart.ids[treasure_island_name]
+        h = self.hunch_by_id(hunch, treasure_island_name)
+        inf = float('inf')
+
+        def rekey(node) -> None:
+            # put a node whose f(n) changed back in its place on whichever frontiers it is on
+            if node in open_nodes:
+                open_nodes.push(node, (node.f, -node.depth), None)
+            if node in leaves:
+                leaves.push(node, (-node.f, node.depth), None)
+
+        def backup(node) -> None:
+            # a node's f(n) is the lowest f(n) of its successors, whether in memory, forgotten or not generated yet
+            while node is not None:
+                lowest = min(min((child.f for child in node.children.values()), default=inf),
+                             min(node.forgotten.values(), default=inf), node.pending)
+                if lowest == node.f:
+                    break
+                node.f = lowest
+                rekey(node)
+                node = node.parent
+
+        root = Node(start, None, 0, stubbornness * h(start))
+        open_nodes = HeapFrontier() # the nodes with successors that aren't in memory, lowest f(n) first, deepest first
+        open_nodes.push(root, (root.f, 0), None)
+        leaves = HeapFrontier() # the nodes in memory without children, highest f(n) first, shallowest first
+        cheapest = {start: root} # the node in memory with the cheapest path to each island
+        size, peak, expanded = 1, 1, 0
+
+        while open_nodes:
+            node, _ = open_nodes.pop()
+            if node.f == inf:
+                break
+
+            if node.state == goal:
+                cost, path = node.g, []
+                while node is not None:
+                    path.append(node.state)
+                    node = node.parent
+                return chart.path(path[::-1]), int(cost), expanded, peak
+
+            # islands already on the path to this node would make a cycle
+            ancestors, ancestor = set(), node
+            while ancestor is not None:
+                ancestors.add(ancestor.state)
+                ancestor = ancestor.parent
+
+            # the successors that aren't in memory; forgotten ones come back with their backed-up f(n)
+            successors = []
+            for neighbor, travel_cost in chart.routes(node.state):
+                if neighbor in ancestors or neighbor in node.children:
+                    continue
+
+                # another path in memory reaches this island for no more, so this one can't lead anywhere cheaper
+                g = node.g + travel_cost
+                if neighbor in cheapest and cheapest[neighbor].g <= g:
+                    continue
+
+                if node.depth + 1 >= memory - 1 and neighbor != goal:
+                    f = inf # the path can't grow any longer within memory
+                else:
+                    f = max(node.f, g + stubbornness * h(neighbor), node.forgotten.get(neighbor, -inf))
+                successors.append((f, neighbor, g))
+
+            node.forgotten.clear()
+            if not successors:
+                node.pending = inf
+                backup(node)
+                continue
+
+            # generate only the most promising successor
+            expanded += 1
+            successors.sort(key=lambda successor: successor[0])
+            f, neighbor, g = successors[0]
+            node.pending = successors[1][0] if len(successors) > 1 else inf
+
+            # the node being expanded is about to get a child, so it is never the leaf forgotten
+            if node in leaves:
+                leaves.remove(node)
+
+            # make room by forgetting the shallowest leaf with the highest f(n)
+            if size >= memory:
+                if not leaves:
+                    break
+                worst, _ = leaves.pop()
+                if worst in open_nodes:
+                    open_nodes.remove(worst)
+                size -= 1
+                if cheapest.get(worst.state) is worst:
+                    del cheapest[worst.state]
+
+                parent = worst.parent
+                del parent.children[worst.state]
+                parent.forgotten[worst.state] = worst.f
+                if parent is not node:
+                    open_nodes.push(parent, (parent.f, -parent.depth), None)
+                    if not parent.children and parent.parent is not None:
+                        leaves.push(parent, (-parent.f, parent.depth), None)
+
+            child = Node(neighbor, node, g, f)
+            node.children[neighbor] = child
+            cheapest[neighbor] = child
+            open_nodes.push(child, (f, -child.depth), None)
+            leaves.push(child, (-f, child.depth), None)
+            size += 1
+            peak = max(peak, size)
+
+            # the node stays open while it has successors that aren't in memory
+            if node.pending != inf or node.forgotten:
+                open_nodes.push(node, (node.f, -node.depth), None)
+            backup(node)
+
+        return [], 0, expanded, peak
+
+    def anytime_a_star_search(self, starting_island_name: str, treasure_island_name: str, hunch: Hunch, stubbornness: float = 1000000,
+                              shrink: float = 0.5, max_seconds: Optional[float] = None, target: float = 1) -> Iterator[Tuple[List[str], int, int, float]]:
+        '''
+        This method implements anytime repairing A* (ARA*): a weighted A* search that quickly finds a path with a high stubbornness,
+        then lowers the stubbornness towards 1 and repairs the search it already did instead of starting over, finding cheaper paths.
+        Only the islands whose path cost improved since they were expanded are expanded again.
+
+        Every path found comes with a bound: its cost is at most bound times the cost of the cheapest path, when the hunch is
+        consistent (e.g. Hunch scaled down to never overestimate). The bound is the smaller of the stubbornness used and the
+        path cost divided by the lowest g(n) + h(n) of any island that could still lead somewhere cheaper.
+
+        Parameters:
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island.
+            hunch (Hunch): A callable object that estimates cost to the treasure (goal).
+            stubbornness (float): The heuristic weight of the first search.
+            shrink (float): The stubbornness is multiplied by this after every search, until it reaches 1.
+            max_seconds (float): Stop after this many seconds, keeping the best path found so far. None searches until the path is the cheapest.
+            target (float): Stop once the bound is this low, e.g. 1.1 for a path at most 10% more expensive than the cheapest.
+
+        Returns:
+            Iterator[Tuple[List[str], int, int, float]]: every time a cheaper path or a tighter bound is found,
+                the path, its cost, the number of islands reached so far, and the bound. Nothing if no path exists.
+        '''
+
+        chart = self.chart
+        start, goal = chart.ids[starting_island_name], chart.ids[treasure_island_name]
+        h = self.hunch_by_id(hunch, treasure_island_name)
+        deadline = time.perf_counter() + max_seconds if max_seconds is not None else None
+
+        cost = {start: 0} # the cheapest known path cost (g(n)) to every island we reached
+        parent = {start: None}
+        frontier = HeapFrontier()
+        frontier.push(start, stubbornness * h(start), 0)
+        closed = set() # the islands expanded by the current search
+        inconsistent = set() # islands that got cheaper after the current search expanded them
+        last = None # the cost and bound of the last path reported
+
+        while True:
+            # weighted A* until nothing left on the frontier can beat the path to the goal
+            expansions = 0
+            while frontier and (goal not in cost or frontier.peek() < cost[goal]):
+                expansions += 1
+                if deadline is not None and expansions % 64 == 0 and time.perf_counter() >= deadline:
+                    return
+
+                state, g = frontier.pop()
+                if g > cost[state]:
+                    continue
+                closed.add(state)
+
+                for neighbor, travel_cost in chart.routes(state):
+                    new_cost = g + travel_cost
+
+                    if neighbor not in cost or new_cost < cost[neighbor]:
+                        cost[neighbor] = new_cost
+                        parent[neighbor] = state
+                        if neighbor in closed:
+                            inconsistent.add(neighbor)
+                        else:
+                            frontier.push(neighbor, new_cost + stubbornness * h(neighbor), new_cost)
+
+            if goal not in cost:
+                return
+
+            # the bound: no path is cheaper than the lowest unweighted f(n) left to expand
+            waiting = [*frontier, *inconsistent]
+            lowest = min((cost[state] + h(state) for state in waiting), default=cost[goal])
+            bound = max(1.0, float(min(stubbornness, cost[goal] / lowest) if lowest > 0 else stubbornness))
+
+            if last is None or cost[goal] < last[0] or bound < last[1]:
+                path, state = [], goal
+                while state is not None:
+                    path.append(state)
+                    state = parent[state]
+                last = (cost[goal], bound)
+                yield chart.path(path[::-1]), int(cost[goal]), len(cost), bound
+
+            if bound <= target or stubbornness <= 1 or (deadline is not None and time.perf_counter() >= deadline):
+                return
+
+            # lower the stubbornness, order the frontier by it, and put the inconsistent islands back on it
+            stubbornness = max(1, stubbornness * shrink)
+            frontier.reprioritize(lambda state, g: g + stubbornness * h(state))
+            for state in inconsistent:
+                frontier.push(state, cost[state] + stubbornness * h(state), cost[state])
+            closed, inconsistent = set(), set()
+
+    def planner(self, starting_island_name: str, treasure_island_name: str, hunch: Optional[Hunch] = None) -> 'Planner':
+        '''
+        This method creates an incremental planner between two islands, which keeps its search between calls
+        and only repairs the part affected when routes change.
+
+        Parameters:
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island.
+            hunch (Hunch): A consistent hunch to focus the search. If None, the planner behaves like uniform cost search.
+
+        Returns:
+            Planner: the planner, call plan() on it for the current cheapest path.
+        '''
+
+        return Planner(self, starting_island_name, treasure_island_name, hunch)
+
+    def shortest_path_tree(self, start: str) -> Tuple[Dict[int, float], Dict[int, Optional[int]], Dict[int, int]]:
+        '''
+        Helper function that runs uniform cost search from an island until every reachable island has been expanded.
+        Islands are expanded in exactly the same order as in uniform_cost_search, so the tree answers any
+        uniform_cost_search from the same starting island.
+
+        Parameters:
+            self
+            start (str): the starting node of the graph that we will explore
+
+        Returns:
+            dict[int, float]: the cost of the cheapest path to every reachable island id
+            dict[int, int]: the island each island id was reached from
+            dict[int, int]: the number of islands reached when each island id was expanded
+        '''
+
+        chart = self.chart
+        start = chart.ids[start]
+
+        cost = {start: 0}
+        parent = {start: None}
+        reached = {} # how many islands uniform_cost_search would report when it stops at each island
+        frontier = HeapFrontier()
+        frontier.push(start, 0, 0)
+
+        while frontier:
+            state, g = frontier.pop()
+            if state in reached:
+                continue
+            reached[state] = len(cost)
+
+            for neighbor, travel_cost in chart.routes(state):
+                new_cost = g + travel_cost
+
+                if neighbor not in cost or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = state
+                    frontier.push(neighbor, new_cost, new_cost)
+
+        return cost, parent, reached
+
+    def route_many(self, queries: Iterable[Tuple[str, str]], distance_matrix: bool = False):
+        '''
+        This method answers many uniform cost search queries against the same map.
+        Queries are grouped by starting island and one shortest path tree is built per distinct starting island,
+        which then answers every treasure island queried from it.
+
+        Parameters:
+            queries (Iterable[Tuple[str, str]]): (starting island name, treasure island name) pairs.
+            distance_matrix (bool): Also return the cost from every starting island to every island it can reach.
+
+        Returns:
+            List[tuple[list[str], int, int]]: the result uniform_cost_search gives for each query, in the same order.
+            Dict[str, Dict[str, int]]: only if distance_matrix is set, the costs laid out like map['routes'],
+            keyed by starting island and then by destination island.
+        '''
+
+        chart = self.chart
+        queries = list(queries)
+
+        # one tree per distinct starting island
+        trees = {}
+        for start, _ in queries:
+            if start not in trees:
+                trees[start] = self.shortest_path_tree(start)
+
+        results = []
+        for start, goal in queries:
+            cost, parent, reached = trees[start]
+            state = chart.ids[goal]
+
+            # uniform_cost_search would have run out of islands without finding the treasure
+            if state not in reached:
+                results.append(([], 0, len(cost)))
+                continue
+
+            path, expanded = [], reached[state]
+            while state is not None:
+                path.append(state)
+                state = parent[state]
+            results.append((chart.path(path[::-1]), int(cost[chart.ids[goal]]), expanded))
+
+        if not distance_matrix:
+            return results
+
+        matrix = {start: {chart.names[i]: int(c) for i, c in tree[0].items()} for start, tree in trees.items()}
+        return results, matrix
+
+def advance(steps: Iterator[dict], n: int) -> dict:
+    '''
+    Runs up to n steps of a streamed search, stopping early at the last one
+
+    Parameters:
+        steps (Iterator[dict]): the streamed search, from Captain.stream
+        n (int): the most steps to run
+
+    Returns:
+        dict: the event of the last step that ran
+    '''
+
+    for _, event in zip(range(n), steps):
+        if event['done']:
+            break
+    return event
+
+class Planner:
+    def __init__(self, captain: Captain, starting_island_name: str, treasure_island_name: str, hunch: Optional[Hunch] = None) -> None:
+        '''
+        Initialize an incremental planner (Lifelong Planning A*) between two islands of a captain's map.
+        Every island keeps its cost g, and a one-step lookahead rhs from the costs of the islands that lead to it.
+        Only islands where the two disagree are put back on the frontier, so after a route changes
+        the next plan only expands the islands whose cheapest path actually changed.
+
+        Parameters:
+            captain (Captain): The captain whose map to plan on. Route changes must go through this planner.
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island.
+            hunch (Hunch): A consistent hunch to focus the search. If None, every estimate is 0.
+        '''
+
+        self.captain = captain
+        self.start = captain.chart.ids[starting_island_name]
+        self.goal = captain.chart.ids[treasure_island_name]
+        self.h = captain.hunch_by_id(hunch, treasure_island_name) if hunch is not None else (lambda n: 0)
+
+        self.g = {} # the cost of every island as of its last expansion, inf if missing
+        self.rhs = {self.start: 0} # the one-step lookahead cost of every island, inf if missing
+        self.frontier = HeapFrontier() # the islands whose g and rhs disagree
+        self.frontier.push(self.start, self.key(self.start), None)
+        self.expanded = 0 # the number of islands expanded over the planner's lifetime
+
+    def key(self, state: int) -> Tuple[float, float]:
+        '''
+        Helper function that orders an island on the frontier: by f(n) first, then by g(n)
+
+        Parameters:
+            self
+            state (int): the island id
+
+        Returns:
+            Tuple[float, float]: the priority of the island
+        '''
+
+        cost = min(self.g.get(state, float('inf')), self.rhs.get(state, float('inf')))
+        return (cost + self.h(state), cost)
+
+    def update(self, state: int) -> None:
+        '''
+        Helper function that recomputes the lookahead cost of an island and puts it on the frontier if it is inconsistent
+
+        Parameters:
+            self
+            state (int): the island id
+        '''
+
+        g = self.g
+        if state != self.start:
+            reverse = self.captain.chart.reverse()
+            self.rhs[state] = min((g.get(p, float('inf')) + c for p, c in reverse.routes(state)), default=float('inf'))
+
+        if state in self.frontier:
+            self.frontier.remove(state)
+        if g.get(state, float('inf')) != self.rhs.get(state, float('inf')):
+            self.frontier.push(state, self.key(state), None)
+
+    def plan(self) -> Tuple[List[str], int, int]:
+        '''
+        Repairs the search after any route changes and returns the current cheapest path
+
+        Parameters:
+            self
+
+        Returns:
+            List[str]: A list of island names representing the path taken from the starting island to the treasure island. If no valid path exists, return an empty list.
+            int: The cost of the path. If no valid path exits, return 0.
+            int: The number of islands (nodes) expanded by this call.
+        '''
+
+        chart, g, rhs, frontier, goal = self.captain.chart, self.g, self.rhs, self.frontier, self.goal
+        inf = float('inf')
+        expanded = 0
+
+        while frontier and (frontier.peek() < self.key(goal) or rhs.get(goal, inf) != g.get(goal, inf)):
+            state, _ = frontier.pop()
+            expanded += 1
+
+            if g.get(state, inf) > rhs.get(state, inf):
+                # the island got cheaper, settle it
+                g[state] = rhs[state]
+                for neighbor, _ in chart.routes(state):
+                    self.update(neighbor)
+            else:
+                # the island got more expensive, reopen it and everything that depended on it
+                g[state] = inf
+                self.update(state)
+                for neighbor, _ in chart.routes(state):
+                    self.update(neighbor)
+
+        self.expanded += expanded
+
+        if g.get(goal, inf) == inf:
+            return [], 0, expanded
+
+        # walk back from the treasure island, always to the island the cheapest path came from
+        reverse = chart.reverse()
+        path, state = [goal], goal
+        while state != self.start:
+            state = min(reverse.routes(state), key=lambda route: g.get(route[0], inf) + route[1])[0]
+            path.append(state)
+
+        return chart.path(path[::-1]), int(g[goal]), expanded
+
+    def update_route(self, origin: str, destination: str, travel_cost: float) -> None:
+        '''
+        Sets the cost of a route on the captain's map, adding the route if it doesn't exist yet
+
+        Parameters:
+            self
+            origin (str): the name of the island the route leaves from
+            destination (str): the name of the island the route arrives at
+            travel_cost (float): the cost to sail the route
+        '''
+
+        # check before anything changes, so that a rejected route leaves the map and the planner as they were
+        ids = self.captain.chart.ids
+        if origin not in ids or destination not in ids:
+            raise ValueError('routes to new islands need a new planner')
+
+        self.captain.update_route(origin, destination, travel_cost)
+        self.update(ids[destination])
+
+    def close_route(self, origin: str, destination: str) -> None:
+        '''
+        Removes a route from the captain's map
+
+        Parameters:
+            self
+            origin (str): the name of the island the route leaves from
+            destination (str): the name of the island the route arrives at
+        '''
+
+        self.captain.close_route(origin, destination)
+        self.update(self.captain.chart.ids[destination]) # only the island the route led to can lose its lookahead cost
@@ -0,0 +1,165 @@
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+class Chart:
+    def __init__(self, map: Dict) -> None:
+        '''
+        Compile the map (graph) into a compact chart that the search algorithms can run on.
+        Every island gets an integer id, and the routes are stored in compressed sparse row (CSR) form:
+        the routes leaving island i are targets[offsets[i]:offsets[i + 1]] with costs weights[offsets[i]:offsets[i + 1]].
+
+        Parameters:
+            map (Map): The map (a graph), including all known islands and routes.
+        '''
+
+        # islands get ids in the order they appear on the map, followed by any island that only appears in a route
+        self.names: List[str] = list(map['islands'])
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+        for origin, destinations in map['routes'].items():
+            for name in (origin, *destinations):
+                if name not in self.ids:
+                    self.ids[name] = len(self.names)
+                    self.names.append(name)
+
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+        self.weights = array('d')
+
+        # the routes of every island are kept in the same order as in the map so that ties are broken the same way
+        for name in self.names:
+            for destination, travel_cost in map['routes'].get(name, {}).items():
+                self.targets.append(self.ids[destination])
+                self.weights.append(travel_cost)
+            self.offsets.append(len(self.targets))
+
+        self.reversed = None # the chart with every route turned around, built the first time it is needed
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def routes(self, i: int) -> Iterator[Tuple[int, float]]:
+        '''
+        Provides all the routes leaving an island
+
+        Parameters:
+            self
+            i (int): the id of the island
+
+        Returns:
+            Iterator[Tuple[int, float]]: the id of every destination island and the cost to sail there
+        '''
+
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return zip(self.targets[lo:hi], self.weights[lo:hi])
+
+    def reverse(self) -> 'Chart':
+        '''
+        Provides the chart with every route turned around, so that searching it from an island
+        finds the routes that lead to that island
+
+        Parameters:
+            self
+
+        Returns:
+            Chart: the reversed chart, which shares its island ids with this chart
+        '''
+
+        if self.reversed is None:
+            # bucket every route by its destination, keeping the original order within each bucket
+            incoming = [[] for _ in self.names]
+            for origin in range(len(self.names)):
+                for destination, travel_cost in self.routes(origin):
+                    incoming[destination].append((origin, travel_cost))
+
+            reversed_chart = Chart.__new__(Chart)
+            reversed_chart.names, reversed_chart.ids = self.names, self.ids
+            reversed_chart.offsets, reversed_chart.targets, reversed_chart.weights = array('l', [0]), array('l'), array('d')
+            for routes in incoming:
+                for origin, travel_cost in routes:
+                    reversed_chart.targets.append(origin)
+                    reversed_chart.weights.append(travel_cost)
+                reversed_chart.offsets.append(len(reversed_chart.targets))
+
+            reversed_chart.reversed = self
+            self.reversed = reversed_chart
+
+        return self.reversed
+
+    def set_weight(self, origin: int, destination: int, travel_cost: float) -> bool:
+        '''
+        Changes the cost of an existing route in place, in this chart and in its reverse if it has been built
+
+        Parameters:
+            self
+            origin (int): the id of the island the route leaves from
+            destination (int): the id of the island the route arrives at
+            travel_cost (float): the new cost of the route
+
+        Returns:
+            bool: False if there is no such route, in which case the chart has to be compiled again
+        '''
+
+        for chart, i, j in ((self, origin, destination), (self.reversed, destination, origin)):
+            if chart is None:
+                continue
+
+            lo, hi = chart.offsets[i], chart.offsets[i + 1]
+            for k in range(lo, hi):
+                if chart.targets[k] == j:
+                    chart.weights[k] = travel_cost
+                    break
+            else:
+                return False
+
+        return True
+
+    def remove_route(self, origin: int, destination: int) -> bool:
+        '''
+        Removes an existing route in place, in this chart and in its reverse if it has been built.
+        Only the routes after it shift down, so this is much cheaper than compiling the chart again.
+
+        Parameters:
+            self
+            origin (int): the id of the island the route leaves from
+            destination (int): the id of the island the route arrives at
+
+        Returns:
+            bool: False if there is no such route, in which case nothing is changed
+        '''
+
+        # find the route in both charts before changing either of them
+        found = []
+        for chart, i, j in ((self, origin, destination), (self.reversed, destination, origin)):
+            if chart is None:
+                continue
+
+            lo, hi = chart.offsets[i], chart.offsets[i + 1]
+            k = next((k for k in range(lo, hi) if chart.targets[k] == j), None)
+            if k is None:
+                return False
+            found.append((chart, i, k))
+
+        for chart, i, k in found:
+            del chart.targets[k]
+            del chart.weights[k]
+            offsets = chart.offsets
+            for n in range(i + 1, len(offsets)):
+                offsets[n] -= 1
+
+        return True
+
+    def path(self, ids: List[int]) -> List[str]:
+        '''
+        Translates a path of island ids back into island names
+
+        Parameters:
+            self
+            ids (List[int]): the ids of the islands along the path
+
+        Returns:
+            List[str]: the names of the islands along the path
+        '''
+
+        names = self.names
+        return [names[i] for i in ids]
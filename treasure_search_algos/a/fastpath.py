@@ -0,0 +1,114 @@
+'''
+Specialized loops for the best-first searches, used by Captain unless it is built with fast=False or has a probe.
+They find exactly what Captain.best_first_search_by_id finds with a HeapFrontier, islands reached, reopened and ties included,
+with less work per island: the heap holds plain tuples instead of frontier entries, and routes are sliced straight out of the chart's CSR arrays.
+
+Every push is its own entry, (priority, insertion order, island, path cost), so ties go to the earliest push as with HeapFrontier.
+An entry is skipped when its island was already expanded at a path cost no higher than the entry's; every other entry is expanded,
+so an island reached more cheaply after it was expanded is expanded again. Each entry keeps the entry it was pushed from as its parent.
+'''
+
+from heapq import heappop, heappush
+from typing import Callable, Iterable, List, Set, Tuple, Union
+from chart import Chart
+
+def goal_ids(chart: Chart, goal: Union[str, Iterable[str]]) -> Set[int]:
+    return {chart.ids[goal]} if isinstance(goal, str) else {chart.ids[name] for name in goal}
+
+def best_first_search(chart: Chart, start: str, goal: Union[str, Iterable[str]], priority: Callable[[int, float], float]) -> Tuple[List[str], int, int]:
+    '''
+    The loop behind every search in this module
+
+    Parameters:
+        chart (Chart): the chart to search
+        start (str): the name of the starting island
+        goal (str): the name of the goal island, or a collection of names if any of them will do
+        priority (Callable[[int, float], float]): the evaluation function (f(n)), from an island id and its path cost (g(n))
+
+    Returns:
+        tuple[list[str], int, int]: the path, its cost, and the number of islands reached
+    '''
+
+    offsets, targets, weights = chart.offsets, chart.targets, chart.weights
+    goals = goal_ids(chart, goal)
+    start = chart.ids[start]
+
+    cost = {start: 0}
+    parent = {(start, 0): None} # the entry every entry was pushed from
+    expanded = {} # the path cost every island was last expanded at
+    heap = [(priority(start, 0), 0, start, 0)]
+    pushes = 1
+
+    while heap:
+        _, _, state, g = heappop(heap)
+        if expanded.get(state, g + 1) <= g:
+            continue
+        expanded[state] = g
+        node = (state, g)
+
+        if state in goals:
+            path = []
+            while node is not None:
+                path.append(node[0])
+                node = parent[node]
+            return chart.path(path[::-1]), int(g), len(cost)
+
+        lo, hi = offsets[state], offsets[state + 1]
+        for neighbor, travel_cost in zip(targets[lo:hi], weights[lo:hi]):
+            new_cost = g + travel_cost
+            old = cost.get(neighbor)
+            if old is None or new_cost < old:
+                cost[neighbor] = new_cost
+                parent[(neighbor, new_cost)] = node
+                heappush(heap, (priority(neighbor, new_cost), pushes, neighbor, new_cost))
+                pushes += 1
+
+    return [], 0, len(cost)
+
+def uniform_cost_search(chart: Chart, start: str, goal: Union[str, Iterable[str]]) -> Tuple[List[str], int, int]:
+    '''
+    Uniform cost search, where the priority is the path cost itself
+
+    Parameters:
+        chart (Chart): the chart to search
+        start (str): the name of the starting island
+        goal (str): the name of the goal island, or a collection of names if any of them will do
+
+    Returns:
+        tuple[list[str], int, int]: the path, its cost, and the number of islands reached
+    '''
+
+    return best_first_search(chart, start, goal, lambda n, g: g)
+
+def greedy_best_first_search(chart: Chart, start: str, goal: Union[str, Iterable[str]], h: Callable[[int], float]) -> Tuple[List[str], int, int]:
+    '''
+    Greedy best-first search, where the priority is the hunch alone
+
+    Parameters:
+        chart (Chart): the chart to search
+        start (str): the name of the starting island
+        goal (str): the name of the goal island, or a collection of names if any of them will do
+        h (Callable[[int], float]): the estimated cost from an island id to the goal
+
+    Returns:
+        tuple[list[str], int, int]: the path, its cost, and the number of islands reached
+    '''
+
+    return best_first_search(chart, start, goal, lambda n, g: h(n))
+
+def a_star_search(chart: Chart, start: str, goal: Union[str, Iterable[str]], h: Callable[[int], float], stubbornness: float) -> Tuple[List[str], int, int]:
+    '''
+    A* search, where the priority is the path cost plus stubbornness times the hunch
+
+    Parameters:
+        chart (Chart): the chart to search
+        start (str): the name of the starting island
+        goal (str): the name of the goal island, or a collection of names if any of them will do
+        h (Callable[[int], float]): the estimated cost from an island id to the goal
+        stubbornness (float): the heuristic weight
+
+    Returns:
+        tuple[list[str], int, int]: the path, its cost, and the number of islands reached
+    '''
+
+    return best_first_search(chart, start, goal, lambda n, g: g + stubbornness * h(n))
@@ -0,0 +1,136 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from hunch import Hunch
+from captain import Captain
+
+# the captain and hunch of the current worker process, built once by its initializer
+captain = None
+hunch = None
+
+ALGORITHMS = ('uniform_cost_search', 'greedy_best_first_search', 'a_star_search')
+
+def board(map: Dict, hunch_class: type) -> None:
+    '''
+    Worker initializer: builds the worker's captain and hunch from the map, once per process
+
+    Parameters:
+        map (Map): The map (a graph), including all known islands and routes.
+        hunch_class (type): the class of the hunch to build from the map
+    '''
+
+    global captain, hunch
+    captain = Captain(map)
+    hunch = hunch_class(map) if hunch_class is not None else None
+
+def sail(query: Tuple) -> tuple:
+    '''
+    Runs a single query with this process's captain
+
+    Parameters:
+        query (Tuple): (algorithm, starting island name, treasure island name), with the stubbornness added for a_star_search
+
+    Returns:
+        tuple[list[str], int, int]: the path, its cost, and the number of islands visited
+    '''
+
+    algorithm, start, goal, *stubbornness = query
+
+    if algorithm == 'uniform_cost_search':
+        return captain.uniform_cost_search(start, goal)
+    if algorithm == 'greedy_best_first_search':
+        return captain.greedy_best_first_search(start, goal, hunch)
+    return captain.a_star_search(start, goal, hunch, *stubbornness)
+
+def sail_chunk(chunk: List[Tuple[int, Tuple]]) -> List[Tuple[int, tuple]]:
+    '''
+    Runs a chunk of queries in a worker process
+
+    Parameters:
+        chunk (List[Tuple[int, Tuple]]): the queries, each with its position in the batch
+
+    Returns:
+        List[Tuple[int, tuple]]: the result of each query, with its position in the batch
+    '''
+
+    return [(i, sail(query)) for i, query in chunk]
+
+class Fleet:
+    def __init__(self, map: Dict, hunch_class: Optional[type] = Hunch, workers: Optional[int] = None, chunksize: int = 16) -> None:
+        '''
+        Initialize a fleet of captains that answer independent search queries in parallel worker processes.
+        The map is handed to every worker once, when the worker starts, and each worker keeps its own Captain and hunch.
+        An Atlas is handed over as the name of its file, which every worker maps into memory, so they all share one copy of the routes.
+
+        Parameters:
+            map (Map): The map (a graph), including all known islands and routes, or an Atlas.
+            hunch_class (type): The hunch every worker builds from the map, e.g. Hunch. It must be importable by the workers.
+            workers (int): The number of worker processes, defaults to the number of CPUs.
+            chunksize (int): The number of queries sent to a worker at a time.
+        '''
+
+        self.chunksize = chunksize
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=board, initargs=(map, hunch_class))
+
+    def __enter__(self) -> 'Fleet':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''
+        Shut down the worker processes
+
+        Parameters:
+            self
+        '''
+
+        self.pool.shutdown()
+
+    def run(self, queries: Iterable[Tuple], ordered: bool = True) -> Iterator:
+        '''
+        Runs a batch of queries in the worker processes.
+        Every query is checked before any of them is sent, so a bad query fails the whole batch before any work starts.
+        Every search is deterministic, so in ordered mode the results are exactly those of running the queries one after another.
+
+        Parameters:
+            queries (Iterable[Tuple]): (algorithm, starting island name, treasure island name) tuples,
+                with the stubbornness added for a_star_search. The algorithm is the name of a Captain search method.
+            ordered (bool): Yield results in the order of the queries. Otherwise yield (position, result) pairs as soon as their chunk is done.
+
+        Returns:
+            Iterator: the (path, cost, expanded) result of every query, or (position, result) pairs when not ordered
+        '''
+
+        queries = [tuple(query) for query in queries]
+        for query in queries:
+            if not query or query[0] not in ALGORITHMS:
+                raise ValueError(f'unknown search algorithm: {query[0] if query else None}')
+            if len(query) != (4 if query[0] == 'a_star_search' else 3):
+                raise ValueError(f'{query[0]} takes a starting island and a treasure island' + (' and a stubbornness' if query[0] == 'a_star_search' else '') + f', not {query[1:]}')
+
+        # chunks hold consecutive queries
+        chunks = [list(enumerate(queries))[i:i + self.chunksize] for i in range(0, len(queries), self.chunksize)]
+        futures = [self.pool.submit(sail_chunk, chunk) for chunk in chunks]
+        return self.results(futures, ordered)
+
+    def results(self, futures: List, ordered: bool) -> Iterator:
+        '''
+        Helper function for run that yields the results of the chunks sent to the workers
+
+        Parameters:
+            futures (List[Future]): the chunks, in the order of their queries
+            ordered (bool): Yield results in the order of the queries, otherwise (position, result) pairs as soon as their chunk is done.
+
+        Returns:
+            Iterator: the results
+        '''
+
+        if ordered:
+            # waiting on the chunks in submission order keeps the results in order
+            for future in futures:
+                for _, result in future.result():
+                    yield result
+        else:
+            for future in as_completed(futures):
+                yield from future.result()
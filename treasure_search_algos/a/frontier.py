@@ -0,0 +1,298 @@
+import heapq
+import itertools
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+class HeapFrontier:
+    def __init__(self) -> None:
+        '''
+        Initialize a binary heap frontier that uses lazy deletion.
+        Pushing a key that is already on the frontier does not remove the old entry,
+        it only marks it as stale so that it gets skipped when it reaches the top of the heap.
+
+        Parameters:
+            self
+        '''
+
+        self.heap = [] # entries are [priority, insertion order, key, item]
+        self.entries = {} # the live entry for every key on the frontier
+        self.counter = itertools.count() # breaks ties between equal priorities in insertion order
+        self.stale = 0 # number of stale entries skipped so far
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.entries
+
+    def __iter__(self) -> Iterator[Any]:
+        # the keys on the frontier, in no particular order
+        return iter(self.entries)
+
+    def reprioritize(self, priority: Callable[[Any, Any], float]) -> None:
+        '''
+        Give every item on the frontier a new priority at once, e.g. after the evaluation function changed.
+        The heap is rebuilt from the live entries in one pass, which also drops every stale entry.
+
+        Parameters:
+            self
+            priority (Callable[[Any, Any], float]): the new priority of an item, from its key and the item
+        '''
+
+        self.heap = [[priority(key, item), next(self.counter), key, item] for _, _, key, item in self.entries.values()]
+        heapq.heapify(self.heap)
+        self.entries = {entry[2]: entry for entry in self.heap}
+
+    def remove(self, key: Any) -> None:
+        '''
+        Take a key off the frontier; its entry stays in the heap and is skipped as stale
+
+        Parameters:
+            self
+            key: the state to remove
+        '''
+
+        del self.entries[key]
+
+    def push(self, key: Any, priority: float, item: Any) -> None:
+        '''
+        Add an item to the frontier, or replace the item already stored under the same key
+
+        Parameters:
+            self
+            key: the state the item belongs to
+            priority (float): the evaluation function value (f(n)) of the item
+            item: the item stored on the frontier
+        '''
+
+        entry = [priority, next(self.counter), key, item]
+        self.entries[key] = entry
+        heapq.heappush(self.heap, entry)
+
+    def peek(self) -> float:
+        '''
+        Return the lowest priority of any live item on the frontier, without removing it
+
+        Parameters:
+            self
+
+        Returns:
+            float: the lowest priority on the frontier
+        '''
+
+        # drop stale entries from the top so that the root is live
+        while self.heap and self.entries.get(self.heap[0][2]) is not self.heap[0]:
+            heapq.heappop(self.heap)
+            self.stale += 1
+
+        if not self.heap:
+            raise IndexError('peek at an empty frontier')
+        return self.heap[0][0]
+
+    def pop(self) -> Tuple[Any, Any]:
+        '''
+        Remove the live item with the lowest priority from the frontier
+
+        Parameters:
+            self
+
+        Returns:
+            tuple[Any, Any]: the key and the item with the lowest priority
+        '''
+
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            _, _, key, item = entry
+
+            # skip entries that were replaced after they were pushed
+            if self.entries.get(key) is not entry:
+                self.stale += 1
+                continue
+
+            del self.entries[key]
+            return key, item
+
+        raise IndexError('pop from an empty frontier')
+
+class IndexedHeapFrontier:
+    def __init__(self) -> None:
+        '''
+        Initialize a binary heap frontier that supports decrease-key.
+        Every key is stored at most once, and its position in the heap is tracked
+        so that its priority can be changed in place instead of pushing a duplicate.
+
+        Parameters:
+            self
+        '''
+
+        self.heap: List[list] = [] # entries are [priority, insertion order, key, item]
+        self.position: Dict[Any, int] = {} # index of every key's entry in the heap
+        self.counter = itertools.count()
+        self.stale = 0 # always 0, kept so both frontiers report the same counters
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __bool__(self) -> bool:
+        return bool(self.heap)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.position
+
+    def __iter__(self) -> Iterator[Any]:
+        # the keys on the frontier, in no particular order
+        return iter(self.position)
+
+    def reprioritize(self, priority: Callable[[Any, Any], float]) -> None:
+        '''
+        Give every item on the frontier a new priority at once, e.g. after the evaluation function changed.
+        The heap is rebuilt in one pass instead of moving every entry on its own.
+
+        Parameters:
+            self
+            priority (Callable[[Any, Any], float]): the new priority of an item, from its key and the item
+        '''
+
+        self.heap = [[priority(key, item), next(self.counter), key, item] for _, _, key, item in self.heap]
+        heapq.heapify(self.heap)
+        self.position = {entry[2]: i for i, entry in enumerate(self.heap)}
+
+    def remove(self, key: Any) -> None:
+        '''
+        Take a key off the frontier, filling its place with the last entry of the heap
+
+        Parameters:
+            self
+            key: the state to remove
+        '''
+
+        i = self.position.pop(key)
+        last = self.heap.pop()
+
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.position[last[2]] = i
+            self.sift_up(i)
+            self.sift_down(self.position[last[2]])
+
+    def push(self, key: Any, priority: float, item: Any) -> None:
+        '''
+        Add an item to the frontier, or update the priority and item already stored under the same key.
+        An updated entry is ordered as if it had just been pushed, the same as in HeapFrontier.
+
+        Parameters:
+            self
+            key: the state the item belongs to
+            priority (float): the evaluation function value (f(n)) of the item
+            item: the item stored on the frontier
+        '''
+
+        entry = [priority, next(self.counter), key, item]
+
+        if key in self.position:
+            # replace the old entry in place, then move it whichever way the heap needs
+            i = self.position[key]
+            self.heap[i] = entry
+            self.sift_up(i)
+            self.sift_down(self.position[key])
+        else:
+            self.heap.append(entry)
+            self.position[key] = len(self.heap) - 1
+            self.sift_up(len(self.heap) - 1)
+
+    def peek(self) -> float:
+        '''
+        Return the lowest priority on the frontier, without removing it
+
+        Parameters:
+            self
+
+        Returns:
+            float: the lowest priority on the frontier
+        '''
+
+        if not self.heap:
+            raise IndexError('peek at an empty frontier')
+        return self.heap[0][0]
+
+    def pop(self) -> Tuple[Any, Any]:
+        '''
+        Remove the item with the lowest priority from the frontier
+
+        Parameters:
+            self
+
+        Returns:
+            tuple[Any, Any]: the key and the item with the lowest priority
+        '''
+
+        if not self.heap:
+            raise IndexError('pop from an empty frontier')
+
+        top = self.heap[0]
+        last = self.heap.pop()
+        del self.position[top[2]]
+
+        # move the last entry to the root and let it sink back down
+        if self.heap:
+            self.heap[0] = last
+            self.position[last[2]] = 0
+            self.sift_down(0)
+
+        return top[2], top[3]
+
+    def sift_up(self, i: int) -> None:
+        '''
+        Move the entry at index i up until its parent is no larger than it
+
+        Parameters:
+            self
+            i (int): the index of the entry in the heap
+        '''
+
+        heap, position = self.heap, self.position
+        entry = heap[i]
+
+        while i > 0:
+            parent = (i - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[i] = heap[parent]
+            position[heap[i][2]] = i
+            i = parent
+
+        heap[i] = entry
+        position[entry[2]] = i
+
+    def sift_down(self, i: int) -> None:
+        '''
+        Move the entry at index i down until both of its children are no smaller than it
+
+        Parameters:
+            self
+            i (int): the index of the entry in the heap
+        '''
+
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[i]
+
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+
+            # pick the smaller of the two children
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+
+            heap[i] = heap[child]
+            position[heap[i][2]] = i
+            i = child
+
+        heap[i] = entry
+        position[entry[2]] = i
@@ -0,0 +1,279 @@
+import heapq
+from typing import Any, Dict, List, Tuple
+
+class Hierarchy:
+    def __init__(self, captain: Any, witness_limit: int = 64) -> None:
+        '''
+        Initialize a contraction hierarchy for a captain's map.
+        Islands are contracted one at a time, least important first. Whenever removing an island would
+        lengthen the cheapest path between two of its neighbors, a shortcut route is added between them.
+        A query then only has to search upwards in importance from both ends, which touches very few islands.
+
+        Parameters:
+            captain (Captain): The captain whose map (and compiled chart) the hierarchy is built for.
+            witness_limit (int): The number of islands a witness search may expand before giving up and adding the shortcut.
+        '''
+
+        chart = captain.chart
+        self.map = captain.map
+        self.names, self.ids = chart.names, chart.ids
+        size = len(chart)
+
+        # the remaining graph, as {neighbor: cost} in both directions; parallel routes keep the cheapest
+        out: List[Dict[int, float]] = [{} for _ in range(size)]
+        into: List[Dict[int, float]] = [{} for _ in range(size)]
+        for origin in range(size):
+            for destination, travel_cost in chart.routes(origin):
+                if destination != origin and travel_cost < out[origin].get(destination, float('inf')):
+                    out[origin][destination] = into[destination][origin] = travel_cost
+
+        # every route of the hierarchy, original or shortcut, as {(origin, destination): (cost, middle island or None)}
+        self.edges: Dict[Tuple[int, int], Tuple[float, Any]] = {(u, w): (c, None) for u in range(size) for w, c in out[u].items()}
+
+        self.rank = [0] * size
+        deleted = [0] * size # the number of contracted neighbors, which spreads contraction evenly over the map
+
+        order = [(self.importance(v, out, into, deleted, witness_limit), v) for v in range(size)]
+        heapq.heapify(order)
+
+        for rank in range(size):
+            # lazy updates: recompute the importance of the top island and put it back if it is no longer the least important
+            while True:
+                _, v = heapq.heappop(order)
+                importance = self.importance(v, out, into, deleted, witness_limit)
+                if not order or importance <= order[0][0]:
+                    break
+                heapq.heappush(order, (importance, v))
+
+            for u, w, via in self.shortcuts(v, out, into, witness_limit):
+                out[u][w] = into[w][u] = via
+                self.edges[(u, w)] = (via, v)
+
+            # take the island out of the remaining graph
+            for u in into[v]:
+                del out[u][v]
+                deleted[u] += 1
+            for w in out[v]:
+                del into[w][v]
+                deleted[w] += 1
+            out[v], into[v] = {}, {}
+
+            self.rank[v] = rank
+
+        self.compile()
+
+    @staticmethod
+    def shortcuts(v: int, out: List[Dict[int, float]], into: List[Dict[int, float]], witness_limit: int) -> List[Tuple[int, int, float]]:
+        '''
+        Finds the shortcuts needed to contract an island: for every pair of neighbors u -> v -> w,
+        a shortcut is needed unless a witness search finds a path from u to w around v that is no more expensive
+
+        Parameters:
+            v (int): the id of the island to contract
+            out (List[Dict[int, float]]): the routes leaving every island in the remaining graph
+            into (List[Dict[int, float]]): the routes arriving at every island in the remaining graph
+            witness_limit (int): the number of islands a witness search may expand
+
+        Returns:
+            List[Tuple[int, int, float]]: (origin, destination, cost) of every shortcut
+        '''
+
+        needed = []
+
+        for u, cost_in in into[v].items():
+            targets = {w: cost_in + cost_out for w, cost_out in out[v].items() if w != u}
+            if not targets:
+                continue
+
+            # a bounded search from u that is not allowed to go through v
+            limit = max(targets.values())
+            cost = {u: 0}
+            frontier = [(0, u)]
+            expanded = 0
+
+            while frontier and expanded < witness_limit:
+                g, state = heapq.heappop(frontier)
+                if g > cost[state] or g > limit:
+                    continue
+                expanded += 1
+
+                for neighbor, travel_cost in out[state].items():
+                    if neighbor != v and g + travel_cost < cost.get(neighbor, float('inf')):
+                        cost[neighbor] = g + travel_cost
+                        heapq.heappush(frontier, (g + travel_cost, neighbor))
+
+            for w, via in targets.items():
+                if cost.get(w, float('inf')) > via:
+                    needed.append((u, w, via))
+
+        return needed
+
+    def importance(self, v: int, out: List[Dict[int, float]], into: List[Dict[int, float]], deleted: List[int], witness_limit: int) -> int:
+        '''
+        Scores how important an island is to keep: the shortcuts its contraction would add,
+        less the routes it would remove, plus how many of its neighbors are already contracted
+
+        Parameters:
+            self
+            v (int): the id of the island
+            out (List[Dict[int, float]]): the routes leaving every island in the remaining graph
+            into (List[Dict[int, float]]): the routes arriving at every island in the remaining graph
+            deleted (List[int]): the number of contracted neighbors of every island
+            witness_limit (int): the number of islands a witness search may expand
+
+        Returns:
+            int: the importance, islands with a lower importance are contracted first
+        '''
+
+        return len(self.shortcuts(v, out, into, witness_limit)) - len(out[v]) - len(into[v]) + deleted[v]
+
+    def compile(self) -> None:
+        '''
+        Splits the routes of the hierarchy into the upward routes the forward search follows
+        and the (reversed) downward routes the backward search follows
+
+        Parameters:
+            self
+        '''
+
+        rank = self.rank
+        self.up: List[List[Tuple[int, float]]] = [[] for _ in rank]
+        self.down: List[List[Tuple[int, float]]] = [[] for _ in rank]
+
+        for (u, w), (cost, _) in self.edges.items():
+            if rank[w] > rank[u]:
+                self.up[u].append((w, cost))
+            else:
+                self.down[w].append((u, cost))
+
+    def unpack(self, u: int, w: int) -> List[int]:
+        '''
+        Expands a route of the hierarchy back into the islands of the original map it stands for
+
+        Parameters:
+            self
+            u (int): the id of the origin island
+            w (int): the id of the destination island
+
+        Returns:
+            List[int]: the islands after u, up to and including w
+        '''
+
+        _, middle = self.edges[(u, w)]
+        if middle is None:
+            return [w]
+        return self.unpack(u, middle) + self.unpack(middle, w)
+
+    def route(self, starting_island_name: str, treasure_island_name: str) -> Tuple[List[str], int, int]:
+        '''
+        Finds the cheapest path between two islands with an upward search from each end
+
+        Parameters:
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island.
+
+        Returns:
+            List[str]: A list of island names representing the path taken from the starting island to the treasure island. If no valid path exists, return an empty list.
+            int: The cost of the path. If no valid path exits, return 0.
+            int: The number of islands (nodes) visited by either search.
+        '''
+
+        start, goal = self.ids[starting_island_name], self.ids[treasure_island_name]
+
+        # each side is (routes to follow, cost, parent, frontier)
+        forward = (self.up, {start: 0}, {start: None}, [(0, start)])
+        backward = (self.down, {goal: 0}, {goal: None}, [(0, goal)])
+        best, meeting = float('inf'), None
+
+        # alternate between the two sides; each stops once it can't improve on the best meeting point
+        while forward[3] or backward[3]:
+            for routes, cost, parent, frontier in (forward, backward):
+                if not frontier:
+                    continue
+
+                g, state = heapq.heappop(frontier)
+                if g >= best:
+                    frontier.clear()
+                    continue
+                if g > cost[state]:
+                    continue
+
+                other_cost = backward[1] if cost is forward[1] else forward[1]
+                if state in other_cost and g + other_cost[state] < best:
+                    best, meeting = g + other_cost[state], state
+
+                for neighbor, travel_cost in routes[state]:
+                    if g + travel_cost < cost.get(neighbor, float('inf')):
+                        cost[neighbor] = g + travel_cost
+                        parent[neighbor] = state
+                        heapq.heappush(frontier, (g + travel_cost, neighbor))
+
+        visited = len(forward[1].keys() | backward[1].keys())
+        if meeting is None:
+            return [], 0, visited
+
+        # the hierarchy path from the start up to the meeting island and back down to the treasure island
+        ups, state = [], meeting
+        while state is not None:
+            ups.append(state)
+            state = forward[2][state]
+        ups.reverse()
+
+        downs, state = [meeting], backward[2][meeting]
+        while state is not None:
+            downs.append(state)
+            state = backward[2][state]
+
+        hops = ups + downs[1:]
+        path = [start]
+        for u, w in zip(hops, hops[1:]):
+            path += self.unpack(u, w)
+
+        return [self.names[i] for i in path], int(best), visited
+
+    def save(self, path: str) -> None:
+        '''
+        Write the hierarchy to disk, so that it only has to be built once per map
+
+        Parameters:
+            path (str): the .npz file to write
+        '''
+
+        import numpy as np
+
+        origins, destinations = zip(*self.edges) if self.edges else ((), ())
+        costs, middles = zip(*self.edges.values()) if self.edges else ((), ())
+        np.savez_compressed(path, names=np.array(self.names), rank=np.array(self.rank, dtype=np.int64),
+                            origins=np.array(origins, dtype=np.int64), destinations=np.array(destinations, dtype=np.int64),
+                            costs=np.array(costs, dtype=np.float64),
+                            middles=np.array([-1 if m is None else m for m in middles], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: str, captain: Any) -> 'Hierarchy':
+        '''
+        Read a hierarchy written by save for the same map
+
+        Parameters:
+            path (str): the .npz file to read
+            captain (Captain): the captain whose map the hierarchy was built for
+
+        Returns:
+            Hierarchy: the hierarchy, ready to answer routes
+        '''
+
+        import numpy as np
+
+        with np.load(path) as data:
+            if data['names'].tolist() != captain.chart.names:
+                raise ValueError(f'{path} was built for a different map')
+
+            hierarchy = cls.__new__(cls)
+            hierarchy.map, hierarchy.names, hierarchy.ids = captain.map, captain.chart.names, captain.chart.ids
+            hierarchy.rank = data['rank'].tolist()
+            hierarchy.edges = {
+                (u, w): (c, None if m < 0 else m)
+                for u, w, c, m in zip(data['origins'].tolist(), data['destinations'].tolist(), data['costs'].tolist(), data['middles'].tolist())
+            }
+
+        hierarchy.compile()
+        return hierarchy
@@ -1,17 +1,156 @@
 import math
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+# the most per-goal tables a hunch keeps at a time
+TABLES = 8
 
 class Hunch:
-    def __init__(self, map: Dict) -> None:
+    def __init__(self, map: Dict, precompute: bool = False) -> None:
         '''
         Initialize the hunch (the heuristic) with access to the treasure map.
         Use this map to help calculate heuristic values, i.e., estimate the cost to reach the treasure (the goal).
 
         Parameters:
             map (Map): The map (a graph), including all known islands and routes.
+            precompute (bool): Encode the islands into NumPy arrays up front, and answer every estimate from a per-goal table.
         '''
         self.map = map
-        ##raise NotImplementedError()
+
+        # islands are numbered in map order, the same ids the Chart gives them
+        self.ids = {name: i for i, name in enumerate(map['islands'])}
+
+        # (latitude, longitude, difficulty as the hunch island, difficulty as the treasure island, area) of every island
+        self.islands = [
+            (island['latitude'], island['longitude'],
+             self.difficulty(island, treasure=False), self.difficulty(island, treasure=True), island['area'])
+            for island in map['islands'].values()
+        ]
+
+        self.arrays = None # NumPy arrays of the island properties, built by precompute
+        self.tables = {} # the estimate from every island, by treasure island, for the TABLES built most recently
+
+        if precompute:
+            self.precompute()
+
+    def precompute(self) -> None:
+        '''
+        Encode the coordinates, difficulties and area of every island into NumPy arrays, once per map.
+        After this, every estimate is read from a table that is computed in one vectorized pass per treasure island.
+
+        Parameters:
+            self
+        '''
+
+        import numpy as np
+
+        lat, lon, difficulty1, difficulty2, area = zip(*self.islands) if self.islands else ((),) * 5
+        self.arrays = tuple(np.array(column, dtype=np.float64) for column in (lat, lon, difficulty1, difficulty2, area))
+
+    def table(self, treasure_island: int) -> List[float]:
+        '''
+        Return the estimated cost from every island to the treasure (the goal).
+        The tables for the last few treasure islands are kept, so repeated calls for the same goal are free.
+        The tables are never changed in place, only replaced as a whole, so threads sharing a hunch can look up different goals at once.
+
+        Parameters:
+            treasure_island (int): The treasure island's id.
+
+        Returns:
+            List[float]: the estimate for every island id.
+        '''
+
+        if self.arrays is None:
+            self.precompute()
+
+        values = self.tables.get(treasure_island)
+        if values is None:
+            import numpy as np
+
+            lat, lon, difficulty1, difficulty2, area = self.arrays
+            lat2, lon2, area2 = lat[treasure_island], lon[treasure_island], area[treasure_island]
+
+            # the same formula as estimate, applied to all islands at once
+            # float_power calls the same pow as math, so the table matches estimate exactly
+            dist = np.sqrt(np.float_power(lat2 - lat, 2) + np.float_power(lon2 - lon, 2))
+            trip_factor = (difficulty1 + difficulty2[treasure_island]) / 2
+            area_factor = (area + area2) / 2
+
+            values = (dist * (trip_factor + (area_factor * 0.01))).tolist()
+
+            # swap in a new dict rather than changing the one other threads may be reading
+            tables = {goal: table for goal, table in self.tables.items() if goal != treasure_island}
+            tables[treasure_island] = values
+            while len(tables) > TABLES:
+                del tables[next(iter(tables))]
+            self.tables = tables
+
+        return values
+
+    def many(self, hunch_island_names: List[str], treasure_island_name: Any):
+        '''
+        Return the estimated cost from each of the given islands to the treasure (the goal) in one call.
+
+        Parameters:
+            hunch_island_names (List[str]): The names of the islands from which to estimate the cost, e.g. a list of neighbors.
+            treasure_island_name (str): The treasure island's name.
+
+        Returns:
+            numpy.ndarray: An estimate of the remaining cost to reach the treasure from each island, in the same order.
+        '''
+
+        import numpy as np
+
+        values = self.table(self.ids[treasure_island_name])
+        ids = self.ids
+        return np.array([values[ids[name]] for name in hunch_island_names], dtype=np.float64)
+
+    @staticmethod
+    def difficulty(island: Dict, treasure: bool) -> float:
+        '''
+        Scores how difficult it is to get to and traverse an island, from its coast, terrain and shore.
+
+        Parameters:
+            island (Dict): the island's properties from the map
+            treasure (bool): whether the island is the treasure island; a rocky shore only counts for the hunch island
+
+        Returns:
+            float: the difficulty of the island, higher is more difficult
+        '''
+
+        difficulty = 0
+        coast, terrain, shore = island['coast'], island['terrain'], island['shore']
+
+        # incrementing difficulty based on the type of coast the island has
+        if (coast == "calm"):
+            difficulty += 1
+        elif (coast == "choppy"):
+            difficulty += 2
+        elif (coast == "reef"):
+            difficulty += 3
+
+        # updating the difficulty according to the type of terrain the island has
+        if (terrain == "savanna"):
+            difficulty += 1
+        elif (terrain == "desert"):
+            difficulty += 2
+        elif (terrain == "jungle"):
+            difficulty += 2.5
+        elif (terrain == "swamp" or terrain == "moutain"):
+            difficulty += 3
+        elif (terrain == "volcano"):
+            difficulty += 3.5
+
+        # updating the difficulty based on the type of shore the island has
+        if (shore == "port"):
+            difficulty += 1
+        elif (shore == "sandy"):
+            difficulty +=1.5
+        elif (shore == "marshy"):
+            difficulty += 2
+        elif ((shore == "cliff") or ((terrain if treasure else shore) == "rocky")):
+            difficulty += 3
+
+        return difficulty
 
     def __call__(self, hunch_island_name: str, treasure_island_name: Any) -> float:
         '''
@@ -26,103 +165,38 @@ class Hunch:
             float: An estimate of the remaining cost to reach the treasure (the goal).
         '''
 
+        return self.estimate(self.ids[hunch_island_name], self.ids[treasure_island_name])
+
+    def estimate(self, hunch_island: int, treasure_island: int) -> float:
+        '''
+        Return an estimated cost from the given island to the treasure (the goal), using island ids.
+
+        Parameters:
+            hunch_island (int): The id of the island from which to estimate the cost to the treasure island (goal).
+            treasure_island (int): The treasure island's id.
+
+        Returns:
+            float: An estimate of the remaining cost to reach the treasure (the goal).
+        '''
+
+        if self.arrays is not None:
+            return self.table(treasure_island)[hunch_island]
+
         # note for all variable names:
         # 1 corresponds to the hunch island
         # 2 corresponds to the treasure island
-        
-        lat1 = self.map['islands'][hunch_island_name]['latitude']
-        lon1 = self.map['islands'][hunch_island_name]['longitude']
-        lat2 = self.map['islands'][treasure_island_name]['latitude']
-        lon2 = self.map['islands'][treasure_island_name]['longitude']
 
-        dist = math.sqrt(pow((lat2 - lat1), 2) + pow((lon2 - lon1), 2)) # linear distance btwn islands
+        lat1, lon1, difficulty1, _, area1 = self.islands[hunch_island]
+        lat2, lon2, _, difficulty2, area2 = self.islands[treasure_island]
 
-        # the difficulty of the trip
-        # will be updated later in the function
-        # the more difficult it is to get to and/or traverse the island, the higher the difficulty
-        difficulty1 = 0
-        difficulty2 = 0
-        
-        # the type of coast that each island has
-        coast1 = self.map['islands'][hunch_island_name]['coast']
-        coast2 = self.map['islands'][treasure_island_name]['coast']
-
-        # incrementing difficulty based on the type of coast the islands have
-        if (coast1 == "calm"):
-            difficulty1 += 1
-        elif (coast1 == "choppy"):
-            difficulty1 += 2
-        elif (coast1 == "reef"):
-            difficulty1 += 3
-
-        if (coast2 == "calm"):
-            difficulty2 += 1
-        elif (coast2 == "choppy"):
-            difficulty2 += 2
-        elif (coast2 == "reef"):
-            difficulty2 += 3
-
-        # the type of terrain each island has
-        terrain1 = self.map['islands'][hunch_island_name]['terrain']
-        terrain2 = self.map['islands'][treasure_island_name]['terrain']
-
-        # updating the difficulty values according to the type of terrain each island has
-        if (terrain1 == "savanna"):
-            difficulty1 += 1
-        elif (terrain1 == "desert"):
-            difficulty1 += 2
-        elif (terrain1 == "jungle"):
-            difficulty1 += 2.5
-        elif (terrain1 == "swamp" or terrain1 == "moutain"):
-            difficulty1 += 3
-        elif (terrain1 == "volcano"):
-            difficulty1 += 3.5
-
-        if (terrain2 == "savanna"):
-            difficulty2 += 1
-        elif (terrain2 == "desert"):
-            difficulty2 += 2
-        elif (terrain2 == "jungle"):
-            difficulty2 += 2.5
-        elif (terrain2 == "swamp" or terrain2 == "moutain"):
-            difficulty2 += 3
-        elif (terrain2 == "volcano"):
-            difficulty2 += 3.5
-
-        # the type of shore that each island has
-        shore1 = self.map['islands'][hunch_island_name]['shore']
-        shore2 = self.map['islands'][treasure_island_name]['shore']
-
-        # updating the difficulty values based on the type of shore each island has
-        if (shore1 == "port"):
-            difficulty1 += 1
-        elif (shore1 == "sandy"):
-            difficulty1 +=1.5
-        elif (shore1 == "marshy"):
-            difficulty1 += 2
-        elif ((shore1 == "cliff") or (shore1 == "rocky")):
-            difficulty1 += 3
-
-        if (shore2 == "port"):
-            difficulty2 += 1
-        elif (shore2 == "sandy"):
-            difficulty2 +=1.5
-        elif (shore2 == "marshy"):
-            difficulty2 += 2
-        elif ((shore2 == "cliff") or (terrain2 == "rocky")):
-            difficulty2 += 3
+        dist = math.sqrt(pow((lat2 - lat1), 2) + pow((lon2 - lon1), 2)) # linear distance btwn islands
 
         # the trip factor is the average difficulty across both islands
         trip_factor = (difficulty1 + difficulty2) / 2
 
-        area1 = self.map['islands'][hunch_island_name]['area']
-        area2 = self.map['islands'][treasure_island_name]['area']
-
         #the area factor is the average area of both islands
         area_factor = (area1 + area2) / 2
         area_weight = 0.01 #adding this so that the area of the islands doesn't influence the heuristic as much as the distance
 
         heuristic = dist * (trip_factor + (area_factor * area_weight))
         return heuristic
-
-        ## raise NotImplementedError()
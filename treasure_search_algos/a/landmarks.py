@@ -0,0 +1,209 @@
+import heapq
+from typing import Any, List, Optional
+from chart import Chart
+
+# the most per-goal tables the landmarks keep at a time
+TABLES = 8
+
+def distances(chart: Chart, source: int) -> List[float]:
+    '''
+    Finds the cost of the cheapest path from an island to every island on the chart
+
+    Parameters:
+        chart (Chart): the compiled map to search
+        source (int): the id of the island to search from
+
+    Returns:
+        List[float]: the cost to reach every island id, inf for islands that can't be reached
+    '''
+
+    cost = [float('inf')] * len(chart)
+    cost[source] = 0
+    frontier = [(0, source)]
+
+    while frontier:
+        g, state = heapq.heappop(frontier)
+        if g > cost[state]:
+            continue
+
+        for neighbor, travel_cost in chart.routes(state):
+            if g + travel_cost < cost[neighbor]:
+                cost[neighbor] = g + travel_cost
+                heapq.heappush(frontier, (g + travel_cost, neighbor))
+
+    return cost
+
+class Landmarks:
+    def __init__(self, captain: Any, count: int = 8, landmarks: Optional[List[str]] = None) -> None:
+        '''
+        Initialize an ALT (A*, landmarks, triangle inequality) hunch for a captain's map.
+        The cost of the cheapest path to and from a handful of landmark islands is computed once,
+        and the triangle inequality then turns those costs into a lower bound on the cost between any two islands.
+        This is admissible and consistent, so A* with a stubbornness of 1 still finds the cheapest path.
+
+        Parameters:
+            captain (Captain): The captain whose map (and compiled chart) the landmarks are built for.
+            count (int): The number of landmarks to pick if none are given.
+            landmarks (List[str]): The names of the landmark islands. If None, they are picked far apart from each other.
+        '''
+
+        import numpy as np
+
+        self.map = captain.map
+        self.names = captain.chart.names
+        self.ids = captain.chart.ids
+
+        chart, reverse = captain.chart, captain.chart.reverse()
+
+        if landmarks is not None:
+            chosen = [self.ids[name] for name in landmarks]
+        else:
+            chosen = self.pick(chart, reverse, count) if len(chart) else []
+
+        self.landmarks = [self.names[i] for i in chosen]
+
+        # row k holds the cost from landmark k to every island, and from every island to landmark k
+        self.source = np.array([distances(chart, i) for i in chosen], dtype=np.float64).reshape(len(chosen), len(chart))
+        self.target = np.array([distances(reverse, i) for i in chosen], dtype=np.float64).reshape(len(chosen), len(chart))
+
+        self.tables = {} # the lower bound from every island, by (treasure island, reverse), for the TABLES built most recently
+
+    @staticmethod
+    def pick(chart: Chart, reverse: Chart, count: int) -> List[int]:
+        '''
+        Picks landmarks far apart from each other: each new landmark is the island whose
+        round trip to its nearest landmark so far is the most expensive
+
+        Parameters:
+            chart (Chart): the compiled map
+            reverse (Chart): the compiled map with every route turned around
+            count (int): the number of landmarks to pick
+
+        Returns:
+            List[int]: the ids of the landmark islands
+        '''
+
+        # start from the island farthest from island 0, which is usually on the edge of the map
+        cost = distances(chart, 0)
+        chosen = [max(range(len(chart)), key=lambda i: cost[i] if cost[i] < float('inf') else -1)]
+        nearest = [float('inf')] * len(chart)
+
+        while len(chosen) < min(count, len(chart)):
+            out, back = distances(chart, chosen[-1]), distances(reverse, chosen[-1])
+            nearest = [min(n, a + b) for n, a, b in zip(nearest, out, back)]
+
+            # islands that can't be reached either way are still worth a landmark
+            candidates = [i for i in range(len(chart)) if i not in chosen]
+            chosen.append(max(candidates, key=lambda i: nearest[i]))
+
+        return chosen
+
+    def table(self, treasure_island: int, reverse: bool = False) -> List[float]:
+        '''
+        Return the lower bound on the cost from every island to the treasure (the goal), in one vectorized pass.
+        The tables for the last few treasure islands are kept, so repeated calls for the same goal are free.
+        The tables are never changed in place, only replaced as a whole, so threads sharing landmarks can look up different goals at once.
+
+        Parameters:
+            treasure_island (int): The treasure island's id.
+            reverse (bool): Bound the cost from the given island to every island instead, e.g. from the start of a backward search.
+
+        Returns:
+            List[float]: the lower bound for every island id.
+        '''
+
+        import numpy as np
+
+        key = (treasure_island, reverse)
+        values = self.tables.get(key)
+        if values is None:
+            with np.errstate(invalid='ignore'):
+                if reverse:
+                    # d(s, v) >= d(L, v) - d(L, s) and d(s, v) >= d(s, L) - d(v, L) for every landmark L
+                    before = self.source - self.source[:, treasure_island, None]
+                    after = self.target[:, treasure_island, None] - self.target
+                else:
+                    # d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L) for every landmark L
+                    before = self.source[:, treasure_island, None] - self.source
+                    after = self.target - self.target[:, treasure_island, None]
+                bound = np.fmax(before, after)
+
+            # inf - inf comes out as nan and gives no information, fmax drops it
+            values = np.fmax.reduce(bound, axis=0, initial=0).tolist() if len(bound) else [0.0] * len(self.names)
+
+            # swap in a new dict rather than changing the one other threads may be reading
+            tables = {other: table for other, table in self.tables.items() if other != key}
+            tables[key] = values
+            while len(tables) > TABLES:
+                del tables[next(iter(tables))]
+            self.tables = tables
+
+        return values
+
+    def estimate(self, hunch_island: int, treasure_island: int) -> float:
+        '''
+        Return a lower bound on the cost from the given island to the treasure (the goal), using island ids.
+
+        Parameters:
+            hunch_island (int): The id of the island from which to estimate the cost to the treasure island (goal).
+            treasure_island (int): The treasure island's id.
+
+        Returns:
+            float: A lower bound on the remaining cost to reach the treasure (the goal).
+        '''
+
+        return self.table(treasure_island)[hunch_island]
+
+    def __call__(self, hunch_island_name: str, treasure_island_name: Any) -> float:
+        '''
+        Return a lower bound on the cost from the given island to the treasure (the goal).
+
+        Parameters:
+            hunch_island_name (str): The name of the island from which to estimate the cost to the treasure island (goal).
+            treasure_island_name (str): The treasure island's name.
+
+        Returns:
+            float: A lower bound on the remaining cost to reach the treasure (the goal).
+        '''
+
+        return self.estimate(self.ids[hunch_island_name], self.ids[treasure_island_name])
+
+    def save(self, path: str) -> None:
+        '''
+        Write the landmarks and their costs to disk, so that they only have to be computed once per map
+
+        Parameters:
+            path (str): the .npz file to write
+        '''
+
+        import numpy as np
+
+        np.savez_compressed(path, names=np.array(self.names), landmarks=np.array(self.landmarks, dtype=str),
+                            source=self.source, target=self.target)
+
+    @classmethod
+    def load(cls, path: str, captain: Any) -> 'Landmarks':
+        '''
+        Read landmarks written by save for the same map
+
+        Parameters:
+            path (str): the .npz file to read
+            captain (Captain): the captain whose map the landmarks were built for
+
+        Returns:
+            Landmarks: the landmarks, ready to be used as a hunch
+        '''
+
+        import numpy as np
+
+        with np.load(path) as data:
+            if data['names'].tolist() != captain.chart.names:
+                raise ValueError(f'{path} was built for a different map')
+
+            landmarks = cls.__new__(cls)
+            landmarks.map, landmarks.names, landmarks.ids = captain.map, captain.chart.names, captain.chart.ids
+            landmarks.landmarks = data['landmarks'].tolist()
+            landmarks.source, landmarks.target = data['source'], data['target']
+            landmarks.tables = {}
+
+        return landmarks
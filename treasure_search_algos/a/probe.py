@@ -0,0 +1,296 @@
+import json
+import marshal
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+class Probe:
+    '''
+    The instrumentation interface of Captain. A captain built without a probe never calls any of these,
+    so searches pay nothing for instrumentation unless a probe is given. This base class records nothing;
+    subclass it and override the methods you need.
+    '''
+
+    def watch(self, key: tuple, search: Callable[[], tuple]) -> Callable[[], tuple]:
+        '''
+        Wraps a search so that it is recorded when it runs
+
+        Parameters:
+            self
+            key (tuple): (algorithm, start, goal, stubbornness, hunch), identifies the search
+            search (Callable[[], tuple]): runs the search
+
+        Returns:
+            Callable[[], tuple]: runs and records the search
+        '''
+
+        return search
+
+    def phase(self, name: str):
+        '''
+        Times a phase of the current search
+
+        Parameters:
+            self
+            name (str): the name of the phase, e.g. 'hunch' or 'search'
+
+        Returns:
+            a context manager around the phase
+        '''
+
+        return nullcontext()
+
+    def frontier(self, frontier_class: type) -> Callable[[], Any]:
+        '''
+        Wraps a frontier class so that pushes, pops and frontier sizes are recorded
+
+        Parameters:
+            self
+            frontier_class (type): HeapFrontier or IndexedHeapFrontier
+
+        Returns:
+            Callable[[], Any]: builds an empty frontier
+        '''
+
+        return frontier_class
+
+    def hunch(self, h: Callable[[int], float]) -> Callable[[int], float]:
+        '''
+        Wraps a heuristic over island ids so that its calls are counted and timed
+
+        Parameters:
+            self
+            h (Callable[[int], float]): the heuristic, as returned by Captain.hunch_by_id
+
+        Returns:
+            Callable[[int], float]: the same heuristic
+        '''
+
+        return h
+
+class CountingFrontier:
+    def __init__(self, frontier: Any, record: Dict, sample: int) -> None:
+        '''
+        Initialize a frontier that counts what passes through another frontier
+
+        Parameters:
+            frontier: the frontier to count
+            record (dict): the record of the search the frontier belongs to
+            sample (int): record the frontier size every sample pops
+        '''
+
+        self.inner = frontier
+        self.record = record
+        self.sample = sample
+        record['frontiers'].append(frontier)
+
+    def __len__(self) -> int:
+        return len(self.inner)
+
+    def __bool__(self) -> bool:
+        return bool(self.inner)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.inner
+
+    @property
+    def stale(self) -> int:
+        return self.inner.stale
+
+    def remove(self, key: Any) -> None:
+        self.inner.remove(key)
+
+    def peek(self) -> float:
+        return self.inner.peek()
+
+    def push(self, key: Any, priority: float, item: Any) -> None:
+        self.record['pushes'] += 1
+        self.inner.push(key, priority, item)
+
+    def pop(self):
+        record = self.record
+        if record['pops'] % self.sample == 0:
+            record['frontier'].append(len(self.inner))
+        record['pops'] += 1
+        return self.inner.pop()
+
+class Recorder(Probe):
+    def __init__(self, sample: int = 1) -> None:
+        '''
+        Initialize a probe that keeps a record of every search a captain runs.
+
+        Parameters:
+            sample (int): Record the size of the frontier every sample pops. Raise it to keep records small on long searches.
+        '''
+
+        self.sample = sample
+        self.records: List[Dict] = []
+        self.current: Optional[Dict] = None # the record of the search that is running
+
+    def watch(self, key: tuple, search: Callable[[], tuple]) -> Callable[[], tuple]:
+        '''
+        Wraps a search so that it is recorded when it runs
+
+        Parameters:
+            self
+            key (tuple): (algorithm, start, goal, stubbornness, hunch), identifies the search
+            search (Callable[[], tuple]): runs the search
+
+        Returns:
+            Callable[[], tuple]: runs and records the search
+        '''
+
+        algorithm, start, goal, stubbornness, hunch = key
+
+        def run() -> tuple:
+            record = {
+                'search': algorithm,
+                'start': start,
+                'goal': list(goal) if isinstance(goal, tuple) else goal,
+                'stubbornness': stubbornness,
+                'hunch': type(hunch).__name__ if hunch is not None else None,
+                'pushes': 0, # items put on the frontier
+                'pops': 0, # items taken off the frontier, including entries best_first_search then skips as already expanded
+                'stale': 0, # stale entries the frontier skipped
+                'hunch_calls': 0,
+                'hunch_time': 0.0,
+                'frontier': [], # the size of the frontier before every sampled pop
+                'phases': {}, # wall time in seconds by phase
+                'frontiers': [],
+            }
+
+            outer, self.current = self.current, record
+            started = time.perf_counter()
+            try:
+                result = search()
+            finally:
+                record['phases']['search'] = time.perf_counter() - started
+                self.current = outer
+
+            record['stale'] = sum(frontier.stale for frontier in record.pop('frontiers'))
+            record['cost'], record['expanded'] = result[1], result[2]
+            self.records.append(record)
+            return result
+
+        return run
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        '''
+        Times a phase of the current search; time spent in the same phase twice is added up
+
+        Parameters:
+            self
+            name (str): the name of the phase, e.g. 'hunch' or 'search'
+        '''
+
+        record = self.current
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if record is not None:
+                record['phases'][name] = record['phases'].get(name, 0.0) + time.perf_counter() - started
+
+    def frontier(self, frontier_class: type) -> Callable[[], Any]:
+        '''
+        Wraps a frontier class so that pushes, pops and frontier sizes are recorded
+
+        Parameters:
+            self
+            frontier_class (type): HeapFrontier or IndexedHeapFrontier
+
+        Returns:
+            Callable[[], Any]: builds an empty frontier
+        '''
+
+        record = self.current
+        if record is None:
+            return frontier_class
+        return lambda: CountingFrontier(frontier_class(), record, self.sample)
+
+    def hunch(self, h: Callable[[int], float]) -> Callable[[int], float]:
+        '''
+        Wraps a heuristic over island ids so that its calls are counted and timed
+
+        Parameters:
+            self
+            h (Callable[[int], float]): the heuristic, as returned by Captain.hunch_by_id
+
+        Returns:
+            Callable[[int], float]: the same heuristic
+        '''
+
+        record = self.current
+        if record is None:
+            return h
+
+        clock = time.perf_counter
+        def timed(n: int) -> float:
+            started = clock()
+            value = h(n)
+            record['hunch_time'] += clock() - started
+            record['hunch_calls'] += 1
+            return value
+
+        return timed
+
+    def dump_jsonl(self, path: str) -> None:
+        '''
+        Append every record to a JSON lines file, one search per line
+
+        Parameters:
+            self
+            path (str): the file to append to
+        '''
+
+        with open(path, 'a') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + '\n')
+
+    def stats(self) -> Dict[tuple, tuple]:
+        '''
+        Summarizes the records the way cProfile does: one entry per search algorithm, per phase and for the hunch.
+        Each phase and the hunch is reported as called by the search algorithm it ran in.
+
+        Parameters:
+            self
+
+        Returns:
+            dict: {(file, line, function): (primitive calls, calls, own time, cumulative time, callers)}
+        '''
+
+        stats = {}
+
+        def add(function: tuple, calls: int, own: float, cumulative: float, caller: Optional[tuple]) -> None:
+            cc, nc, tt, ct, callers = stats.get(function, (0, 0, 0.0, 0.0, {}))
+            if caller is not None:
+                c = callers.get(caller, (0, 0, 0.0, 0.0))
+                callers[caller] = (c[0] + calls, c[1] + calls, c[2] + own, c[3] + cumulative)
+            stats[function] = (cc + calls, nc + calls, tt + own, ct + cumulative, callers)
+
+        for record in self.records:
+            search = ('captain.py', 0, record['search'])
+            total = record['phases']['search']
+            nested = record['hunch_time'] + sum(t for name, t in record['phases'].items() if name != 'search')
+
+            add(search, 1, max(total - nested, 0.0), total, None)
+            for name, t in record['phases'].items():
+                if name != 'search':
+                    add(('captain.py', 0, name), 1, t, t, search)
+            if record['hunch_calls']:
+                add(('hunch.py', 0, 'estimate'), record['hunch_calls'], record['hunch_time'], record['hunch_time'], search)
+
+        return stats
+
+    def dump_stats(self, path: str) -> None:
+        '''
+        Write the summary from stats in the format of cProfile's dump_stats, which pstats, snakeviz and similar tools read
+
+        Parameters:
+            self
+            path (str): the file to write
+        '''
+
+        with open(path, 'wb') as f:
+            marshal.dump(self.stats(), f)
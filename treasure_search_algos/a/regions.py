@@ -0,0 +1,240 @@
+import heapq
+import math
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+class Regions:
+    def __init__(self, captain: Any, size: int = 256, gateways: Optional[int] = None, margin: int = 1) -> None:
+        '''
+        Initialize hierarchical routing for a captain's map (HPA*-style). Islands are clustered into regions by latitude and longitude,
+        about size islands to a region. Islands with a route into or out of another region are gateways. For every region,
+        the cheapest path inside the region from every gateway that routes lead into to every gateway that routes leave from
+        is computed ahead of time. A query then searches the much smaller graph of gateways, and only the start and goal regions
+        and the regions along the way are searched island by island, to fill in the path.
+
+        With gateways=None, every route between two regions is kept, and every cost matches uniform_cost_search.
+        Otherwise only the given number of cheapest routes from each region to each neighboring region are kept, which makes
+        regions much faster to build and queries faster to answer. The path over the gateways then only picks the regions to cross,
+        and the path is found by searching every island of those regions, so it may cost somewhat more than the cheapest one.
+        When the routes kept leave the start and the goal apart, or the path has to leave those regions, every island is searched instead.
+
+        Parameters:
+            captain (Captain): The captain whose map (and compiled chart) the regions are built for.
+            size (int): The number of islands to aim for in each region.
+            gateways (int): The most routes kept from a region to each of its neighbors. None keeps all of them, so that paths are the cheapest.
+            margin (int): Without every gateway, also search this many rings of regions around the regions the path crosses.
+        '''
+
+        chart = captain.chart
+        self.map = captain.map
+        self.chart = chart
+        self.names, self.ids = chart.names, chart.ids
+        self.exact = gateways is None
+        self.margin = margin
+
+        # a square grid of cells over the islands' coordinates, one region per cell
+        placed = [(self.ids[name], island['latitude'], island['longitude']) for name, island in self.map['islands'].items()]
+        cells = self.cells = max(1, math.ceil(math.sqrt(len(placed) / size)))
+        lats, lons = [lat for _, lat, _ in placed] or [0.0], [lon for _, _, lon in placed] or [0.0]
+        lat0, lon0 = min(lats), min(lons)
+        height, width = (max(lats) - lat0) / cells or 1.0, (max(lons) - lon0) / cells or 1.0
+
+        # islands that only appear in routes have no coordinates, and share one region of their own
+        self.region = [cells * cells] * len(chart)
+        for i, lat, lon in placed:
+            self.region[i] = min(int((lat - lat0) / height), cells - 1) * cells + min(int((lon - lon0) / width), cells - 1)
+
+        # the routes between regions, keeping the cheapest few from each region to each neighbor unless every route is kept
+        crossings: Dict[Tuple[int, int], List[Tuple[float, int, int]]] = {}
+        for origin in range(len(chart)):
+            for destination, travel_cost in chart.routes(origin):
+                if self.region[origin] != self.region[destination]:
+                    crossings.setdefault((self.region[origin], self.region[destination]), []).append((travel_cost, origin, destination))
+
+        self.up: Dict[int, List[Tuple[int, float, Optional[int]]]] = {} # gateway routes: (destination, cost, region searched or None for a route)
+        self.exits: Dict[int, Set[int]] = {} # the gateways of every region that routes leave from
+        self.entries: Dict[int, Set[int]] = {} # the gateways of every region that routes lead into
+        for (here, there), routes in crossings.items():
+            kept = routes if self.exact else heapq.nsmallest(gateways, routes)
+            for travel_cost, origin, destination in kept:
+                self.up.setdefault(origin, []).append((destination, travel_cost, None))
+                self.exits.setdefault(here, set()).add(origin)
+                self.entries.setdefault(there, set()).add(destination)
+
+        # the cheapest path inside each region from every entry to every exit
+        for region, entries in self.entries.items():
+            exits = self.exits.get(region, set())
+            for entry in entries:
+                cost, _ = self.within(entry, exits)
+                self.up.setdefault(entry, []).extend((exit, cost[exit], region) for exit in exits if exit in cost and exit != entry)
+
+    def within(self, source: int, targets: Set[int], reverse: bool = False, regions: Optional[Set[int]] = None) -> Tuple[Dict[int, float], Dict[int, Optional[int]]]:
+        '''
+        Helper function that runs uniform cost search from an island without leaving its region (or some regions), until every target is reached
+
+        Parameters:
+            self
+            source (int): the id of the island to search from
+            targets (Set[int]): the ids of the islands to reach
+            reverse (bool): follow routes backwards, to find the cheapest paths to the source instead of from it
+            regions (Set[int]): the regions to search, only the source's region by default
+
+        Returns:
+            Tuple[Dict[int, float], Dict[int, Optional[int]]]: the path cost and the parent of every island reached
+        '''
+
+        chart = self.chart.reverse() if reverse else self.chart
+        region = self.region
+        home = regions if regions is not None else {region[source]}
+
+        cost, parent = {source: 0}, {source: None}
+        frontier = [(0, source)]
+        closed = set()
+        left = len(targets - {source})
+
+        while frontier and left:
+            g, state = heapq.heappop(frontier)
+            if state in closed:
+                continue
+            closed.add(state)
+            if state in targets and state != source:
+                left -= 1
+
+            for neighbor, travel_cost in chart.routes(state):
+                if region[neighbor] in home and (neighbor not in cost or g + travel_cost < cost[neighbor]):
+                    cost[neighbor] = g + travel_cost
+                    parent[neighbor] = state
+                    heapq.heappush(frontier, (g + travel_cost, neighbor))
+
+        # only the costs of expanded islands are final
+        return {state: cost[state] for state in closed}, parent
+
+    def route(self, starting_island_name: str, treasure_island_name: str) -> Tuple[List[str], int, int]:
+        '''
+        Finds a path between two islands over the graph of gateways, then fills in the path inside every region it crosses
+
+        Parameters:
+            starting_island_name (str): The name of the starting island.
+            treasure_island_name (str): The name of the goal island.
+
+        Returns:
+            List[str]: A list of island names representing the path taken from the starting island to the treasure island. If no valid path exists, return an empty list.
+            int: The cost of the path. If no valid path exits, return 0.
+            int: The number of islands (nodes) visited, in the start and goal regions and on the graph of gateways.
+        '''
+
+        start, goal = self.ids[starting_island_name], self.ids[treasure_island_name]
+        start_region, goal_region = self.region[start], self.region[goal]
+
+        # from the start to the exits of its region (or straight to the goal in the same region), and from the entries of the goal's region to the goal
+        from_start, _ = self.within(start, self.exits.get(start_region, set()) | ({goal} if goal_region == start_region else set()))
+        to_goal, _ = self.within(goal, self.entries.get(goal_region, set()), reverse=True)
+
+        first = [(state, from_start[state], start_region) for state in self.exits.get(start_region, ()) if state in from_start]
+        if goal in from_start and goal != start:
+            first.append((goal, from_start[goal], start_region))
+        last = {state: to_goal[state] for state in self.entries.get(goal_region, ()) if state in to_goal}
+
+        # uniform cost search over the gateways
+        cost = {start: 0}
+        parent: Dict[int, Optional[Tuple[int, Optional[int]]]] = {start: None}
+        frontier = [(0, start)]
+        closed = set()
+
+        while frontier:
+            g, state = heapq.heappop(frontier)
+            if state in closed:
+                continue
+            closed.add(state)
+            if state == goal:
+                break
+
+            routes = self.up.get(state, [])
+            if state == start:
+                routes = first + routes
+            if state in last:
+                routes = routes + [(goal, last[state], goal_region)]
+
+            for neighbor, travel_cost, region in routes:
+                if neighbor not in cost or g + travel_cost < cost[neighbor]:
+                    cost[neighbor] = g + travel_cost
+                    parent[neighbor] = (state, region)
+                    heapq.heappush(frontier, (g + travel_cost, neighbor))
+
+        visited = len(from_start) + len(to_goal) + len(cost)
+        if goal not in closed:
+            if self.exact:
+                return [], 0, visited
+
+            # the gateways kept may leave regions apart that routes do connect, so search every island instead
+            return self.search(start, goal, set(self.region), visited)
+
+        # the hops between gateways, from the goal back to the start
+        hops = []
+        state = goal
+        while parent[state] is not None:
+            previous, region = parent[state]
+            hops.append((previous, state, region))
+            state = previous
+
+        # without every gateway the path over them may not be the cheapest, so search again over every island of the regions it crosses
+        if not self.exact:
+            crossed = {self.region[state] for hop in hops for state in hop[:2]} | {start_region}
+            corridor = set()
+            for region in crossed:
+                row, column = divmod(region, self.cells)
+                corridor.add(region)
+                if region < self.cells * self.cells:
+                    corridor.update((row + dr) * self.cells + column + dc for dr in range(-self.margin, self.margin + 1) for dc in range(-self.margin, self.margin + 1)
+                                    if 0 <= row + dr < self.cells and 0 <= column + dc < self.cells)
+            return self.search(start, goal, corridor, visited)
+
+        # a route between regions is a single step, a hop inside a region is filled in by searching it again
+        path = [start]
+        for origin, destination, region in reversed(hops):
+            if region is None:
+                path.append(destination)
+                continue
+            _, inside = self.within(origin, {destination})
+            segment, state = [], destination
+            while state != origin:
+                segment.append(state)
+                state = inside[state]
+            path += segment[::-1]
+
+        return [self.names[i] for i in path], int(cost[goal]), visited
+
+    def search(self, start: int, goal: int, regions: Set[int], visited: int) -> Tuple[List[str], int, int]:
+        '''
+        Helper function for route that searches every island of some regions for the cheapest path between two islands.
+        If the path has to leave those regions, every island is searched instead, so a path is found whenever there is one.
+
+        Parameters:
+            self
+            start (int): the id of the starting island
+            goal (int): the id of the goal island
+            regions (Set[int]): the regions to search
+            visited (int): the number of islands visited before this search
+
+        Returns:
+            List[str]: A list of island names representing the path taken from the starting island to the treasure island. If no valid path exists, return an empty list.
+            int: The cost of the path. If no valid path exits, return 0.
+            int: The number of islands (nodes) visited, including this search.
+        '''
+
+        cost, parent = self.within(start, {goal}, regions=regions)
+        visited += len(parent)
+
+        if goal not in cost:
+            everywhere = set(self.region)
+            if regions >= everywhere:
+                return [], 0, visited
+            cost, parent = self.within(start, {goal}, regions=everywhere)
+            visited += len(parent)
+            if goal not in cost:
+                return [], 0, visited
+
+        path, state = [], goal
+        while state is not None:
+            path.append(state)
+            state = parent[state]
+        return [self.names[i] for i in reversed(path)], int(cost[goal]), visited
@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from hunch import Hunch
+from captain import Captain
+from bench import environment, percentile, synthetic_map
+
+class RouteService:
+    def __init__(self, captain: Captain, hunch: Optional[Hunch] = None, workers: int = 4, concurrency: int = 64,
+                 timeout: Optional[float] = None, every: int = 256) -> None:
+        '''
+        Initialize an in-process stand-in for the route web service: it answers requests like the service's handlers would,
+        with the captain's async searches, but takes them as dictionaries instead of over the network.
+
+        Parameters:
+            captain (Captain): the captain that answers every request
+            hunch (Hunch): the hunch used by greedy best-first and A* search
+            workers (int): the number of executor threads searches run in. 0 runs them on the event loop.
+            concurrency (int): the most requests handled at a time, the rest wait their turn
+            timeout (float): the most seconds a request may take, unless the request gives its own. None for no limit.
+            every (int): the number of islands a search expands before handing control back to the event loop
+        '''
+
+        self.captain = captain
+        self.hunch = hunch
+        self.executor = ThreadPoolExecutor(max_workers=workers) if workers else None
+        self.slots = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.every = every
+
+    def __enter__(self) -> 'RouteService':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''
+        Shut down the executor threads
+
+        Parameters:
+            self
+        '''
+
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def handle(self, request: Dict) -> Dict:
+        '''
+        Answers one route request
+
+        Parameters:
+            self
+            request (dict): 'algorithm', 'start' and 'goal', with optional 'stubbornness' (for A*, default 1) and 'timeout'
+
+        Returns:
+            dict: 'status' ('ok', 'timeout' or 'error') and 'ms', with 'path', 'cost' and 'visited' when the search finished, or 'error'
+        '''
+
+        begin = time.perf_counter()
+        algorithm = request.get('algorithm', 'a_star_search')
+        hunch = self.hunch if algorithm != 'uniform_cost_search' else None
+
+        async with self.slots:
+            try:
+                path, cost, visited = await self.captain.search_async(
+                    algorithm, request['start'], request['goal'], hunch, request.get('stubbornness', 1),
+                    timeout=request.get('timeout', self.timeout), executor=self.executor, every=self.every)
+                response = {'status': 'ok', 'path': path, 'cost': cost, 'visited': visited}
+            except asyncio.TimeoutError:
+                response = {'status': 'timeout'}
+            except (KeyError, ValueError) as error:
+                response = {'status': 'error', 'error': repr(error)}
+
+        response['ms'] = (time.perf_counter() - begin) * 1000
+        return response
+
+async def load_test(service: RouteService, requests: List[Dict], clients: int = 32) -> Dict[str, float]:
+    '''
+    Sends a batch of requests to the service from several clients at once, each sending its next request as soon as
+    it has the answer to the last one, and measures how long requests take and how long the event loop was held up
+
+    Parameters:
+        service (RouteService): the service under test
+        requests (List[Dict]): the requests, handed out to the clients in order
+        clients (int): the number of clients
+
+    Returns:
+        dict: throughput in requests per second, latency percentiles in milliseconds, the number of requests of every status,
+            and the longest the event loop went without running a ready task
+    '''
+
+    pending = iter(requests)
+    responses = []
+
+    async def client() -> None:
+        for request in pending:
+            responses.append(await service.handle(request))
+
+    # a task that should wake up every millisecond, to see how long searches keep the event loop busy
+    lag = [0.0]
+    async def heartbeat() -> None:
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag[0] = max(lag[0], (time.perf_counter() - before - 0.001) * 1000)
+
+    monitor = asyncio.ensure_future(heartbeat())
+    begin = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    total = time.perf_counter() - begin
+    monitor.cancel()
+
+    latencies = [response['ms'] for response in responses]
+    statuses = {}
+    for response in responses:
+        statuses[response['status']] = statuses.get(response['status'], 0) + 1
+
+    return {
+        'requests': len(responses),
+        'throughput': len(responses) / total if total else float('inf'),
+        'p50_ms': percentile(latencies, 50),
+        'p90_ms': percentile(latencies, 90),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies),
+        'loop_lag_ms': lag[0],
+        'statuses': statuses,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load test the async route service on a synthetic map, with no network.')
+    parser.add_argument('--islands', type=int, default=10000)
+    parser.add_argument('--degree', type=int, default=12, help='routes leaving every island')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--distinct', type=int, default=100, help='number of different requests, repeats are coalesced or cached')
+    parser.add_argument('--algorithm', default='a_star_search', choices=['uniform_cost_search', 'greedy_best_first_search', 'a_star_search'])
+    parser.add_argument('--clients', type=int, default=32, help='requests in flight at a time')
+    parser.add_argument('--workers', type=int, default=4, help='executor threads, 0 runs searches on the event loop')
+    parser.add_argument('--every', type=int, default=256, help='islands expanded between yields to the event loop')
+    parser.add_argument('--timeout', type=float, help='seconds before a request times out')
+    parser.add_argument('--cache', type=int, default=0, help='size of the route cache')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='where to write the results as JSON')
+    args = parser.parse_args(argv)
+
+    map = synthetic_map(args.islands, args.degree, args.seed)
+    captain, hunch = Captain(map, cache_size=args.cache), Hunch(map)
+
+    rng = random.Random(args.seed)
+    names = list(map['islands'])
+    distinct = [{'algorithm': args.algorithm, 'start': rng.choice(names), 'goal': rng.choice(names)} for _ in range(args.distinct)]
+    requests = [rng.choice(distinct) for _ in range(args.requests)]
+
+    async def run() -> Dict[str, float]:
+        with RouteService(captain, hunch, args.workers, args.clients, args.timeout, args.every) as service:
+            return await load_test(service, requests, args.clients)
+
+    result = asyncio.run(run())
+    print(f"{args.algorithm} on {args.islands} islands: {result['throughput']:.1f} req/s  p50 {result['p50_ms']:.1f} ms  "
+          f"p99 {result['p99_ms']:.1f} ms  max {result['max_ms']:.1f} ms  loop lag {result['loop_lag_ms']:.1f} ms  {result['statuses']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'arguments': vars(args), 'result': result}, f, indent=2)
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,21 @@
+import asyncio
 import json
 import math
+import os
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 from hunch import Hunch
 from captain import Captain
+from frontier import HeapFrontier, IndexedHeapFrontier
+from landmarks import Landmarks
+from hierarchy import Hierarchy
+from regions import Regions
+from probe import Recorder
+from atlas import Atlas, save_map
+from bench import synthetic_map
+from fleet import Fleet
 
 class TestHunch:
     def __init__(self, map: Dict) -> None:
@@ -15,6 +28,29 @@ class TestHunch:
         lon2 = self.map['islands'][treasure_island_name]['longitude']
         return math.sqrt((lat2 - lat1) ** 2 + (lon2 - lon1) ** 2)
 
+def original_best_first_search(map: Dict, start: str, goal: str, f_func) -> tuple:
+    '''
+    The best first search as it was first written, to check results against: the whole frontier is sorted before every pop,
+    and every node pushed is expanded when it comes off the frontier
+    '''
+
+    frontier = [(f_func(start, 0), start, 0, [start])]
+    reached = {start: 0}
+
+    while frontier:
+        frontier.sort(key=lambda x: x[0])
+        _, state, g, path = frontier.pop(0)
+        if state == goal:
+            return path, int(g), len(reached)
+
+        for neighbor, travel_cost in map['routes'].get(state, {}).items():
+            new_cost = g + travel_cost
+            if neighbor not in reached or new_cost < reached[neighbor]:
+                reached[neighbor] = new_cost
+                frontier.append((f_func(neighbor, new_cost), neighbor, new_cost, path + [neighbor]))
+
+    return [], 0, len(reached)
+
 with open('map.json', 'r') as f:
     treasure_map = json.load(f)
 
@@ -91,10 +127,319 @@ results.append(
     )
 )
 
+# A* Search w/ decrease-key frontier
+results.append(
+    captain.best_first_search(
+        'Mutiny',
+        'Fogshore',
+        lambda n, g: g + 2500 * hunch(n, 'Fogshore'),
+        IndexedHeapFrontier
+    ) == (
+        ['Mutiny', 'Scabbard', 'Cutlass', 'Bonefire', 'Marauder', 'Saltspire', 'Bloodspike', 'Blackreef', 'Dagger', 'Saltwind', 'Fogshore'],
+        77836,
+        81
+    )
+)
+
+# Both frontiers list their keys and take new priorities for all of them at once
+def reprioritized(frontier_class) -> list:
+    frontier = frontier_class()
+    for key, priority in (('a', 3), ('b', 1), ('c', 2), ('a', 0)):
+        frontier.push(key, priority, priority)
+    frontier.remove('b')
+    frontier.reprioritize(lambda key, item: -item)
+    return [sorted(frontier)] + [frontier.pop() for _ in range(len(frontier))]
+
+results.append(reprioritized(HeapFrontier) == reprioritized(IndexedHeapFrontier) == [['a', 'c'], ('c', 2), ('a', 0)])
+
+# Bidirectional Uniform Cost Search
+results.append(
+    captain.bidirectional_search(
+        'Mutiny',
+        'Fogshore'
+    ) == (
+        ['Mutiny', 'Scabbard', 'Cutlass', 'Bonefire', 'Marauder', 'Saltspire', 'Bloodspike', 'Blackreef', 'Dagger', 'Saltwind', 'Fogshore'],
+        77836,
+        98
+    )
+)
+
+# Multi-Goal Uniform Cost Search
+results.append(
+    captain.multi_goal_search(
+        'Mutiny',
+        ['Fogshore', 'Dagger']
+    ) == (
+        ['Mutiny', 'Scabbard', 'Cutlass', 'Bonefire', 'Marauder', 'Saltspire', 'Bloodspike', 'Blackreef', 'Dagger'],
+        61430,
+        99
+    )
+)
+
+# Batched Uniform Cost Search
+queries = [('Mutiny', 'Fogshore'), ('Mutiny', 'Dagger'), ('Fogshore', 'Mutiny')]
+results.append(
+    captain.route_many(queries) == [captain.uniform_cost_search(start, goal) for start, goal in queries]
+)
+
+# A* Search w/ landmark hunch
+results.append(
+    captain.a_star_search(
+        'Mutiny',
+        'Fogshore',
+        Landmarks(captain, 8),
+        1
+    ) == (
+        ['Mutiny', 'Scabbard', 'Cutlass', 'Bonefire', 'Marauder', 'Saltspire', 'Bloodspike', 'Blackreef', 'Dagger', 'Saltwind', 'Fogshore'],
+        77836,
+        51
+    )
+)
+
+# Bidirectional A* Search w/ landmark hunch, on routes that cost more one way than the other
+landmarks = Landmarks(captain, 8)
+pairs = [('Ghostsong', 'Blackmist'), ('Daggerfall', 'Seahorse'), ('Ravenclaw', 'Skullrock'), ('Marooner', 'Marauder')]
+rng = random.Random(4)
+pairs += [tuple(rng.sample(captain.chart.names, 2)) for _ in range(60)]
+results.append(
+    captain.bidirectional_search('Ghostsong', 'Blackmist', landmarks)[1] == 20175
+    and captain.bidirectional_search('Daggerfall', 'Seahorse', landmarks)[1] == 24508
+    and all(captain.bidirectional_search(start, goal, landmarks)[1] == captain.uniform_cost_search(start, goal)[1] for start, goal in pairs)
+)
+
+# Contraction hierarchy
+results.append(
+    Hierarchy(captain).route('Mutiny', 'Fogshore')[:2] == (
+        ['Mutiny', 'Scabbard', 'Cutlass', 'Bonefire', 'Marauder', 'Saltspire', 'Bloodspike', 'Blackreef', 'Dagger', 'Saltwind', 'Fogshore'],
+        77836
+    )
+)
+
+# Cached A* Search
+cached_captain = Captain(treasure_map, cache_size=8)
+first = cached_captain.a_star_search('Mutiny', 'Fogshore', hunch, 2500)
+results.append(
+    cached_captain.a_star_search('Mutiny', 'Fogshore', hunch, 2500) == first and cached_captain.cache.hits == 1
+)
+
+# Instrumented A* Search
+recorder = Recorder()
+recorded = Captain(treasure_map, probe=recorder).a_star_search('Mutiny', 'Fogshore', hunch, 2500)
+record = recorder.records[0]
+results.append(
+    recorded == captain.a_star_search('Mutiny', 'Fogshore', hunch, 2500)
+    and record['pops'] + record['stale'] <= record['pushes'] and record['hunch_calls'] == record['pushes']
+)
+
+# Streamed A* Search, stopped partway and finished later
+steps = captain.stream('a_star_search', 'Mutiny', 'Fogshore', hunch, 2500)
+first = [next(steps) for _ in range(5)]
+events = first + list(steps)
+results.append(
+    events[-1]['path'] == captain.a_star_search('Mutiny', 'Fogshore', hunch, 2500)[0]
+    and [event['done'] for event in events].count(True) == 1 and first[0]['island'] == 'Mutiny'
+)
+
+# Async A* Search, with identical requests sharing one search
+async def coalesced():
+    requests = [asyncio.ensure_future(captain.a_star_search_async('Mutiny', 'Fogshore', hunch, 2500, every=16)) for _ in range(3)]
+    await asyncio.sleep(0)
+    shared = len(captain.inflight)
+    answers = await asyncio.gather(*requests)
+    try:
+        await captain.uniform_cost_search_async('Mutiny', 'Fogshore', timeout=0)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    return shared, answers, timed_out
+
+shared, answers, timed_out = asyncio.run(coalesced())
+results.append(
+    shared == 1 and all(answer == captain.a_star_search('Mutiny', 'Fogshore', hunch, 2500) for answer in answers)
+    and timed_out and not captain.inflight
+)
+
+# An async search whose routes change while it runs starts over, and never caches a path found on the old routes
+async def interrupted(captain):
+    request = asyncio.ensure_future(captain.uniform_cost_search_async('Mutiny', 'Fogshore', every=4))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    captain.update_route('Mutiny', 'Cutlass', 1)
+    return await request
+
+shortcut_captain = Captain(json.loads(json.dumps(treasure_map)), cache_size=8)
+answer = asyncio.run(interrupted(shortcut_captain))
+results.append(
+    answer[1] == 67546 and answer == shortcut_captain.uniform_cost_search('Mutiny', 'Fogshore')
+    and shortcut_captain.cache.hits == 1
+)
+
+# Sync and async searches share their cached results
+keyed_captain = Captain(treasure_map, cache_size=8)
+greedy = keyed_captain.greedy_best_first_search('Mutiny', 'Fogshore', hunch)
+results.append(
+    asyncio.run(keyed_captain.greedy_best_first_search_async('Mutiny', 'Fogshore', hunch)) == greedy
+    and keyed_captain.cache.hits == 1 and len(keyed_captain.cache.results) == 1
+)
+
+# A* Search on the map loaded from a binary atlas file
+with tempfile.TemporaryDirectory() as directory:
+    save_map(treasure_map, os.path.join(directory, 'map.atlas'))
+    atlas = Atlas(os.path.join(directory, 'map.atlas'))
+    results.append(
+        Captain(atlas).a_star_search('Mutiny', 'Fogshore', TestHunch(atlas), 2500) == captain.a_star_search('Mutiny', 'Fogshore', hunch, 2500)
+        and atlas['islands']['Mutiny'] == treasure_map['islands']['Mutiny']
+    )
+    del atlas
+
+# Routing over regions of islands, exactly and with a few gateways per region
+exact = Regions(captain, size=10).route('Mutiny', 'Fogshore')
+rough = Regions(captain, size=10, gateways=1).route('Mutiny', 'Fogshore')
+results.append(
+    exact[:2] == captain.uniform_cost_search('Mutiny', 'Fogshore')[:2]
+    and rough[1] >= exact[1] and rough[1] == sum(treasure_map['routes'][a][b] for a, b in zip(rough[0], rough[0][1:]))
+)
+
+# Routing with a few gateways per region finds a path whenever there is one, even where the gateways kept don't connect
+sparse = synthetic_map(2000, 4, 5)
+sparse_captain = Captain(sparse)
+sparse_regions = Regions(sparse_captain, size=64, gateways=1)
+rng = random.Random(1)
+pairs = [tuple(rng.sample(sparse_captain.chart.names, 2)) for _ in range(40)]
+results.append(all(
+    bool(sparse_regions.route(start, goal)[0]) == bool(sparse_captain.uniform_cost_search(start, goal)[0])
+    for start, goal in pairs
+))
+
+# Anytime A* Search, from the greedy path down to the cheapest one
+improvements = list(captain.anytime_a_star_search('Mutiny', 'Fogshore', hunch, 1000000))
+results.append(
+    improvements[0][1] == 96175 and improvements[-1][:3] == captain.uniform_cost_search('Mutiny', 'Fogshore') and improvements[-1][3] == 1
+    and all(cost <= bound * 77836 for _, cost, _, bound in improvements)
+)
+
+# Incremental replanning after a storm doubles the cost of a route
+storm_map = json.loads(json.dumps(treasure_map))
+storm_captain = Captain(storm_map)
+planner = storm_captain.planner('Mutiny', 'Fogshore')
+planner.plan()
+planner.update_route('Marauder', 'Saltspire', 2 * storm_map['routes']['Marauder']['Saltspire'])
+replanned = planner.plan()
+results.append(
+    replanned[:2] == storm_captain.uniform_cost_search('Mutiny', 'Fogshore')[:2] and replanned[2] < 100
+)
+
+# Closing routes changes the chart in place, exactly as compiling it again would, and a rejected route changes nothing
+storm_captain.chart.reverse()
+planner.close_route('Marauder', 'Saltspire')
+planner.close_route('Mutiny', 'Scabbard')
+replanned = planner.plan()
+compiled = Captain(storm_map).chart
+try:
+    planner.update_route('Mutiny', 'Atlantis', 1)
+    rejected = False
+except ValueError:
+    rejected = True
+results.append(
+    replanned[:2] == storm_captain.uniform_cost_search('Mutiny', 'Fogshore')[:2]
+    and all(
+        (getattr(chart, field) == getattr(compiled_chart, field))
+        for chart, compiled_chart in ((storm_captain.chart, compiled), (storm_captain.chart.reverse(), compiled.reverse()))
+        for field in ('offsets', 'targets', 'weights')
+    )
+    and rejected and 'Atlantis' not in storm_map['routes']['Mutiny'] and 'Atlantis' not in storm_captain.chart.ids
+)
+
+# Memory-bounded A* Searches
+results.append(
+    captain.ida_star_search('Mutiny', 'Fogshore', hunch, 2500)[:2] == (
+        ['Mutiny', 'Scabbard', 'Cutlass', 'Bonefire', 'Marauder', 'Saltspire', 'Bloodspike', 'Blackreef', 'Dagger', 'Saltwind', 'Fogshore'],
+        77836
+    )
+)
+results.append(
+    captain.sma_star_search('Mutiny', 'Fogshore', hunch, 2500, 40)[:2] == (
+        ['Mutiny', 'Scabbard', 'Cutlass', 'Bonefire', 'Marauder', 'Saltspire', 'Bloodspike', 'Blackreef', 'Dagger', 'Saltwind', 'Fogshore'],
+        77836
+    )
+)
+results.append(captain.sma_star_search('Mutiny', 'Fogshore', hunch, 2500, 40)[3] <= 40)
+
 # Perform search with the provided hunch
 hunch = Hunch(treasure_map)
 captain = Captain(treasure_map)
 search = captain.a_star_search('Mutiny', 'Fogshore', hunch, 1)
 
-# Print results
-print(results, search)
+# A precomputed hunch must give the same search
+results.append(
+    captain.a_star_search('Mutiny', 'Fogshore', Hunch(treasure_map, precompute=True), 1) == search
+)
+
+# A precomputed hunch shared by threads looking up different goals at once
+shared = Hunch(treasure_map, precompute=True)
+goals = [captain.chart.ids[name] for name in ('Fogshore', 'Blackreef', 'Saltwind', 'Dagger')]
+expected = {goal: Hunch(treasure_map, precompute=True).table(goal) for goal in goals}
+with ThreadPoolExecutor(4) as pool:
+    tables = list(pool.map(lambda goal: (goal, shared.table(goal)), goals * 50))
+results.append(all(table == expected[goal] for goal, table in tables) and len(shared.tables) == len(goals))
+
+# Landmarks shared the same way
+shared = Landmarks(captain, 4)
+expected = {goal: Landmarks(captain, 4).table(goal) for goal in goals}
+with ThreadPoolExecutor(4) as pool:
+    tables = list(pool.map(lambda goal: (goal, shared.table(goal)), goals * 50))
+results.append(all(table == expected[goal] for goal, table in tables) and len(shared.tables) == len(goals))
+
+# The specialized search loops must find exactly what best_first_search finds
+reference = Captain(treasure_map, fast=False)
+results.append(all(
+    getattr(captain, name)('Mutiny', 'Fogshore', *extra) == getattr(reference, name)('Mutiny', 'Fogshore', *extra)
+    for name, extra in [('uniform_cost_search', ()), ('greedy_best_first_search', (hunch,)), ('a_star_search', (hunch, 1)), ('a_star_search', (hunch, 3))]
+))
+
+# Greedy and weighted A* search reopen islands reached more cheaply, and match the original search, on either search loop
+synthetic = synthetic_map(200, 4, 1)
+synthetic_hunch = Hunch(synthetic)
+rng = random.Random(1)
+pairs = [('Isle114', 'Isle185')] + [tuple(rng.sample(sorted(synthetic['islands']), 2)) for _ in range(30)]
+results.append(all(
+    reference.a_star_search('Isle114', 'Isle185', synthetic_hunch, 1e6)[1] == 78331
+    and all(
+        reference.greedy_best_first_search(start, goal, synthetic_hunch)
+        == original_best_first_search(synthetic, start, goal, lambda n, g: synthetic_hunch(n, goal))
+        and all(
+            reference.a_star_search(start, goal, synthetic_hunch, stubbornness)
+            == original_best_first_search(synthetic, start, goal, lambda n, g: g + stubbornness * synthetic_hunch(n, goal))
+            for stubbornness in (2500, 1e6)
+        )
+        for start, goal in pairs
+    )
+    for reference in (Captain(synthetic), Captain(synthetic, fast=False))
+))
+
+# Worker processes may start by importing this script again (e.g. on macOS and Windows), so the fleet only sails from the script itself
+if __name__ == '__main__':
+    # A fleet of worker processes must answer a batch exactly as one captain answers it query by query
+    rng = random.Random(6)
+    queries = [('a_star_search', 'Mutiny', 'Fogshore', 2500), ('uniform_cost_search', 'Fogshore', 'Mutiny'), ('greedy_best_first_search', 'Mutiny', 'Fogshore')]
+    queries += [(algorithm, *rng.sample(captain.chart.names, 2), *extra) for algorithm, extra in [('uniform_cost_search', ()), ('greedy_best_first_search', ()), ('a_star_search', (1,))] for _ in range(10)]
+    expected = [
+        captain.uniform_cost_search(start, goal) if algorithm == 'uniform_cost_search'
+        else captain.greedy_best_first_search(start, goal, hunch) if algorithm == 'greedy_best_first_search'
+        else captain.a_star_search(start, goal, hunch, *extra)
+        for algorithm, start, goal, *extra in queries
+    ]
+    with Fleet(treasure_map, Hunch, workers=2, chunksize=4) as fleet:
+        ordered = list(fleet.run(queries))
+        unordered = dict(fleet.run(queries, ordered=False))
+        # a bad query is rejected when the batch is handed over, before anything is sent to the workers
+        rejected = 0
+        for batch in ([('depth_first_search', 'Mutiny', 'Fogshore')], queries[:5] + [('a_star_search', 'Mutiny', 'Fogshore')]):
+            try:
+                fleet.run(batch)
+            except ValueError:
+                rejected += 1
+    results.append(ordered == expected and [unordered[i] for i in range(len(queries))] == expected and rejected == 2)
+
+    # Print results
+    print(results, search)
@@ -0,0 +1,109 @@
+from typing import List, Tuple, Union
+from orders import Orders
+from grid import Grid
+
+class Basins:
+    def __init__(self, island: Union[List[List[dict]], Grid], orders: Orders) -> None:
+        '''
+        Initialize an index of where hill climbing goes on a static island with fixed orders.
+        Every region gets its steepest-ascent successor, the neighbor hill_climbing_search would step to from it
+        (itself on a local maximum), and the peak it ends on, found by pointer jumping over the successors.
+        Ties go to the first neighbor in Pirate.neighbors order, the same as hill_climbing_search.
+
+        Parameters:
+            island (List[List[dict]]): The island, as a list of lists of region dictionaries or as a Grid.
+            orders (Orders): A callable object that estimates the value of a region (state).
+        '''
+
+        import numpy as np
+
+        self.grid = island if isinstance(island, Grid) else Grid.from_regions(island)
+        self.orders = orders
+
+        field = self.grid.scores(orders)
+        rows, columns = self.grid.shape
+        size = rows * columns
+        index = np.int32 if size < 2 ** 31 else np.int64
+
+        # the best neighbor so far of every region and its value, starting from the region itself
+        # a neighbor only wins if it is strictly better, so the first of equally good neighbors is kept
+        ids = np.arange(size, dtype=index).reshape(rows, columns)
+        successor = ids.copy()
+        best = field.copy()
+        for dx, dy in Grid.OFFSETS:
+            # the regions that have a neighbor at this offset, and those neighbors
+            here = (slice(max(-dx, 0), rows - max(dx, 0)), slice(max(-dy, 0), columns - max(dy, 0)))
+            there = (slice(max(dx, 0), rows + min(dx, 0)), slice(max(dy, 0), columns + min(dy, 0)))
+
+            better = field[there] > best[here]
+            best[here] = np.where(better, field[there], best[here])
+            successor[here] = np.where(better, ids[there], successor[here])
+
+        # hill climbing stops on the treasure, however the orders score it
+        successor[self.grid.treasure] = ids[self.grid.treasure]
+        self.successor = successor.ravel()
+
+        # pointer jumping: every pass doubles how far along its path each region's pointer reaches
+        peak = self.successor.copy()
+        while True:
+            jumped = peak[peak]
+            if np.array_equal(jumped, peak):
+                break
+            peak = jumped
+        self.peak_of = peak
+
+    def peak(self, start: Tuple[int, int]) -> Tuple[int, int]:
+        '''
+        Finds the local maximum hill climbing ends on from a starting region
+
+        Parameters:
+            self
+            start (Tuple[int, int]): the starting region
+
+        Returns:
+            Tuple[int, int]: the region hill_climbing_search ends on
+        '''
+
+        columns = self.grid.shape[1]
+        return divmod(self.peak_of.item(start[0] * columns + start[1]), columns)
+
+    def path(self, start: Tuple[int, int]) -> List[Tuple[int, int]]:
+        '''
+        Follows the steepest-ascent successors from a starting region to its peak
+
+        Parameters:
+            self
+            start (Tuple[int, int]): the starting region
+
+        Returns:
+            List[Tuple[int, int]]: the path hill_climbing_search takes from the starting region
+        '''
+
+        columns = self.grid.shape[1]
+        successor = self.successor
+        path = [tuple(start)]
+        current = start[0] * columns + start[1]
+
+        while True:
+            following = successor.item(current)
+            if following == current:
+                return path
+            current = following
+            path.append(divmod(current, columns))
+
+    def peaks(self) -> List[Tuple[int, int]]:
+        '''
+        Lists every local maximum of the island, and the treasure
+
+        Parameters:
+            self
+
+        Returns:
+            List[Tuple[int, int]]: every region hill climbing stops on
+        '''
+
+        import numpy as np
+
+        columns = self.grid.shape[1]
+        ends = np.flatnonzero(self.successor == np.arange(len(self.successor)))
+        return [divmod(i, columns) for i in ends.tolist()]
@@ -0,0 +1,268 @@
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+from orders import Orders
+from whimsy import Whimsy
+from pirate import Pirate
+from grid import Grid
+
+# every search method and how to call it from one starting region
+METHODS: Dict[str, Callable] = {
+    'hill_climbing_search': lambda pirate, start: pirate.hill_climbing_search(Orders(), start),
+    'stochastic_hill_climbing_search': lambda pirate, start: pirate.stochastic_hill_climbing_search(Orders(), start),
+    'boltzmann_simulated_annealing_search': lambda pirate, start: pirate.boltzmann_simulated_annealing_search(Orders(), Whimsy(), start),
+}
+
+class Row:
+    def __init__(self, island: 'SyntheticIsland', x: int) -> None:
+        self.island = island
+        self.x = x
+
+    def __len__(self) -> int:
+        return self.island.size
+
+    def __getitem__(self, y: int) -> dict:
+        if not 0 <= y < self.island.size:
+            raise IndexError(y)
+        return self.island.region(self.x, y)
+
+class SyntheticIsland:
+    def __init__(self, size: int, seed: int = 0) -> None:
+        '''
+        Initialize a random square island shaped like island.json, that a Pirate can search just like a list of lists.
+        Regions are computed when they are looked at instead of being stored, so islands of 10000 x 10000 regions
+        take no more memory than small ones. The same arguments always give the same island.
+
+        Elevation is a few overlapping waves plus a little noise, so the island has hills and valleys
+        for the local searches to climb, and terrain is jungle or desert like island.json.
+
+        Parameters:
+            size (int): the number of regions along each side
+            seed (int): the seed of the random number generator
+        '''
+
+        rng = random.Random(seed)
+        self.size = size
+        self.seed = seed
+
+        # (amplitude, frequency along x, frequency along y, phase) of every wave; longer waves are higher
+        self.waves = [
+            (20 / octave, rng.uniform(0.5, 1.5) * octave * 2 * math.pi / size * 4,
+             rng.uniform(0.5, 1.5) * octave * 2 * math.pi / size * 4, rng.uniform(0, 2 * math.pi))
+            for octave in (1, 2, 4, 8)
+        ]
+        self.treasure = (rng.randrange(size), rng.randrange(size))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, x: int) -> Row:
+        if not 0 <= x < self.size:
+            raise IndexError(x)
+        return Row(self, x)
+
+    def noise(self, x: int, y: int) -> int:
+        '''
+        A cheap integer hash of a region and the seed
+
+        Parameters:
+            self
+            x (int): the x-coordinate of the region
+            y (int): the y-coordinate of the region
+
+        Returns:
+            int: a number from 0 to 65535
+        '''
+
+        h = (x * 73856093) ^ (y * 19349663) ^ (self.seed * 83492791)
+        h = (h ^ (h >> 13)) * 1274126177
+        return (h ^ (h >> 16)) & 0xffff
+
+    def region(self, x: int, y: int) -> dict:
+        '''
+        Computes the region dictionary at a given coordinate
+
+        Parameters:
+            self
+            x (int): the x-coordinate of the region
+            y (int): the y-coordinate of the region
+
+        Returns:
+            dict: the region, with the same keys as in island.json
+        '''
+
+        noise = self.noise(x, y)
+        height = sum(a * math.sin(fx * x + fy * y + phase) for a, fx, fy, phase in self.waves)
+        elevation = max(0, int(40 + height + (noise & 0xff) / 32))
+
+        return {
+            'x_coordinate': x,
+            'y_coordinate': y,
+            'elevation': elevation,
+            'terrain': 'jungle' if noise >> 15 else 'desert',
+            'treasure': (x, y) == self.treasure,
+        }
+
+def synthetic_island(size: int, seed: int = 0, materialize: bool = False):
+    '''
+    Generates a random island shaped like island.json
+
+    Parameters:
+        size (int): the number of regions along each side, up to 10000
+        seed (int): the seed of the random number generator
+        materialize (bool): return a list of lists of region dictionaries, like json.load of island.json, instead of computing regions on demand
+
+    Returns:
+        SyntheticIsland or List[List[dict]]: the island
+    '''
+
+    island = SyntheticIsland(size, seed)
+    if materialize:
+        return [[island.region(x, y) for y in range(size)] for x in range(size)]
+    return island
+
+def percentile(values: List[float], q: float) -> float:
+    '''
+    Returns the q-th percentile of the values, interpolating between the closest two
+
+    Parameters:
+        values (List[float]): the values, in any order
+        q (float): the percentile, from 0 to 100
+
+    Returns:
+        float: the percentile
+    '''
+
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    lo = int(position)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (position - lo)
+
+def measure(run: Callable[[Tuple[int, int]], object], starts: List[Tuple[int, int]], seed: int) -> Dict[str, float]:
+    '''
+    Times a search from a batch of starting regions, then runs the first one again under tracemalloc for its peak memory.
+    The random number generator is seeded before every run, so the stochastic searches are repeatable.
+
+    Parameters:
+        run (Callable): runs the search from one starting region
+        starts (List[Tuple[int, int]]): the starting regions
+        seed (int): the seed for the random number generator
+
+    Returns:
+        dict: throughput in searches per second, latency percentiles in milliseconds, and peak memory in bytes
+    '''
+
+    latencies = []
+    for i, start in enumerate(starts):
+        random.seed(seed + i)
+        begin = time.perf_counter()
+        run(start)
+        latencies.append((time.perf_counter() - begin) * 1000)
+    total = sum(latencies) / 1000
+
+    # tracemalloc slows the search down, so memory is measured apart from the timed runs
+    random.seed(seed)
+    tracemalloc.start()
+    run(starts[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'queries': len(starts),
+        'throughput': len(starts) / total if total else float('inf'),
+        'p50_ms': percentile(latencies, 50),
+        'p90_ms': percentile(latencies, 90),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies),
+        'peak_bytes': peak,
+    }
+
+def environment() -> Dict[str, Optional[str]]:
+    '''
+    Describes where the benchmark ran, so that results from different versions can be told apart
+
+    Returns:
+        dict: the git commit (if any), Python version, platform and time
+    '''
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    '''
+    Finds benchmarks whose median latency got worse than the baseline by more than the tolerance
+
+    Parameters:
+        results (List[Dict]): the results of this run
+        baseline (List[Dict]): the results of an earlier run
+        tolerance (float): the allowed slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        List[str]: a description of every regression
+    '''
+
+    before = {(r['method'], r['size']): r for r in baseline}
+    regressions = []
+
+    for r in results:
+        old = before.get((r['method'], r['size']))
+        if old is not None and r['p50_ms'] > old['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{r['method']} at {r['size']}: p50 {old['p50_ms']:.3f} ms -> {r['p50_ms']:.3f} ms")
+
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the Pirate search methods on synthetic islands.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 100, 1000, 10000], help='regions along each side, up to 10000')
+    parser.add_argument('--queries', type=int, default=50, help='random starting regions per method and size')
+    parser.add_argument('--methods', nargs='+', default=list(METHODS), choices=list(METHODS))
+    parser.add_argument('--materialize', action='store_true', help='build every island as a list of lists instead of computing regions on demand')
+    parser.add_argument('--grid', action='store_true', help='search every island as a Grid of arrays (built from every region, so keep sizes moderate)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results.json', help='where to write the results as JSON')
+    parser.add_argument('--baseline', help='results of an earlier run to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        island = synthetic_island(size, args.seed, args.materialize)
+        pirate = Pirate(Grid.from_regions(island) if args.grid else island)
+
+        rng = random.Random(args.seed)
+        starts = [(rng.randrange(size), rng.randrange(size)) for _ in range(args.queries)]
+
+        for method in args.methods:
+            search = METHODS[method]
+            result = measure(lambda start: search(pirate, start), starts, args.seed)
+            result.update(method=method, size=size)
+            results.append(result)
+            print(f"{method:36} {size:>6}^2 regions  {result['throughput']:10.1f} q/s  p50 {result['p50_ms']:9.3f} ms  "
+                  f"p99 {result['p99_ms']:9.3f} ms  peak {result['peak_bytes'] / 1e6:8.2f} MB")
+
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'seed': args.seed, 'materialize': args.materialize, 'grid': args.grid, 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for regression in regressions:
+            print('regression:', regression)
+        return 1 if regressions else 0
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from orders import Orders
+from grid import Grid
+
+class Course:
+    def __init__(self, island: Union[List[List[dict]], Grid], orders: Optional[Orders] = None, base: float = 1.0,
+                 climb: float = 1.0, tolls: Optional[Dict[str, float]] = None) -> None:
+        '''
+        Initialize the island as an implicit graph, so that global searches can plan the whole way to the treasure
+        instead of climbing and getting stuck on a local maximum. Every region is a node with an integer id, x * columns + y,
+        and its routes go to its neighbors in the same order as Pirate.neighbors. Routes are worked out as they are asked for,
+        so nothing the size of the island is built besides what the searches reach.
+
+        Stepping from one region to a neighbor costs base, plus climb for every unit of elevation gained or lost,
+        plus the toll of the neighbor's terrain.
+
+        Parameters:
+            island (List[List[dict]]): The island, as a list of lists of region dictionaries or as a Grid.
+            orders (Orders): The orders, whose regions scored as infinitely valuable are the goals. None makes the treasure the goal.
+            base (float): the cost of any step, must be more than 0
+            climb (float): the cost of every unit of elevation change
+            tolls (Dict[str, float]): the extra cost of stepping onto each terrain, e.g. {'jungle': 5}, none by default
+        '''
+
+        import numpy as np
+
+        if base <= 0 or climb < 0 or any(toll < 0 for toll in (tolls or {}).values()):
+            raise ValueError('the step cost must be more than 0, and climbing and tolls can not cost less than 0')
+
+        self.grid = island if isinstance(island, Grid) else Grid.from_regions(island)
+        self.base = base
+        self.climb = climb
+        self.columns = self.grid.shape[1]
+
+        # flat views of the island, indexed by region id
+        self.elevation = self.grid.elevation.ravel()
+        self.terrain = self.grid.terrain.ravel()
+        self.tolls = [(tolls or {}).get(name, 0.0) for name in self.grid.terrains]
+
+        goals = np.isposinf(self.grid.scores(orders)) if orders is not None else self.grid.treasure
+        self.goals = set(np.flatnonzero(goals).tolist())
+        self.targets = [(divmod(goal, self.columns), self.elevation.item(goal)) for goal in self.goals]
+
+    def __len__(self) -> int:
+        return self.grid.shape[0] * self.columns
+
+    def id(self, coord: Tuple[int, int]) -> int:
+        return coord[0] * self.columns + coord[1]
+
+    def coord(self, i: int) -> Tuple[int, int]:
+        return divmod(i, self.columns)
+
+    def routes(self, i: int) -> Iterator[Tuple[int, float]]:
+        '''
+        Provides all the routes leaving a region, like Chart.routes
+
+        Parameters:
+            self
+            i (int): the id of the region
+
+        Returns:
+            Iterator[Tuple[int, float]]: the id of every neighbor and the cost to step there
+        '''
+
+        elevation, terrain, tolls = self.elevation, self.terrain, self.tolls
+        here = elevation.item(i)
+        for x, y in self.grid.neighbors(*divmod(i, self.columns)):
+            j = x * self.columns + y
+            yield j, self.base + self.climb * abs(elevation.item(j) - here) + tolls[terrain.item(j)]
+
+    def hunch(self, i: int) -> float:
+        '''
+        Estimates the cost from a region to the nearest goal without overestimating it: every step costs at least base,
+        and the elevation changes along any path add up to at least the difference in elevation
+
+        Parameters:
+            self
+            i (int): the id of the region
+
+        Returns:
+            float: the estimated cost
+        '''
+
+        x, y = divmod(i, self.columns)
+        here = self.elevation.item(i)
+        return min((self.base * (abs(gx - x) + abs(gy - y)) + self.climb * abs(elevation - here)
+                    for (gx, gy), elevation in self.targets), default=0.0)
+
+    def best_first_search(self, start: Tuple[int, int], f_func) -> Tuple[List[Tuple[int, int]], float, int]:
+        '''
+        Helper function that performs best first search towards the goals, the same way Captain.best_first_search does
+
+        Parameters:
+            self
+            start (Tuple[int, int]): the starting region
+            f_func: the evaluation function (f(n)), called with a region id and the path cost (g(n))
+
+        Returns:
+            tuple[list[Tuple[int, int]], float, int]: the path, its cost, and the number of regions reached
+        '''
+
+        start = self.id(start)
+        goals = self.goals
+
+        cost = {start: 0} # the cheapest known path cost (g(n)) to every region we reached
+        parent = {start: None} # the region each reached region was reached from
+        counter = itertools.count() # ties go to the earliest push
+        frontier = [(f_func(start, 0), next(counter), start, 0)]
+        closed = set() # the regions that have already been expanded
+
+        while frontier:
+            _, _, state, g = heapq.heappop(frontier)
+
+            # an entry left behind when a cheaper path to its region was pushed
+            if state in closed or g > cost[state]:
+                continue
+            closed.add(state)
+
+            if state in goals:
+                return self.path(parent, state), g, len(cost)
+
+            for neighbor, travel_cost in self.routes(state):
+                new_cost = g + travel_cost
+
+                if neighbor not in cost or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = state
+                    heapq.heappush(frontier, (f_func(neighbor, new_cost), next(counter), neighbor, new_cost))
+
+        return [], 0, len(cost)
+
+    def path(self, parent: Dict[int, Optional[int]], state: int) -> List[Tuple[int, int]]:
+        '''
+        Helper function that follows the parents of a region back to the start
+
+        Parameters:
+            self
+            parent (Dict[int, Optional[int]]): the region each reached region was reached from
+            state (int): the last region of the path
+
+        Returns:
+            List[Tuple[int, int]]: the coordinates of the regions along the path
+        '''
+
+        path = []
+        while state is not None:
+            path.append(divmod(state, self.columns))
+            state = parent[state]
+        return path[::-1]
+
+    def uniform_cost_search(self, start: Tuple[int, int]) -> Tuple[List[Tuple[int, int]], float, int]:
+        '''
+        Finds the cheapest path from a region to the nearest goal with uniform cost search
+
+        Parameters:
+            start (Tuple[int, int]): the starting region
+
+        Returns:
+            List[Tuple[int, int]]: the coordinates of the regions along the path, [] if no goal can be reached
+            float: the cost of the path
+            int: the number of regions reached
+        '''
+
+        return self.best_first_search(start, f_func=lambda n, g: g)
+
+    def a_star_search(self, start: Tuple[int, int], stubbornness: float = 1) -> Tuple[List[Tuple[int, int]], float, int]:
+        '''
+        Finds the cheapest path from a region to the nearest goal with A* search guided by hunch.
+        With a stubbornness of 1 the path is as cheap as the one uniform cost search finds, usually after reaching far fewer regions.
+
+        Parameters:
+            start (Tuple[int, int]): the starting region
+            stubbornness (float): A multiplier on the hunch's influence; above 1 trades the guarantee for speed.
+
+        Returns:
+            List[Tuple[int, int]]: the coordinates of the regions along the path, [] if no goal can be reached
+            float: the cost of the path
+            int: the number of regions reached
+        '''
+
+        return self.best_first_search(start, f_func=lambda n, g: g + stubbornness * self.hunch(n))
+
+    def beam_search(self, start: Tuple[int, int], width: int = 100) -> Tuple[List[Tuple[int, int]], float, int]:
+        '''
+        Searches towards the nearest goal one step at a time, keeping only the width most promising regions (by g + hunch)
+        of every step. The memory used grows with width times the length of the path rather than with the island,
+        but the path found is not always the cheapest and a goal can be missed.
+
+        Parameters:
+            start (Tuple[int, int]): the starting region
+            width (int): the most regions kept at every step
+
+        Returns:
+            List[Tuple[int, int]]: the coordinates of the regions along the path, [] if no goal was found
+            float: the cost of the path
+            int: the number of regions reached
+        '''
+
+        start = self.id(start)
+        cost = {start: 0}
+        parent = {start: None}
+        beam = [start]
+
+        while beam:
+            # a goal in the beam ends the search, the cheapest one if there are several
+            reached = [state for state in beam if state in self.goals]
+            if reached:
+                goal = min(reached, key=cost.__getitem__)
+                return self.path(parent, goal), cost[goal], len(cost)
+
+            layer = {}
+            for state in beam:
+                for neighbor, travel_cost in self.routes(state):
+                    new_cost = cost[state] + travel_cost
+
+                    # regions already reached by an earlier step are never improved, which keeps the search from going in circles
+                    if neighbor in cost and neighbor not in layer:
+                        continue
+                    if neighbor not in layer or new_cost < cost[neighbor]:
+                        layer[neighbor] = new_cost + self.hunch(neighbor)
+                        cost[neighbor] = new_cost
+                        parent[neighbor] = state
+
+            beam = heapq.nsmallest(width, layer, key=layer.__getitem__)
+
+        return [], 0, len(cost)
@@ -0,0 +1,745 @@
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from orders import Orders
+from whimsy import Whimsy
+from grid import Grid
+from pirate import Pirate
+from probe import Probe
+
+ALGORITHMS = ('hill_climbing_search', 'stochastic_hill_climbing_search', 'boltzmann_simulated_annealing_search')
+
+MASK = (1 << 64) - 1
+
+# the neighbor order boltzmann_simulated_annealing_search draws from, which differs from Pirate.neighbors
+ANNEALING_OFFSETS = ((-1, 0), (1, 0), (0, 1), (0, -1))
+
+def mix(z: int) -> int:
+    '''
+    The splitmix64 hash: turns a 64-bit integer into another that looks random
+
+    Parameters:
+        z (int): the integer to hash
+
+    Returns:
+        int: the hash, from 0 to 2**64 - 1
+    '''
+
+    z = (z + 0x9E3779B97F4A7C15) & MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
+
+def walker_seeds(seed: int, walkers: int) -> List[int]:
+    '''
+    Gives every walker its own seed, so that each walker's random choices only depend on the seed and its number
+
+    Parameters:
+        seed (int): the seed of the whole search
+        walkers (int): the number of walkers
+
+    Returns:
+        List[int]: the seed of every walker
+    '''
+
+    base = mix(seed & MASK)
+    return [mix(base ^ i) for i in range(walkers)]
+
+def uniforms(keys, step: int, draw: int):
+    '''
+    Draws one random number from 0 to 1 for every walker, as a hash of its seed, the step and which draw of the step it is.
+    Every walker gets its own stream this way, however many walkers run alongside it.
+
+    Parameters:
+        keys (numpy.ndarray): the seed of every walker, as uint64
+        step (int): the step of the search
+        draw (int): which draw of the step this is
+
+    Returns:
+        numpy.ndarray: the random numbers, as float64
+    '''
+
+    import numpy as np
+
+    z = keys + np.uint64(((2 * step + draw + 1) * 0x9E3779B97F4A7C15) & MASK)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+class Steps(Probe):
+    '''
+    A probe that only keeps the number of steps of the last search, and leaves the orders and whimsy as they are
+    '''
+
+    def __init__(self) -> None:
+        self.steps = 0
+
+    def end(self, path: List[Tuple[int, int]], steps: int) -> None:
+        self.steps = steps
+
+# the pirate of the current worker process, built once by its initializer
+pirate = None
+
+def board(island: Union[List[List[dict]], Grid]) -> None:
+    '''
+    Worker initializer: builds the worker's pirate from the island, once per process
+
+    Parameters:
+        island (List[List[dict]]): the island, as a list of lists of region dictionaries or as a Grid
+    '''
+
+    global pirate
+    pirate = Pirate(island, probe=Steps())
+
+def walk(task: Tuple) -> Tuple[int, List[Tuple[int, int]], int]:
+    '''
+    Runs one walker with this process's pirate, seeding the random number generator with the walker's seed first
+
+    Parameters:
+        task (Tuple): (walker, algorithm, orders, whimsy, start, seed, max_steps, max_seconds)
+
+    Returns:
+        Tuple[int, List[Tuple[int, int]], int]: the walker, its path and its number of steps
+    '''
+
+    walker, algorithm, orders, whimsy, start, seed, max_steps, max_seconds = task
+    random.seed(seed)
+
+    if algorithm == 'boltzmann_simulated_annealing_search':
+        path = pirate.boltzmann_simulated_annealing_search(orders, whimsy, start, max_steps, max_seconds)
+    else:
+        path = getattr(pirate, algorithm)(orders, start)
+
+    return walker, path, pirate.probe.steps
+
+def walk_chunk(chunk: List[Tuple]) -> List[Tuple[int, List[Tuple[int, int]], int]]:
+    '''
+    Runs a chunk of walkers in a worker process
+
+    Parameters:
+        chunk (List[Tuple]): the tasks of the walkers
+
+    Returns:
+        List[Tuple[int, List[Tuple[int, int]], int]]: the walker, its path and its number of steps, for every walker
+    '''
+
+    return [walk(task) for task in chunk]
+
+class Lineage:
+    def __init__(self, starts: List[Tuple[int, int]]) -> None:
+        '''
+        Initialize the paths of a population of walkers, kept as one tree of the regions they moved to.
+        Every move adds a node pointing back at the walker's last one, so a walker copied onto another shares
+        the path both have in common instead of copying it, and any path is rebuilt by following the nodes back.
+
+        Parameters:
+            starts (List[Tuple[int, int]]): the starting region of every walker
+        '''
+
+        import numpy as np
+
+        count = len(starts)
+        self.x = [np.array([s[0] for s in starts], dtype=np.int64)] # the region of every node, a chunk per step
+        self.y = [np.array([s[1] for s in starts], dtype=np.int64)]
+        self.back = [np.full(count, -1, dtype=np.int64)] # the node every node came from, -1 for a start
+        self.tip = np.arange(count, dtype=np.int64) # the last node of every walker
+        self.moves = np.zeros(count, dtype=np.int64) # the number of moves in the path of every walker
+        self.size = count
+
+    def move(self, walkers, x, y) -> None:
+        '''
+        Add a move to the path of some of the walkers
+
+        Parameters:
+            self
+            walkers (numpy.ndarray): the walkers that moved
+            x (numpy.ndarray): the x-coordinate each of them moved to
+            y (numpy.ndarray): the y-coordinate each of them moved to
+        '''
+
+        import numpy as np
+
+        nodes = np.arange(self.size, self.size + len(walkers), dtype=np.int64)
+        self.x.append(x)
+        self.y.append(y)
+        self.back.append(self.tip[walkers])
+        self.tip[walkers] = nodes
+        self.moves[walkers] += 1
+        self.size += len(walkers)
+
+    def copy(self, walkers, parents) -> None:
+        '''
+        Give some of the walkers the paths of others
+
+        Parameters:
+            self
+            walkers (numpy.ndarray): the walkers whose paths are replaced
+            parents (numpy.ndarray): the walker each of them takes the path of
+        '''
+
+        self.tip[walkers] = self.tip[parents]
+        self.moves[walkers] = self.moves[parents]
+
+    def path(self, node: int) -> List[Tuple[int, int]]:
+        '''
+        Rebuilds the path that ends at a node
+
+        Parameters:
+            self
+            node (int): the last node of the path
+
+        Returns:
+            List[Tuple[int, int]]: the regions from the start to the node
+        '''
+
+        import numpy as np
+
+        x, y, back = (np.concatenate(chunks).tolist() for chunks in (self.x, self.y, self.back))
+        path = []
+        while node != -1:
+            path.append((x[node], y[node]))
+            node = back[node]
+        return path[::-1]
+
+class Crew:
+    def __init__(self, island: Union[List[List[dict]], Grid], workers: Optional[int] = None, chunksize: int = 4) -> None:
+        '''
+        Initialize a crew of pirates that search the same island from many starting regions at once (random restarts),
+        so that a walker stuck on a local maximum doesn't end the hunt.
+        Walkers either run in lockstep as one NumPy population, or one per task in a pool of worker processes.
+
+        Parameters:
+            island (List[List[dict]]): The island, as a list of lists of region dictionaries or as a Grid.
+            workers (int): The number of worker processes for parallel='processes', defaults to the number of CPUs.
+            chunksize (int): The number of walkers sent to a worker at a time.
+        '''
+
+        self.island = island
+        self.grid = island if isinstance(island, Grid) else None # built the first time the crew walks in lockstep
+        self.field = None # (orders, the value of every region of the grid) for the orders used last
+        self.workers = workers
+        self.chunksize = chunksize
+        self.pool = None # started the first time the crew walks in processes
+
+    def __enter__(self) -> 'Crew':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''
+        Shut down the worker processes, if any were started
+
+        Parameters:
+            self
+        '''
+
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def search(self, algorithm: str, orders: Orders, whimsy: Optional[Whimsy] = None, walkers: int = 16,
+               starts: Optional[Sequence[Tuple[int, int]]] = None, seed: int = 0, parallel: str = 'lockstep',
+               stop_on_treasure: bool = True, max_steps: int = 1000, max_seconds: Optional[float] = None) -> Tuple[List[Tuple[int, int]], List[Dict]]:
+        '''
+        Runs many walkers of one local search and returns the best path any of them found.
+
+        In lockstep, walker i draws its random numbers from a stream that only depends on seed and i, so its path is
+        the same however many walkers run. Hill climbing walkers take exactly the path hill_climbing_search would.
+        In processes, each walker is a call to the Pirate method after seeding the random module with the walker's seed,
+        so its path is exactly what that call gives on its own.
+
+        Parameters:
+            algorithm (str): The name of a Pirate search method, e.g. 'stochastic_hill_climbing_search'.
+            orders (Orders): A callable object that estimates the value of a region (state).
+            whimsy (Whimsy): The temperature schedule, only used by boltzmann_simulated_annealing_search.
+            walkers (int): The number of walkers, ignored if starts are given.
+            starts (Sequence[Tuple[int, int]]): The starting region of every walker. If None, they are drawn at random from seed.
+            seed (int): The seed every walker's own seed is derived from.
+            parallel (str): 'lockstep' to step all walkers together with NumPy, or 'processes' to use a process pool.
+            stop_on_treasure (bool): Stop every walker as soon as one of them finds the treasure.
+                In processes, walkers already running still finish, and walkers not started yet are left out of the summaries.
+            max_steps (int): The most timesteps each walker searches for, only used by boltzmann_simulated_annealing_search.
+            max_seconds (float): The most seconds each walker searches for, checked every 64 steps, only used by
+                boltzmann_simulated_annealing_search. In processes, every walker's clock starts when it does. None for no limit.
+
+        Returns:
+            List[Tuple[int, int]]: The best path: the shortest one that found the treasure, or else the one ending on the most valuable region.
+            List[Dict]: A summary of every walker that ran: its number, seed, start, end, the value of its end, steps, moves and whether it found the treasure.
+        '''
+
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f'unknown search algorithm: {algorithm}')
+        if algorithm == 'boltzmann_simulated_annealing_search' and whimsy is None:
+            raise ValueError('boltzmann_simulated_annealing_search needs a whimsy')
+
+        rows = len(self.island)
+        columns = self.grid.shape[1] if self.grid is not None else len(self.island[0])
+        if starts is None:
+            rng = random.Random(seed)
+            starts = [(rng.randrange(rows), rng.randrange(columns)) for _ in range(walkers)]
+        starts = [tuple(start) for start in starts]
+        seeds = walker_seeds(seed, len(starts))
+
+        if parallel == 'lockstep':
+            paths, steps = self.lockstep(algorithm, orders, whimsy, starts, seeds, stop_on_treasure, max_steps, max_seconds)
+        elif parallel == 'processes':
+            paths, steps = self.processes(algorithm, orders, whimsy, starts, seeds, stop_on_treasure, max_steps, max_seconds)
+        else:
+            raise ValueError(f"parallel must be 'lockstep' or 'processes', not {parallel!r}")
+
+        pirate = Pirate(self.island)
+
+        summaries = []
+        for walker in sorted(paths):
+            path = paths[walker]
+            summaries.append({
+                'walker': walker,
+                'seed': seeds[walker],
+                'start': path[0],
+                'end': path[-1],
+                'score': orders(pirate.cell(path[-1])),
+                'steps': steps[walker],
+                'moves': len(path) - 1,
+                'treasure': pirate.is_treasure(path[-1]),
+            })
+
+        if not summaries:
+            return [], summaries
+
+        best = min(summaries, key=lambda s: (not s['treasure'], s['moves'] if s['treasure'] else -s['score'], s['walker']))
+        return paths[best['walker']], summaries
+
+    def scores(self, orders: Orders):
+        '''
+        Helper function that provides the value of every region of the grid, keeping it for as long as the same orders are used.
+        Orders without a score_grid that matches their __call__ are called on every region once.
+
+        Parameters:
+            self
+            orders (Orders): A callable object that estimates the value of a region (state).
+
+        Returns:
+            numpy.ndarray: the value of the region at [x, y], as float64
+        '''
+
+        if self.grid is None:
+            self.grid = Grid.from_regions(self.island)
+
+        if self.field is None or self.field[0] != orders:
+            self.field = (orders, self.grid.scores(orders))
+
+        return self.field[1]
+
+    def lockstep(self, algorithm: str, orders: Orders, whimsy: Optional[Whimsy], starts: List[Tuple[int, int]], seeds: List[int],
+                 stop_on_treasure: bool, max_steps: int, max_seconds: Optional[float]) -> Tuple[Dict[int, List[Tuple[int, int]]], Dict[int, int]]:
+        '''
+        Helper function that steps every walker together, one NumPy operation over all walkers still going per step
+
+        Parameters:
+            self
+            algorithm (str): the name of a Pirate search method
+            orders (Orders): A callable object that estimates the value of a region (state).
+            whimsy (Whimsy): the temperature schedule of boltzmann_simulated_annealing_search
+            starts (List[Tuple[int, int]]): the starting region of every walker
+            seeds (List[int]): the seed of every walker
+            stop_on_treasure (bool): stop every walker as soon as one of them finds the treasure
+            max_steps (int): the most timesteps to anneal for
+            max_seconds (float): the most seconds to anneal for, or None
+
+        Returns:
+            Dict[int, List[Tuple[int, int]]]: the path of every walker
+            Dict[int, int]: the number of steps of every walker
+        '''
+
+        import numpy as np
+
+        field = self.scores(orders)
+        grid = self.grid
+        rows, columns = grid.shape
+        count = len(starts)
+
+        annealing = algorithm == 'boltzmann_simulated_annealing_search'
+        dx, dy = (np.array(d, dtype=np.int64) for d in zip(*(ANNEALING_OFFSETS if annealing else Grid.OFFSETS)))
+
+        x = np.array([s[0] for s in starts], dtype=np.int64)
+        y = np.array([s[1] for s in starts], dtype=np.int64)
+        keys = np.array(seeds, dtype=np.uint64)
+        score = field[x, y]
+        found = grid.treasure[x, y]
+        active = ~found # walkers that haven't stopped
+        steps = np.zeros(count, dtype=np.int64)
+        moves = [] # (walkers that moved, their new x, their new y) at every step
+
+        deadline = time.perf_counter() + max_seconds if annealing and max_seconds is not None else None
+
+        t = 0
+        while active.any() and not (annealing and t >= max_steps) and not (stop_on_treasure and found.any()):
+            if deadline is not None and t % 64 == 0 and time.perf_counter() >= deadline:
+                break
+
+            walkers = np.flatnonzero(active)
+            cx, cy = x[walkers], y[walkers]
+            current = score[walkers]
+
+            # the value of every neighbor of every walker, -inf where the neighbor is off the island
+            nx, ny = cx[:, None] + dx, cy[:, None] + dy
+            valid = (nx >= 0) & (nx < rows) & (ny >= 0) & (ny < columns)
+            values = np.where(valid, field[np.clip(nx, 0, rows - 1), np.clip(ny, 0, columns - 1)], -np.inf)
+            rank = np.arange(len(walkers))
+
+            if algorithm == 'hill_climbing_search':
+                # the first of the best neighbors, if it is better than where the walker is
+                choice = values.argmax(axis=1)
+                move = values[rank, choice] > current
+                active[walkers[~move]] = False
+                steps[walkers] += 1
+            else:
+                # a neighbor picked at random from the better ones (stochastic) or from all of them (annealing)
+                options = valid if annealing else values > current[:, None]
+                number = options.sum(axis=1)
+                pick = np.minimum((uniforms(keys[walkers], t, 0) * number).astype(np.int64), np.maximum(number - 1, 0))
+                choice = ((np.cumsum(options, axis=1) - 1 == pick[:, None]) & options).argmax(axis=1)
+
+                if annealing:
+                    # a worse neighbor is taken with probability e^(delta / T), the same rule as the single walker
+                    delta = values[rank, choice] - current
+                    T = whimsy(t)
+                    with np.errstate(over='ignore', invalid='ignore'):
+                        chance = np.exp(delta / T) if T > 0 else np.zeros(len(walkers))
+                    move = (number > 0) & ((delta >= 0) | (uniforms(keys[walkers], t, 1) < chance))
+                    active[walkers[number == 0]] = False
+                    steps[walkers[number > 0]] += 1
+                else:
+                    move = number > 0
+                    active[walkers[~move]] = False
+                    steps[walkers] += 1
+
+            moved = walkers[move]
+            x[moved] = nx[move, choice[move]]
+            y[moved] = ny[move, choice[move]]
+            score[moved] = values[move, choice[move]]
+            moves.append((moved, x[moved], y[moved]))
+
+            # a walker that finds the treasure stops there
+            arrived = moved[grid.treasure[x[moved], y[moved]]]
+            found[arrived] = True
+            active[arrived] = False
+            t += 1
+
+        paths = {walker: [start] for walker, start in enumerate(starts)}
+        for moved, mx, my in moves:
+            for walker, a, b in zip(moved.tolist(), mx.tolist(), my.tolist()):
+                paths[walker].append((a, b))
+
+        return paths, dict(enumerate(steps.tolist()))
+
+    def processes(self, algorithm: str, orders: Orders, whimsy: Optional[Whimsy], starts: List[Tuple[int, int]], seeds: List[int],
+                  stop_on_treasure: bool, max_steps: int, max_seconds: Optional[float]) -> Tuple[Dict[int, List[Tuple[int, int]]], Dict[int, int]]:
+        '''
+        Helper function that runs the walkers in a pool of worker processes
+
+        Parameters:
+            self
+            algorithm (str): the name of a Pirate search method
+            orders (Orders): A callable object that estimates the value of a region (state). It must be picklable.
+            whimsy (Whimsy): the temperature schedule of boltzmann_simulated_annealing_search. It must be picklable.
+            starts (List[Tuple[int, int]]): the starting region of every walker
+            seeds (List[int]): the seed of every walker
+            stop_on_treasure (bool): stop handing out walkers as soon as one of them finds the treasure
+            max_steps (int): the most timesteps every walker anneals for
+            max_seconds (float): the most seconds every walker anneals for, or None
+
+        Returns:
+            Dict[int, List[Tuple[int, int]]]: the path of every walker that ran
+            Dict[int, int]: the number of steps of every walker that ran
+        '''
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=board, initargs=(self.island,))
+
+        tasks = [(walker, algorithm, orders, whimsy, start, seed, max_steps, max_seconds)
+                 for walker, (start, seed) in enumerate(zip(starts, seeds))]
+        pending = {self.pool.submit(walk_chunk, tasks[i:i + self.chunksize]) for i in range(0, len(tasks), self.chunksize)}
+        treasure = Pirate(self.island).is_treasure
+        paths, steps = {}, {}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for walker, path, walker_steps in future.result():
+                    paths[walker], steps[walker] = path, walker_steps
+
+            if stop_on_treasure and any(treasure(path[-1]) for path in paths.values()):
+                # chunks that haven't started are dropped, the ones already running are waited for
+                pending = {future for future in pending if not future.cancel()}
+                stop_on_treasure = False
+
+        return paths, steps
+
+    def parallel_tempering_search(self, orders: Orders, whimsy: Optional[Whimsy] = None, chains: int = 8,
+                                  starts: Optional[Sequence[Tuple[int, int]]] = None, temperatures: Optional[Sequence[float]] = None,
+                                  max_steps: int = 1000, swap_every: int = 10, seed: int = 0, max_seconds: Optional[float] = None,
+                                  stop_on_treasure: bool = True) -> Tuple[List[Tuple[int, int]], Dict]:
+        '''
+        Runs simulated annealing chains at fixed temperatures side by side (replica exchange), stepped in lockstep with NumPy.
+        Every swap_every steps, chains at neighboring temperatures offer to trade temperatures, and a trade is taken with
+        the Metropolis probability min(1, e^((s_b - s_a) * (1/T_a - 1/T_b))), so a chain that found a better region cools down
+        while a stuck one heats up and can climb out of its local maximum. Pairs alternate between even and odd rungs of the ladder.
+        Each chain draws its random numbers from its own stream, like the walkers of search.
+
+        Parameters:
+            orders (Orders): A callable object that estimates the value of a region (state).
+            whimsy (Whimsy): The schedule the ladder of temperatures is taken from, evenly spaced over max_steps, hottest first.
+                An exponential Whimsy by default.
+            chains (int): The number of chains, ignored if starts are given.
+            starts (Sequence[Tuple[int, int]]): The starting region of every chain. If None, they are drawn at random from seed.
+            temperatures (Sequence[float]): The temperature of every chain instead of the ladder from whimsy, all above 0.
+            max_steps (int): The most timesteps to search for.
+            swap_every (int): The number of steps between swap moves.
+            seed (int): The seed every chain's own seed is derived from.
+            max_seconds (float): The most seconds to search for, checked every 64 steps. None for no limit.
+            stop_on_treasure (bool): Stop every chain as soon as one of them finds the treasure.
+
+        Returns:
+            List[Tuple[int, int]]: The best path: the shortest one to the treasure, or else the path of a chain up to the most valuable region any chain reached.
+            Dict: The number of chains and steps, the value of the end of the best path and whether it is the treasure,
+                the temperatures of the ladder, and the number of swaps offered and taken.
+        '''
+
+        import numpy as np
+
+        starts = self.starts(chains, starts, seed)
+        if temperatures is None:
+            whimsy = whimsy if whimsy is not None else Whimsy()
+            if hasattr(whimsy, "update"):
+                whimsy.reset()
+            spacing = (max_steps - 1) / max(len(starts) - 1, 1)
+            temperatures = [whimsy(round(k * spacing)) for k in range(len(starts))]
+        if len(temperatures) != len(starts) or any(T <= 0 for T in temperatures):
+            raise ValueError('every chain needs a temperature above 0')
+
+        ladder = np.array(sorted(temperatures, reverse=True), dtype=np.float64)
+        holder = np.arange(len(starts)) # the chain at every rung of the ladder
+        rung = np.arange(len(starts)) # the rung of every chain
+
+        rounds = offered = taken = 0
+        def exchange(t: int, x, y, score, keys, active, lineage: Lineage) -> None:
+            nonlocal rounds, offered, taken
+            if t % swap_every != swap_every - 1:
+                return
+
+            # chains on neighboring rungs, starting from the bottom rung or the next one in turn
+            lower = np.arange(rounds % 2, len(starts) - 1, 2)
+            a, b = holder[lower], holder[lower + 1]
+            pairs = active[a] & active[b]
+            lower, a, b = lower[pairs], a[pairs], b[pairs]
+
+            # take the trade if log(u) < (s_b - s_a) * (1/T_a - 1/T_b)
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                gain = (score[b] - score[a]) * (1 / ladder[lower] - 1 / ladder[lower + 1])
+                swap = np.log(uniforms(keys[a], 2 * t + 1, 0)) < gain
+            holder[lower[swap]], holder[lower[swap] + 1] = b[swap], a[swap]
+            rung[holder] = np.arange(len(starts))
+
+            rounds += 1
+            offered += len(lower)
+            taken += int(swap.sum())
+
+        path, report = self.lockstep_anneal(orders, starts, seed, max_steps, max_seconds, stop_on_treasure,
+                                            temperature=lambda t, walkers: ladder[rung[walkers]], between=exchange)
+        report.update(temperatures=ladder.tolist(), swaps_offered=offered, swaps_taken=taken)
+        return path, report
+
+    def population_annealing_search(self, orders: Orders, whimsy: Optional[Whimsy] = None, walkers: int = 64,
+                                    starts: Optional[Sequence[Tuple[int, int]]] = None, max_steps: int = 1000, resample_every: int = 10,
+                                    seed: int = 0, max_seconds: Optional[float] = None, stop_on_treasure: bool = True) -> Tuple[List[Tuple[int, int]], Dict]:
+        '''
+        Runs a population of simulated annealing walkers that all follow one cooling schedule, stepped in lockstep with NumPy.
+        As the temperature falls from T to T', every walker is weighted by e^((1/T' - 1/T) * s), and every resample_every steps
+        the population is redrawn in proportion to those weights (systematic resampling): walkers on valuable regions are copied,
+        walkers on poor ones are dropped, and the copies go their own ways because every walker slot has its own random numbers.
+        Walkers that found the treasure stay where they are and are left out of resampling.
+
+        Parameters:
+            orders (Orders): A callable object that estimates the value of a region (state).
+            whimsy (Whimsy): The cooling schedule, an exponential Whimsy by default. Its temperatures must stay above 0 for max_steps,
+                and an adaptive schedule is followed without being adjusted.
+            walkers (int): The size of the population, ignored if starts are given.
+            starts (Sequence[Tuple[int, int]]): The starting region of every walker. If None, they are drawn at random from seed.
+            max_steps (int): The most timesteps to search for.
+            resample_every (int): The number of steps between resamplings.
+            seed (int): The seed every walker's own seed is derived from.
+            max_seconds (float): The most seconds to search for, checked every 64 steps. None for no limit.
+            stop_on_treasure (bool): Stop every walker as soon as one of them finds the treasure.
+
+        Returns:
+            List[Tuple[int, int]]: The best path: the shortest one to the treasure, or else the path of a walker up to the most valuable region any walker reached.
+            Dict: The number of walkers and steps, the value of the end of the best path and whether it is the treasure, and the number of resamplings.
+        '''
+
+        import numpy as np
+
+        starts = self.starts(walkers, starts, seed)
+        whimsy = whimsy if whimsy is not None else Whimsy()
+        if hasattr(whimsy, "update"):
+            whimsy.reset()
+        schedule = whimsy.table(max_steps + 1) if hasattr(whimsy, "table") else None
+        schedule = schedule if schedule is not None else [whimsy(t) for t in range(max_steps + 1)]
+        if any(T <= 0 for T in schedule):
+            raise ValueError('population annealing needs temperatures above 0 for every step')
+
+        log_weight = np.zeros(len(starts))
+        resamples = 0
+        def reweight(t: int, x, y, score, keys, active, lineage: Lineage) -> None:
+            nonlocal resamples
+            log_weight[active] += (1 / schedule[t + 1] - 1 / schedule[t]) * score[active]
+            if t % resample_every != resample_every - 1:
+                return
+
+            # systematic resampling of the walkers still going, with one shared random offset
+            alive = np.flatnonzero(active)
+            with np.errstate(invalid='ignore', over='ignore'):
+                weight = np.exp(log_weight[alive] - log_weight[alive].max()) if len(alive) else log_weight[alive]
+            log_weight[:] = 0
+            if not len(alive) or not np.isfinite(weight).all() or weight.sum() <= 0:
+                return
+            positions = (uniforms(keys[:1], 2 * t + 1, 0)[0] + np.arange(len(alive))) / len(alive)
+            cumulative = np.cumsum(weight / weight.sum())
+            parents = alive[np.minimum(np.searchsorted(cumulative, positions, side='right'), len(alive) - 1)]
+
+            x[alive], y[alive], score[alive] = x[parents], y[parents], score[parents]
+            lineage.copy(alive, parents)
+            resamples += 1
+
+        path, report = self.lockstep_anneal(orders, starts, seed, max_steps, max_seconds, stop_on_treasure,
+                                            temperature=lambda t, walkers: schedule[t], between=reweight)
+        report.update(resamples=resamples)
+        return path, report
+
+    def starts(self, walkers: int, starts: Optional[Sequence[Tuple[int, int]]], seed: int) -> List[Tuple[int, int]]:
+        '''
+        Helper function that provides the starting region of every walker, drawn at random from seed unless they are given
+
+        Parameters:
+            self
+            walkers (int): the number of walkers, ignored if starts are given
+            starts (Sequence[Tuple[int, int]]): the starting region of every walker, or None
+            seed (int): the seed the starting regions are drawn from
+
+        Returns:
+            List[Tuple[int, int]]: the starting region of every walker
+        '''
+
+        if starts is None:
+            rows = len(self.island)
+            columns = self.grid.shape[1] if self.grid is not None else len(self.island[0])
+            rng = random.Random(seed)
+            starts = [(rng.randrange(rows), rng.randrange(columns)) for _ in range(walkers)]
+        if not starts:
+            raise ValueError('the search needs at least one walker')
+        return [tuple(start) for start in starts]
+
+    def lockstep_anneal(self, orders: Orders, starts: List[Tuple[int, int]], seed: int, max_steps: int, max_seconds: Optional[float],
+                        stop_on_treasure: bool, temperature: Callable, between: Callable) -> Tuple[List[Tuple[int, int]], Dict]:
+        '''
+        Helper function that steps simulated annealing walkers together, with the same moves as the annealing walkers of lockstep,
+        and keeps track of the best region any of them reached
+
+        Parameters:
+            self
+            orders (Orders): A callable object that estimates the value of a region (state).
+            starts (List[Tuple[int, int]]): the starting region of every walker
+            seed (int): the seed every walker's own seed is derived from
+            max_steps (int): the most timesteps to search for
+            max_seconds (float): the most seconds to search for, or None
+            stop_on_treasure (bool): stop every walker as soon as one of them finds the treasure
+            temperature (Callable): gives the temperature of the walkers still going at a step, called with the step and the walkers
+            between (Callable): called after every step with the step, x, y, score, keys, active and the lineage, which it may change
+
+        Returns:
+            List[Tuple[int, int]]: the shortest path to the treasure, or else the path up to the most valuable region reached
+            Dict: the number of walkers and steps, the value of the end of the path and whether it is the treasure
+        '''
+
+        import numpy as np
+
+        field = self.scores(orders)
+        grid = self.grid
+        rows, columns = grid.shape
+        dx, dy = (np.array(d, dtype=np.int64) for d in zip(*ANNEALING_OFFSETS))
+
+        x = np.array([s[0] for s in starts], dtype=np.int64)
+        y = np.array([s[1] for s in starts], dtype=np.int64)
+        keys = np.array(walker_seeds(seed, len(starts)), dtype=np.uint64)
+        score = field[x, y]
+        found = grid.treasure[x, y]
+        active = ~found # walkers that haven't stopped
+        lineage = Lineage(starts)
+
+        # the most valuable region reached so far, and the node of the path that reached it
+        best_node = int(score.argmax())
+        best_score = score[best_node]
+
+        deadline = time.perf_counter() + max_seconds if max_seconds is not None else None
+
+        # step t draws its moves from uniforms(keys, 2 * t, 0 and 1), leaving 2 * t + 1 to between
+        t = 0
+        while t < max_steps and active.any() and not (stop_on_treasure and found.any()):
+            if deadline is not None and t % 64 == 0 and time.perf_counter() >= deadline:
+                break
+
+            walkers = np.flatnonzero(active)
+            cx, cy = x[walkers], y[walkers]
+            current = score[walkers]
+
+            # a neighbor picked at random, taken if it is better or with probability e^(delta / T)
+            nx, ny = cx[:, None] + dx, cy[:, None] + dy
+            valid = (nx >= 0) & (nx < rows) & (ny >= 0) & (ny < columns)
+            values = np.where(valid, field[np.clip(nx, 0, rows - 1), np.clip(ny, 0, columns - 1)], -np.inf)
+            number = valid.sum(axis=1)
+            pick = np.minimum((uniforms(keys[walkers], 2 * t, 0) * number).astype(np.int64), np.maximum(number - 1, 0))
+            choice = ((np.cumsum(valid, axis=1) - 1 == pick[:, None]) & valid).argmax(axis=1)
+
+            delta = values[np.arange(len(walkers)), choice] - current
+            with np.errstate(over='ignore', invalid='ignore'):
+                chance = np.exp(delta / temperature(t, walkers))
+            move = (number > 0) & ((delta >= 0) | (uniforms(keys[walkers], 2 * t, 1) < chance))
+            active[walkers[number == 0]] = False
+
+            moved = walkers[move]
+            x[moved] = nx[move, choice[move]]
+            y[moved] = ny[move, choice[move]]
+            score[moved] = values[move, choice[move]]
+            lineage.move(moved, x[moved], y[moved])
+
+            if len(moved):
+                leader = int(score[moved].argmax())
+                if score[moved[leader]] > best_score:
+                    best_score, best_node = score[moved[leader]], int(lineage.tip[moved[leader]])
+
+            # a walker that finds the treasure stops there
+            arrived = moved[grid.treasure[x[moved], y[moved]]]
+            found[arrived] = True
+            active[arrived] = False
+
+            between(t, x, y, score, keys, active, lineage)
+            t += 1
+
+        # the shortest path to the treasure wins over the most valuable region
+        if found.any():
+            finders = np.flatnonzero(found)
+            best_node = int(lineage.tip[finders[lineage.moves[finders].argmin()]])
+
+        path = lineage.path(best_node)
+        end = path[-1]
+        return path, {
+            'walkers': len(starts),
+            'steps': t,
+            'score': float(field[end]),
+            'treasure': bool(grid.treasure[end]),
+            'moves': len(path) - 1,
+        }
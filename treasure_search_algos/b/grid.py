@@ -0,0 +1,240 @@
+import json
+import sys
+from typing import List, Optional, Sequence, Tuple
+from orders import scores_grid
+
+MAGIC = b'GRID\x00\x00\x00\x01'
+ALIGNMENT = 8
+
+class Grid:
+    # neighbor offsets, in the same order as Pirate.neighbors lists them
+    OFFSETS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+    def __init__(self, elevation, terrain, treasure, terrains: Sequence[str]) -> None:
+        '''
+        Initialize an island stored as NumPy arrays instead of a list of lists of region dictionaries.
+        The region at [x][y] is row x, column y of every array, so its coordinates are its indices.
+        A 10000 x 10000 island takes a few hundred MB this way, where the dictionaries would take tens of GB.
+
+        Parameters:
+            elevation (numpy.ndarray): the elevation of every region, as a 2D array
+            terrain (numpy.ndarray): the terrain of every region, as a 2D array of indices into terrains
+            treasure (numpy.ndarray): True for the region with the treasure, as a 2D array
+            terrains (Sequence[str]): the name of every terrain code, e.g. ('jungle', 'desert')
+        '''
+
+        import numpy as np
+
+        self.elevation = np.asarray(elevation)
+        self.terrain = np.asarray(terrain, dtype=np.uint8)
+        self.treasure = np.asarray(treasure, dtype=bool)
+        self.terrains = tuple(terrains)
+
+        if not (self.elevation.ndim == 2 and self.elevation.shape == self.terrain.shape == self.treasure.shape):
+            raise ValueError('elevation, terrain and treasure must be 2D arrays of the same shape')
+
+        self.shape: Tuple[int, int] = self.elevation.shape
+        self.path = None # the file the grid was loaded from, if any
+
+    @classmethod
+    def from_regions(cls, island: List[List[dict]]) -> 'Grid':
+        '''
+        Builds a grid from an island given as a list of lists of region dictionaries, like island.json
+
+        Parameters:
+            island (List[List[dict]]): A list of lists, where the elements of the nested lists are dictionaries that correspond to regions of an island.
+
+        Returns:
+            Grid: the same island, stored as arrays
+        '''
+
+        import numpy as np
+
+        if len({len(row) for row in island}) > 1:
+            raise ValueError('every row of the island must have the same number of regions')
+
+        terrains = {}
+        terrain = [[terrains.setdefault(region.get('terrain', 'desert'), len(terrains)) for region in row] for row in island]
+        if len(terrains) > 256:
+            raise ValueError('an island can have at most 256 kinds of terrain')
+
+        for x, row in enumerate(island):
+            for y, region in enumerate(row):
+                if region.get('x_coordinate', x) != x or region.get('y_coordinate', y) != y:
+                    raise ValueError(f'the region at [{x}][{y}] has the coordinates of another region')
+
+        elevation = np.array([[region.get('elevation', 0) for region in row] for row in island]).reshape(len(island), -1)
+
+        # keep integer elevations in the smallest integer type that holds them
+        if elevation.dtype.kind == 'i' and elevation.size:
+            elevation = elevation.astype(np.promote_types(np.min_scalar_type(int(elevation.min())), np.min_scalar_type(int(elevation.max()))))
+
+        treasure = [[bool(region.get('treasure', False)) for region in row] for row in island]
+        return cls(elevation, np.array(terrain, dtype=np.uint8).reshape(elevation.shape),
+                   np.array(treasure, dtype=bool).reshape(elevation.shape), terrains)
+
+    def save(self, path: str) -> None:
+        '''
+        Writes the grid to a binary file that Grid.load can map into memory without parsing it.
+        The file is MAGIC, the length of a JSON header as 8 bytes, the header (shape, terrain names, and the offset and dtype of every array),
+        and then the elevation, terrain and treasure arrays in row-major order, each starting on a multiple of 8 bytes.
+
+        Parameters:
+            self
+            path (str): where to write the grid
+        '''
+
+        import numpy as np
+
+        arrays = {'elevation': self.elevation, 'terrain': self.terrain, 'treasure': self.treasure}
+
+        # the header's own length moves the arrays, so lay them out until the header stops growing
+        header, length = b'', -1
+        while len(header) != length:
+            length = len(header)
+            position, table = len(MAGIC) + 8 + length, {}
+            for name, array in arrays.items():
+                position += -position % ALIGNMENT
+                table[name] = [position, array.dtype.str]
+                position += array.nbytes
+            header = json.dumps({'shape': list(self.shape), 'terrains': list(self.terrains), 'arrays': table}).encode('utf-8')
+
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for name, (offset, _) in table.items():
+                f.write(b'\x00' * (offset - f.tell()))
+                f.write(np.ascontiguousarray(arrays[name]).tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Grid':
+        '''
+        Opens a grid written by save. The arrays are read-only views of the file mapped into memory, so loading takes
+        milliseconds whatever the size of the island, and every process that loads the same file shares one copy of it.
+        A loaded grid is sent to worker processes as the name of its file.
+
+        Parameters:
+            path (str): the grid file
+
+        Returns:
+            Grid: the island, as arrays backed by the file
+        '''
+
+        import numpy as np
+
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a grid file')
+            header = json.loads(f.read(int.from_bytes(f.read(8), 'little')))
+
+        shape = tuple(header['shape'])
+        file = np.memmap(path, dtype=np.uint8, mode='r')
+        arrays = {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=file, offset=offset) for name, (offset, dtype) in header['arrays'].items()}
+
+        grid = cls(arrays['elevation'], arrays['terrain'], arrays['treasure'], header['terrains'])
+        grid.path = path
+        return grid
+
+    def __reduce_ex__(self, protocol: int):
+        # other processes load the same file instead of being sent a copy of it
+        if self.path is not None:
+            return Grid.load, (self.path,)
+        return super().__reduce_ex__(protocol)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.elevation.nbytes + self.terrain.nbytes + self.treasure.nbytes
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        '''
+        Check if the given coordinates are within the island
+
+        Parameters:
+            self
+            x (int): the x-coordinate of a certain location
+            y (int): the y-coordinate of a certain location
+
+        Returns:
+            bool: True if the coordinates are within the island
+        '''
+
+        return 0 <= x < self.shape[0] and 0 <= y < self.shape[1]
+
+    def neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
+        '''
+        Provides all the valid neighbors of a certain coordinate point, in the same order as Pirate.neighbors
+
+        Parameters:
+            self
+            x (int): the x-coordinate of a certain location
+            y (int): the y-coordinate of a certain location
+
+        Returns:
+            List[Tuple[int, int]]: all the coordinates that are considered neighbors to the given coordinate point
+        '''
+
+        rows, columns = self.shape
+        return [(x + dx, y + dy) for dx, dy in self.OFFSETS if 0 <= x + dx < rows and 0 <= y + dy < columns]
+
+    def is_treasure(self, x: int, y: int) -> bool:
+        return self.treasure.item(x, y)
+
+    def scores(self, orders):
+        '''
+        Scores every region of the grid: with the orders' score_grid if it matches how they score a region, otherwise by calling them on every region
+
+        Parameters:
+            self
+            orders (Orders): A callable object that estimates the value of a region (state).
+
+        Returns:
+            numpy.ndarray: the value of the region at [x, y], as float64
+        '''
+
+        import numpy as np
+
+        if scores_grid(orders):
+            return orders.score_grid(self)
+
+        rows, columns = self.shape
+        return np.array([[orders(self.region(x, y)) for y in range(columns)] for x in range(rows)], dtype=np.float64).reshape(self.shape)
+
+    def region(self, x: int, y: int) -> dict:
+        '''
+        Builds the region dictionary at a given coordinate, with the same keys as in island.json
+
+        Parameters:
+            self
+            x (int): the x-coordinate of the region
+            y (int): the y-coordinate of the region
+
+        Returns:
+            dict: the region dictionary, holding plain Python values
+        '''
+
+        return {
+            'x_coordinate': x,
+            'y_coordinate': y,
+            'elevation': self.elevation.item(x, y),
+            'terrain': self.terrains[self.terrain.item(x, y)],
+            'treasure': self.treasure.item(x, y),
+        }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert a JSON island like island.json into a binary grid file.')
+    parser.add_argument('source', help='the JSON island')
+    parser.add_argument('destination', help='where to write the grid')
+    args = parser.parse_args(argv)
+
+    with open(args.source, 'r') as f:
+        Grid.from_regions(json.load(f)).save(args.destination)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import math
+from typing import Optional
 
 class Orders:
     def __call__(self, region: dict) -> float:
@@ -33,4 +34,72 @@ class Orders:
             score -= 1000
         
         score -= 10 * x
-        return score
\ No newline at end of file
+        return score
+
+    def __eq__(self, other: object) -> bool:
+        # orders that name what their scores depend on compare by it, any other orders only equal themselves
+        settings = self.settings()
+        if settings is None:
+            return other is self
+        return type(other) is type(self) and settings == other.settings()
+
+    def __hash__(self) -> int:
+        settings = self.settings()
+        return object.__hash__(self) if settings is None else hash((type(self), settings))
+
+    def settings(self) -> Optional[tuple]:
+        '''
+        Return everything the scores of the orders depend on, so that equal orders can share scores that were already computed.
+        These orders depend on nothing. A subclass opts in by overriding this too, otherwise its orders only equal themselves.
+
+        Returns:
+            tuple: the settings of the orders, or None if they aren't known
+        '''
+
+        return () if type(self) is Orders else None
+
+    def score_grid(self, grid):
+        '''
+        Return the value of every region of an island at once, in one vectorized pass.
+        Each value is exactly what calling the orders on that region returns.
+        A subclass that changes __call__ without changing this too is called on every region instead.
+
+        Parameters:
+            grid (Grid): the island, stored as arrays
+
+        Returns:
+            numpy.ndarray: the value of the region at [x, y], as float64
+        '''
+
+        import numpy as np
+
+        rows, columns = grid.shape
+        jungle = grid.terrains.index("jungle") if "jungle" in grid.terrains else -1
+
+        # the same steps in the same order as __call__, so that every value matches it exactly
+        score = grid.elevation.astype(np.float64)
+        score += np.where(grid.terrain == jungle, 1000.0, -1000.0)
+        score -= (10 * np.arange(rows, dtype=np.float64))[:, None]
+
+        score[grid.treasure] = float("inf")
+        return score
+
+
+def scores_grid(orders) -> bool:
+    '''
+    Tells whether the orders' score_grid gives what calling them gives. That is only known when score_grid comes from
+    the same class as __call__, or from a subclass of it; a subclass that only changes __call__ inherits a score_grid that doesn't match.
+
+    Parameters:
+        orders (Orders): A callable object that estimates the value of a region (state).
+
+    Returns:
+        bool: True if score_grid can be used in place of calling the orders on every region
+    '''
+
+    for cls in type(orders).__mro__:
+        if 'score_grid' in vars(cls):
+            return True
+        if '__call__' in vars(cls):
+            return False
+    return False
@@ -1,19 +1,32 @@
 import math
 import random
-from typing import List, Tuple
-from orders import Orders
+import time
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+from orders import Orders, scores_grid
 from whimsy import Whimsy
+from probe import Probe
+from grid import Grid
+from basins import Basins
+
+# the number of random numbers drawn at a time from a NumPy Generator
+BLOCK = 1024
 
 class Pirate:
-    def __init__(self, island: List[List[dict]]) -> None:
+    def __init__(self, island: Union[List[List[dict]], Grid], probe: Optional[Probe] = None) -> None:
         '''
         Initialize the pirate (agent). Store the island here, even though the search algorithms you impliment won't know about the whole island.
 
         Parameters:
             island (List[List[dict]]): A list of lists, where the elements of the nested lists are dictionaries that correspond to regions of an island.
+                Or a Grid holding the same island as arrays, e.g. Grid.from_regions(island), which every search runs against just the same.
+            probe (Probe): Instrumentation to record searches with, e.g. a Recorder. None turns instrumentation off.
         '''
         self.island = island
         self.longitude = len(island) # number of columns in island
+        self.grid = island if isinstance(island, Grid) else None
+        self.field = None # (orders, the value of every region of the grid) for the orders used last
+        self.basins = None # where hill climbing goes from every region, built by index_basins
+        self.probe = probe
 
     def in_bounds(self, x: int, y: int) -> bool:
         '''
@@ -29,6 +42,10 @@ class Pirate:
                 False indicated that the coordinates are outside the bounds of the island
         '''
         
+        if self.grid is not None:
+            rows, columns = self.grid.shape
+            return (0 <= x < rows) and (0 <= y < columns)
+
         # checks if coordinate is within island
         return (0 <= x < len(self.island)) and (0 <= y < len(self.island[x]))
     
@@ -45,9 +62,14 @@ class Pirate:
             List[Tuple[int, int]]: all the coordinates that are considered neighbors to the given coordinate point
         '''
         
-        # all valid neighbors of node (x,y)
+        if self.grid is not None:
+            return self.grid.neighbors(x, y)
+
+        # all valid neighbors of node (x,y), with the bounds checked inline rather than through in_bounds
+        island = self.island
+        rows = len(island)
         candidates = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
-        return [(nx, ny) for nx, ny in candidates if self.in_bounds(nx, ny)]
+        return [(nx, ny) for nx, ny in candidates if 0 <= nx < rows and 0 <= ny < len(island[nx])]
     
     def cell(self, coord: Tuple[int, int]) -> dict:
         '''
@@ -62,8 +84,88 @@ class Pirate:
         '''
 
         x, y = coord
+        if self.grid is not None:
+            return self.grid.region(x, y)
         return self.island[x][y]
 
+    def is_treasure(self, coord: Tuple[int, int]) -> bool:
+        '''
+        Checks if the treasure is in the region at a given coordinate
+
+        Parameters:
+            self
+            coord (Tuple[int, int]): a coordinate point
+
+        Returns:
+            bool: True if the region has the treasure
+        '''
+
+        if self.grid is not None:
+            return self.grid.is_treasure(*coord)
+        return self.cell(coord).get("treasure", False)
+
+    def scorer(self, orders: Orders) -> Callable[[Tuple[int, int]], float]:
+        '''
+        Helper function that provides the value of the region at a coordinate, for the duration of one search.
+        On a Grid, orders whose score_grid matches their __call__ score the whole island in one vectorized pass, which is kept for
+        as long as the same orders are used. Any other orders are called at most once per region during the search.
+
+        Parameters:
+            self
+            orders (Orders): A callable object that estimates the value of a region (state).
+
+        Returns:
+            Callable[[Tuple[int, int]], float]: the value of the region at a coordinate
+        '''
+
+        if self.grid is not None and scores_grid(orders):
+            if self.field is None or self.field[0] != orders:
+                self.field = (orders, orders.score_grid(self.grid))
+            return self.field[1].item
+
+        # score regions as they are first looked at
+        memo = {}
+        def score(coord: Tuple[int, int]) -> float:
+            if coord not in memo:
+                memo[coord] = orders(self.cell(coord))
+            return memo[coord]
+
+        return score
+
+    def index_basins(self, orders: Orders) -> Basins:
+        '''
+        Builds the index of where hill climbing goes from every region with the given orders.
+        From then on, hill_climbing_search with the same orders follows the index instead of scoring neighbors.
+        The island must not change while the index is in use.
+
+        Parameters:
+            self
+            orders (Orders): A callable object that estimates the value of a region (state).
+
+        Returns:
+            Basins: the index, which also tells which peak any region climbs to
+        '''
+
+        self.basins = Basins(self.grid if self.grid is not None else self.island, orders)
+        return self.basins
+
+    def finish(self, path: List[Tuple[int, int]], steps: int) -> List[Tuple[int, int]]:
+        '''
+        Helper function that ends a search, reporting it to the probe if there is one
+
+        Parameters:
+            self
+            path (List[Tuple[int, int]]): the path the search found
+            steps (int): the number of moves the search considered
+
+        Returns:
+            List[Tuple[int, int]]: the path
+        '''
+
+        if self.probe is not None:
+            self.probe.end(path, steps)
+        return path
+
     def hill_climbing_search(self, orders: Orders, start: Tuple[int, int]) -> List[Tuple[int, int]]:
         '''
         This method should implement the hill climbing search algorithm.
@@ -75,22 +177,36 @@ class Pirate:
             List[Tuple[int, int]]: A list of coordinates representing the path taken from the starting region to the final region.
         '''
 
+        # the same path, read from the index instead of climbing
+        if self.basins is not None and self.basins.orders == orders:
+            path = self.basins.path(start)
+            if self.probe is not None:
+                self.probe.begin('hill_climbing_search', start, orders)
+            # every step moves, except the last one that finds no better neighbor (none is taken on the treasure)
+            return self.finish(path, len(path) - (1 if self.is_treasure(path[-1]) else 0))
+
+        if self.probe is not None:
+            orders, _ = self.probe.begin('hill_climbing_search', start, orders)
+        score = self.scorer(orders)
+
         path = [start]
         current = start
-        curr_score = orders(self.cell(current))
+        curr_score = score(current)
+        steps = 0
 
         # if the current cell is the one with the treasure, return path
-        if (self.cell(current).get("treasure", False)):
-            return path
+        if (self.is_treasure(current)):
+            return self.finish(path, steps)
         
         while True:
+            steps += 1
             neighbors = self.neighbors(*current)
             best_neighbor = current
             best_score = curr_score
 
             # picking the neighbor with the best score
             for n in neighbors:
-                s = orders(self.cell(n))
+                s = score(n)
                 if (s > best_score):
                     best_score = s
                     best_neighbor = n
@@ -106,10 +222,10 @@ class Pirate:
             curr_score = best_score
 
             # stops the loop if we find the treasure
-            if (self.cell(current).get("treasure", False)):
+            if (self.is_treasure(current)):
                 break
             
-        return path
+        return self.finish(path, steps)
 
     def stochastic_hill_climbing_search(self, orders: Orders, start: Tuple[int, int]) -> List[Tuple[int, int]]:
         '''
@@ -122,18 +238,24 @@ class Pirate:
             List[Tuple[int, int]]: A list of coordinates representing the path taken from the starting region to the final region.
         '''
 
+        if self.probe is not None:
+            orders, _ = self.probe.begin('stochastic_hill_climbing_search', start, orders)
+        score = self.scorer(orders)
+
         path = [start]
         current = start
-        curr_score = orders(self.cell(current))
+        curr_score = score(current)
+        steps = 0
 
         # immediately return if we start on the treasure
-        if (self.cell(current).get("treasure", False)):
-            return path
+        if (self.is_treasure(current)):
+            return self.finish(path, steps)
         
         while True:
+            steps += 1
 
             neighbors = self.neighbors(*current)
-            better = [n for n in neighbors if orders(self.cell(n)) > curr_score] # only takes in list of all the neighbors that have a better score than the current node
+            better = [n for n in neighbors if score(n) > curr_score] # only takes in list of all the neighbors that have a better score than the current node
 
             # break when we reach local max
             if not better:
@@ -142,48 +264,102 @@ class Pirate:
             # randomly choose from the better neighbors
             current = random.choice(better)
             path.append(current)
-            curr_score = orders(self.cell(current)) # update score
+            curr_score = score(current) # update score
             
             # break if we find the score
-            if (self.cell(current).get("treasure", False)):
+            if (self.is_treasure(current)):
                 break
 
-        return path
+        return self.finish(path, steps)
 
-    def boltzmann_simulated_annealing_search(self, orders: Orders, whimsy: Whimsy, start: Tuple[int, int]) -> List[Tuple[int, int]]:
+    def boltzmann_simulated_annealing_search(self, orders: Orders, whimsy: Whimsy, start: Tuple[int, int], max_steps: int = 1000,
+                                             max_seconds: Optional[float] = None, patience: Optional[int] = None, rng=None) -> List[Tuple[int, int]]:
         '''
         This method should implement the simulated annealing search algorithm using the boltzmann equation to determine the annealing rate.
+        With the default settings, the search draws from the random module exactly as it always has, so the same seed gives the same path.
 
         Parameters:
             orders (Orders): A callable object that estimates the value of a region (state).
             whimsy (Whimsy): A callable object that returns the pirates willingess to go off on a whim as a function of how long they've been exploring (the tempurature as a function of t)
+                Any schedule from whimsy.py works; their temperatures are computed once and kept, and adaptive ones are told about every move.
+            max_steps (int): The most timesteps to search for.
+            max_seconds (float): Stop after this many seconds. If None, there is no time limit.
+            patience (int): Stop once this many timesteps pass without finding a better region than the best one so far. If None, never stop early.
+            rng (random.Random or numpy.random.Generator): Where to draw random numbers from instead of the random module.
+                A random.Random is used exactly like the random module. A NumPy Generator is drawn from in blocks,
+                which is faster but gives different paths than the random module for the same seed.
 
         Returns:
             List[Tuple[int, int]]: A list of coordinates representing the path taken from the starting region to the final region.
         '''
 
+        # adaptive schedules start over and hear about every move, even when a probe wraps the whimsy
+        schedule = whimsy
+        adaptive = hasattr(schedule, "update")
+        if adaptive:
+            schedule.reset()
+
+        if self.probe is not None:
+            orders, whimsy = self.probe.begin('boltzmann_simulated_annealing_search', start, orders, whimsy)
+        score = self.scorer(orders)
+
+        # temperatures computed once and kept by the schedule, if it allows it
+        temperatures = whimsy.table(max_steps) if hasattr(whimsy, "table") else None
+
+        # random numbers: the random module by default, or drawn a block at a time from a NumPy Generator
+        rng = random if rng is None else rng
+        batched = hasattr(rng, "bit_generator")
+        if batched:
+            import numpy as np
+            draws, logs, i = None, None, BLOCK
+
+        deadline = time.perf_counter() + max_seconds if max_seconds is not None else None
+
         path = [start]
         current = start
-        curr_score = orders(self.cell(current))
+        curr_score = score(current)
+        best_score, waited = curr_score, 0
 
         # immediately return if we start on the treasure
-        if (self.cell(current).get("treasure", False)):
-            return path
+        if (self.is_treasure(current)):
+            return self.finish(path, 0)
         
+        # the island's extent, to check neighbors against without a call per neighbor
+        island = self.island
+        rows, columns = self.grid.shape if self.grid is not None else (len(island), None)
+
         t = 0
-        while t < 1000:            
+        steps = 0
+        while t < max_steps:            
+
+            # check the clock every so often, not every step
+            if deadline is not None and t % 64 == 0 and time.perf_counter() >= deadline:
+                break
 
             # picking random neighbor
             x, y = current
             neighbors = [(x-1, y), (x+1, y), (x, y+1), (x, y-1)]
-            neighbors = [(nx, ny) for nx, ny in neighbors if self.in_bounds(nx, ny)]
+            if columns is not None:
+                neighbors = [(nx, ny) for nx, ny in neighbors if 0 <= nx < rows and 0 <= ny < columns]
+            else:
+                neighbors = [(nx, ny) for nx, ny in neighbors if 0 <= nx < rows and 0 <= ny < len(island[nx])]
 
             # break if we can't move anywhere
             if not neighbors:
                 break
 
-            candidate = random.choice(neighbors)
-            candidate_score = orders(self.cell(candidate))
+            steps += 1
+            if batched:
+                # one number picks the neighbor, the log of the other is the acceptance threshold
+                if i == BLOCK:
+                    draws = rng.random((BLOCK, 2))
+                    with np.errstate(divide="ignore"):
+                        logs = np.log(draws[:, 1]).tolist()
+                    draws, i = draws[:, 0].tolist(), 0
+                candidate = neighbors[int(draws[i] * len(neighbors))]
+            else:
+                candidate = rng.choice(neighbors)
+            candidate_score = score(candidate)
             
             # find if the candidate score if better than current score
             delta = candidate_score - curr_score
@@ -193,8 +369,17 @@ class Pirate:
                 accept = True
             else:
                 # moving to next choice with probability e^(diff in scores / temperature)
-                T = whimsy(t)
-                accept = (T > 0) and (random.random() < math.exp(delta / T))
+                T = temperatures[t] if temperatures is not None else whimsy(t)
+                if batched:
+                    # u < e^(delta / T) is the same as T * log(u) < delta
+                    accept = (T > 0) and (T * logs[i] < delta)
+                else:
+                    accept = (T > 0) and (rng.random() < math.exp(delta / T))
+
+            if batched:
+                i += 1
+            if adaptive:
+                schedule.update(accept)
 
             if accept:
                 # update the current candidate if we accepted it
@@ -202,10 +387,189 @@ class Pirate:
                 curr_score = candidate_score
 
                 path.append(current)
-                if self.cell(current).get("treasure", False):
+                if self.is_treasure(current):
                     break
+
+            # stop once the search has gone long enough without beating its best region
+            if patience is not None:
+                if curr_score > best_score:
+                    best_score, waited = curr_score, 0
+                else:
+                    waited += 1
+                    if waited >= patience:
+                        break
             
             # add 1 to the timestep
             t += 1
 
-        return path
+        return self.finish(path, steps)
+
+    def stream(self, algorithm: str, orders: Orders, start: Tuple[int, int], whimsy: Optional[Whimsy] = None, **options) -> Iterator[dict]:
+        '''
+        Runs one of the searches step by step, as a generator that reports every move it considers.
+        Nothing runs between steps, so the caller can pause by not asking for the next one, stop with close() or break,
+        and put a limit on the number of steps or the time spent. Streamed searches skip the basin index and the probe,
+        but draw random numbers in the same order, so the moves taken make up the same path as the search itself.
+
+        Parameters:
+            algorithm (str): 'hill_climbing_search', 'stochastic_hill_climbing_search' or 'boltzmann_simulated_annealing_search'
+            orders (Orders): A callable object that estimates the value of a region (state).
+            start (Tuple[int, int]): the starting region
+            whimsy (Whimsy): the cooling schedule, only for simulated annealing
+            options: max_steps and rng, only for simulated annealing
+
+        Returns:
+            Iterator[dict]: one event per step, with
+                'step': the number of the step, 'cell': the region the pirate is on after it, 'score': the value of that region,
+                'temperature': the temperature of the step (None for hill climbing, or when no worse move was considered),
+                'moved': True if the pirate moved to 'cell' in this step, 'done': True on the last event
+        '''
+
+        if algorithm == 'hill_climbing_search':
+            return self.hill_climbing_steps(orders, start)
+        if algorithm == 'stochastic_hill_climbing_search':
+            return self.stochastic_hill_climbing_steps(orders, start)
+        if algorithm == 'boltzmann_simulated_annealing_search':
+            return self.boltzmann_simulated_annealing_steps(orders, whimsy, start, **options)
+        raise ValueError(f'{algorithm} cannot be streamed')
+
+    def hill_climbing_steps(self, orders: Orders, start: Tuple[int, int]) -> Iterator[dict]:
+        '''
+        hill_climbing_search as a generator, see stream for the events
+
+        Parameters:
+            orders (Orders): A callable object that estimates the value of a region (state).
+            start (Tuple[int, int]): the starting region
+
+        Returns:
+            Iterator[dict]: one event per step
+        '''
+
+        score = self.scorer(orders)
+        current = start
+        curr_score = score(current)
+
+        if self.is_treasure(current):
+            yield {'step': 0, 'cell': current, 'score': curr_score, 'temperature': None, 'moved': False, 'done': True}
+            return
+
+        step = 0
+        while True:
+            step += 1
+            best_neighbor = current
+            best_score = curr_score
+
+            for n in self.neighbors(*current):
+                s = score(n)
+                if s > best_score:
+                    best_score = s
+                    best_neighbor = n
+
+            # a local max, nowhere better to go
+            if best_neighbor == current:
+                yield {'step': step, 'cell': current, 'score': curr_score, 'temperature': None, 'moved': False, 'done': True}
+                return
+
+            current, curr_score = best_neighbor, best_score
+            done = self.is_treasure(current)
+            yield {'step': step, 'cell': current, 'score': curr_score, 'temperature': None, 'moved': True, 'done': done}
+            if done:
+                return
+
+    def stochastic_hill_climbing_steps(self, orders: Orders, start: Tuple[int, int]) -> Iterator[dict]:
+        '''
+        stochastic_hill_climbing_search as a generator, see stream for the events
+
+        Parameters:
+            orders (Orders): A callable object that estimates the value of a region (state).
+            start (Tuple[int, int]): the starting region
+
+        Returns:
+            Iterator[dict]: one event per step
+        '''
+
+        score = self.scorer(orders)
+        current = start
+        curr_score = score(current)
+
+        if self.is_treasure(current):
+            yield {'step': 0, 'cell': current, 'score': curr_score, 'temperature': None, 'moved': False, 'done': True}
+            return
+
+        step = 0
+        while True:
+            step += 1
+            better = [n for n in self.neighbors(*current) if score(n) > curr_score]
+
+            # a local max, nowhere better to go
+            if not better:
+                yield {'step': step, 'cell': current, 'score': curr_score, 'temperature': None, 'moved': False, 'done': True}
+                return
+
+            current = random.choice(better)
+            curr_score = score(current)
+            done = self.is_treasure(current)
+            yield {'step': step, 'cell': current, 'score': curr_score, 'temperature': None, 'moved': True, 'done': done}
+            if done:
+                return
+
+    def boltzmann_simulated_annealing_steps(self, orders: Orders, whimsy: Whimsy, start: Tuple[int, int], max_steps: int = 1000, rng=None) -> Iterator[dict]:
+        '''
+        boltzmann_simulated_annealing_search as a generator, see stream for the events.
+        The time budget and patience of the search are left to the caller, who sees every step.
+
+        Parameters:
+            orders (Orders): A callable object that estimates the value of a region (state).
+            whimsy (Whimsy): the cooling schedule
+            start (Tuple[int, int]): the starting region
+            max_steps (int): The most timesteps to search for.
+            rng (random.Random): Where to draw random numbers from instead of the random module.
+
+        Returns:
+            Iterator[dict]: one event per step
+        '''
+
+        score = self.scorer(orders)
+        rng = random if rng is None else rng
+        if hasattr(whimsy, "update"):
+            whimsy.reset()
+
+        current = start
+        curr_score = score(current)
+
+        if self.is_treasure(current):
+            yield {'step': 0, 'cell': current, 'score': curr_score, 'temperature': None, 'moved': False, 'done': True}
+            return
+
+        for t in range(max_steps):
+            x, y = current
+            neighbors = [(nx, ny) for nx, ny in ((x-1, y), (x+1, y), (x, y+1), (x, y-1)) if self.in_bounds(nx, ny)]
+            if not neighbors:
+                break
+
+            candidate = rng.choice(neighbors)
+            candidate_score = score(candidate)
+            delta = candidate_score - curr_score
+
+            T = None
+            if delta >= 0:
+                accept = True
+            else:
+                T = whimsy(t)
+                accept = (T > 0) and (rng.random() < math.exp(delta / T))
+
+            if hasattr(whimsy, "update"):
+                whimsy.update(accept)
+
+            done = False
+            if accept:
+                current, curr_score = candidate, candidate_score
+                done = self.is_treasure(current)
+
+            done = done or t == max_steps - 1
+            yield {'step': t + 1, 'cell': current, 'score': curr_score, 'temperature': T, 'moved': accept, 'done': done}
+            if done:
+                return
+
+        # nowhere to move
+        yield {'step': 0, 'cell': current, 'score': curr_score, 'temperature': None, 'moved': False, 'done': True}
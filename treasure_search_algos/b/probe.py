@@ -0,0 +1,159 @@
+import json
+import marshal
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+class Probe:
+    '''
+    The instrumentation interface of Pirate. A pirate built without a probe never calls any of these,
+    so searches pay nothing for instrumentation unless a probe is given. This base class records nothing;
+    subclass it and override the methods you need.
+    '''
+
+    def begin(self, algorithm: str, start: Tuple[int, int], orders: Any, whimsy: Any = None) -> Tuple[Any, Any]:
+        '''
+        Called when a search starts, with the orders (and whimsy) it is about to use
+
+        Parameters:
+            self
+            algorithm (str): the name of the search method
+            start (Tuple[int, int]): the starting region
+            orders (Orders): the orders of the search
+            whimsy (Whimsy): the whimsy of the search, None for hill climbing
+
+        Returns:
+            Tuple[Orders, Whimsy]: the orders and whimsy the search should use instead
+        '''
+
+        return orders, whimsy
+
+    def end(self, path: List[Tuple[int, int]], steps: int) -> None:
+        '''
+        Called when a search finishes
+
+        Parameters:
+            self
+            path (List[Tuple[int, int]]): the path the search returns
+            steps (int): the number of moves the search considered
+        '''
+
+class Recorder(Probe):
+    def __init__(self) -> None:
+        '''
+        Initialize a probe that keeps a record of every search a pirate runs.
+        '''
+
+        self.records: List[Dict] = []
+        self.current: Optional[Dict] = None # the record of the search that is running
+
+    def begin(self, algorithm: str, start: Tuple[int, int], orders: Any, whimsy: Any = None) -> Tuple[Any, Any]:
+        '''
+        Starts a record, and wraps the orders and whimsy so that every evaluation and temperature is recorded
+
+        Parameters:
+            self
+            algorithm (str): the name of the search method
+            start (Tuple[int, int]): the starting region
+            orders (Orders): the orders of the search
+            whimsy (Whimsy): the whimsy of the search, None for hill climbing
+
+        Returns:
+            Tuple[Orders, Whimsy]: the orders and whimsy the search should use instead
+        '''
+
+        record = {
+            'search': algorithm,
+            'start': list(start),
+            'evaluations': 0, # calls to the orders
+            'evaluation_time': 0.0,
+            'temperature': [], # [step, temperature] every time the whimsy was asked
+        }
+        self.current = record
+        clock = time.perf_counter
+
+        def counted_orders(region: dict) -> float:
+            started = clock()
+            value = orders(region)
+            record['evaluation_time'] += clock() - started
+            record['evaluations'] += 1
+            return value
+
+        def traced_whimsy(step: int) -> float:
+            temperature = whimsy(step)
+            record['temperature'].append([step, temperature])
+            return temperature
+
+        record['started'] = clock()
+        return counted_orders, (traced_whimsy if whimsy is not None else None)
+
+    def end(self, path: List[Tuple[int, int]], steps: int) -> None:
+        '''
+        Finishes the record of the current search
+
+        Parameters:
+            self
+            path (List[Tuple[int, int]]): the path the search returns
+            steps (int): the number of moves the search considered
+        '''
+
+        record, self.current = self.current, None
+        record['time'] = time.perf_counter() - record.pop('started')
+        record['steps'] = steps
+        record['moves'] = len(path) - 1 # the moves that were accepted
+        record['acceptance_rate'] = record['moves'] / steps if steps else 0.0
+        record['end'] = list(path[-1])
+        self.records.append(record)
+
+    def dump_jsonl(self, path: str) -> None:
+        '''
+        Append every record to a JSON lines file, one search per line
+
+        Parameters:
+            self
+            path (str): the file to append to
+        '''
+
+        with open(path, 'a') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + '\n')
+
+    def stats(self) -> Dict[tuple, tuple]:
+        '''
+        Summarizes the records the way cProfile does: one entry per search algorithm, and one for the orders
+        reported as called by the search algorithm it ran in.
+
+        Parameters:
+            self
+
+        Returns:
+            dict: {(file, line, function): (primitive calls, calls, own time, cumulative time, callers)}
+        '''
+
+        stats = {}
+
+        def add(function: tuple, calls: int, own: float, cumulative: float, caller: Optional[tuple]) -> None:
+            cc, nc, tt, ct, callers = stats.get(function, (0, 0, 0.0, 0.0, {}))
+            if caller is not None:
+                c = callers.get(caller, (0, 0, 0.0, 0.0))
+                callers[caller] = (c[0] + calls, c[1] + calls, c[2] + own, c[3] + cumulative)
+            stats[function] = (cc + calls, nc + calls, tt + own, ct + cumulative, callers)
+
+        for record in self.records:
+            search = ('pirate.py', 0, record['search'])
+            add(search, 1, max(record['time'] - record['evaluation_time'], 0.0), record['time'], None)
+            if record['evaluations']:
+                add(('orders.py', 0, '__call__'), record['evaluations'], record['evaluation_time'], record['evaluation_time'], search)
+
+        return stats
+
+    def dump_stats(self, path: str) -> None:
+        '''
+        Write the summary from stats in the format of cProfile's dump_stats, which pstats, snakeviz and similar tools read
+
+        Parameters:
+            self
+            path (str): the file to write
+        '''
+
+        with open(path, 'wb') as f:
+            marshal.dump(self.stats(), f)
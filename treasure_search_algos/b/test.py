@@ -1,8 +1,15 @@
 import json
+import os
 import random
+import tempfile
+import numpy as np
 from orders import Orders
-from whimsy import Whimsy
+from whimsy import CHUNK, Whimsy, LinearWhimsy, ReheatingWhimsy
 from pirate import Pirate
+from probe import Recorder
+from grid import Grid
+from crew import Crew, board, walk
+from course import Course
 
 class TestOrders:
     def __call__(self, region: dict) -> float:
@@ -38,6 +45,135 @@ results.append(
     pirate.boltzmann_simulated_annealing_search(orders, whimsy, (14, 0)) == [(14, 0), (13, 0), (12, 0), (12, 1), (12, 2), (12, 1)]
 )
 
+# Instrumented Simulated Annealing Search
+recorder = Recorder()
+random.seed(5678)
+recorded = Pirate(island, probe=recorder).boltzmann_simulated_annealing_search(orders, whimsy, (14, 0))
+results.append(
+    recorded == [(14, 0), (13, 0), (12, 0), (12, 1), (12, 2), (12, 1)] and recorder.records[0]['moves'] == 5
+)
+
+# Searches on the island stored as arrays
+grid_pirate = Pirate(Grid.from_regions(island))
+random.seed(1234)
+stochastic = grid_pirate.stochastic_hill_climbing_search(orders, (14, 0))
+random.seed(5678)
+annealing = grid_pirate.boltzmann_simulated_annealing_search(orders, whimsy, (14, 0))
+results.append(
+    grid_pirate.hill_climbing_search(orders, (14, 0)) == [(14, 0), (13, 0), (12, 0), (12, 1)]
+    and stochastic == [(14, 0), (14, 1), (13, 1), (12, 1)]
+    and annealing == [(14, 0), (13, 0), (12, 0), (12, 1), (12, 2), (12, 1)]
+)
+
+# Orders that only change how a region is scored are called on every region, and differently set orders don't share scores
+class LowlandOrders(Orders):
+    def __init__(self, weight: float) -> None:
+        self.weight = weight
+
+    def __call__(self, region: dict) -> float:
+        return -self.weight * region['elevation']
+
+lowland = [grid_pirate.hill_climbing_search(LowlandOrders(weight), (14, 14)) for weight in (1, -1)]
+results.append(
+    lowland == [pirate.hill_climbing_search(LowlandOrders(weight), (14, 14)) for weight in (1, -1)] and lowland[0] != lowland[1]
+    and Orders() == Orders() and LowlandOrders(1) != LowlandOrders(1)
+)
+
+# Searches on the island loaded from a binary grid file
+with tempfile.TemporaryDirectory() as directory:
+    Grid.from_regions(island).save(os.path.join(directory, 'island.grid'))
+    loaded = Grid.load(os.path.join(directory, 'island.grid'))
+    results.append(
+        Pirate(loaded).hill_climbing_search(orders, (14, 0)) == [(14, 0), (13, 0), (12, 0), (12, 1)]
+        and loaded.terrains == Grid.from_regions(island).terrains and loaded.region(3, 4) == Pirate(island).cell((3, 4))
+    )
+    del loaded
+
+# Random restarts in lockstep
+crew = Crew(island)
+best, summaries = crew.search('hill_climbing_search', orders, starts=[(14, 0), (0, 14)], stop_on_treasure=False)
+results.append(
+    [summary['end'] for summary in summaries] == [(12, 1), pirate.hill_climbing_search(orders, (0, 14))[-1]]
+    and crew.search('stochastic_hill_climbing_search', orders, walkers=8, seed=7) == crew.search('stochastic_hill_climbing_search', orders, walkers=8, seed=7)
+)
+
+# Parallel tempering and population annealing in lockstep
+tempered, ladder = crew.parallel_tempering_search(Orders(), Whimsy(1000, 0.005), starts=[(14, 0)] * 4, seed=3)
+annealed, population = crew.population_annealing_search(Orders(), Whimsy(1000, 0.005), starts=[(14, 0)] * 16, seed=3)
+results.append(
+    ladder['treasure'] and population['treasure'] and tempered[-1] == annealed[-1] == (2, 7)
+    and all(b in pirate.neighbors(*a) for path in (tempered, annealed) for a, b in zip(path, path[1:]))
+    and crew.population_annealing_search(Orders(), Whimsy(1000, 0.005), starts=[(14, 0)] * 16, seed=3) == (annealed, population)
+)
+
+# Annealing walkers keep to the steps and seconds they are given, in lockstep and in a worker
+_, brief = crew.search('boltzmann_simulated_annealing_search', Orders(), Whimsy(), walkers=8, seed=3, stop_on_treasure=False, max_steps=20)
+_, frozen = crew.search('boltzmann_simulated_annealing_search', Orders(), Whimsy(), walkers=8, seed=3, max_seconds=0)
+board(island)
+random.seed(11)
+alone = pirate.boltzmann_simulated_annealing_search(Orders(), Whimsy(), (14, 14), 20)
+results.append(
+    all(summary['steps'] <= 20 for summary in brief) and max(summary['steps'] for summary in brief) == 20
+    and all(summary['moves'] == 0 for summary in frozen)
+    and walk((0, 'boltzmann_simulated_annealing_search', Orders(), Whimsy(), (14, 14), 11, 20, None))[1] == alone
+)
+
+# Hill climbing from the basin index
+indexed = Pirate(island)
+peak = indexed.index_basins(orders).peak((14, 0))
+results.append(
+    indexed.hill_climbing_search(orders, (14, 0)) == [(14, 0), (13, 0), (12, 0), (12, 1)] and peak == (12, 1)
+)
+
+# Simulated annealing with a schedule, a budget and its own random numbers
+expected = [(14, 0), (13, 0), (12, 0), (12, 1), (12, 2), (12, 1)]
+random.seed(5678)
+default = pirate.boltzmann_simulated_annealing_search(orders, whimsy, (14, 0))
+injected = pirate.boltzmann_simulated_annealing_search(orders, whimsy, (14, 0), rng=random.Random(5678))
+patient = Recorder()
+Pirate(island, probe=patient).boltzmann_simulated_annealing_search(Orders(), LinearWhimsy(10.0, 200), (14, 14), patience=20, rng=random.Random(5678))
+reheated = pirate.boltzmann_simulated_annealing_search(Orders(), ReheatingWhimsy(), (14, 14), rng=np.random.default_rng(5678))
+results.append(
+    default == expected and injected == expected and patient.records[0]['steps'] < 200
+    and all(b in pirate.neighbors(*a) for a, b in zip(reheated, reheated[1:]))
+)
+
+# A schedule only computes the temperatures a search reaches, however many steps it is allowed
+lazy = Whimsy()
+pirate.boltzmann_simulated_annealing_search(Orders(), lazy, (14, 14), max_steps=10 ** 9, patience=20, rng=random.Random(5678))
+results.append(
+    0 < len(lazy.computed[1]) <= CHUNK and list(lazy.table(3 * CHUNK)) == [lazy(t) for t in range(3 * CHUNK)]
+)
+
+# Temperatures follow the schedule's settings when they change, and schedules with an __init__ of their own still anneal
+class SteadyWhimsy(Whimsy):
+    def __init__(self, T: float) -> None:
+        self.T = T
+
+    def __call__(self, step: int) -> float:
+        return self.T
+
+lazy.T_init = 1000
+random.seed(5678)
+steady = pirate.boltzmann_simulated_annealing_search(Orders(), SteadyWhimsy(5.0), (14, 14), max_steps=50)
+results.append(lazy.table(10)[0] == lazy(0) == 1000 and len(steady) > 1)
+
+# Streamed simulated annealing, one step at a time
+random.seed(5678)
+events = list(pirate.stream('boltzmann_simulated_annealing_search', orders, (14, 0), whimsy))
+results.append(
+    [(14, 0)] + [event['cell'] for event in events if event['moved']] == expected and events[-1]['done']
+)
+
+# Cheapest path to the treasure over the whole island
+course = Course(island, Orders(), tolls={'desert': 2})
+cheapest = course.uniform_cost_search((14, 0))
+guided = course.a_star_search((14, 0))
+results.append(
+    cheapest[1] == guided[1] == 145 and guided[2] < cheapest[2] and guided[0][-1] == (2, 7)
+    and course.beam_search((14, 0), 10)[1] >= cheapest[1]
+)
+
 # Get search path
 random.seed(0)
 search = pirate.boltzmann_simulated_annealing_search(Orders(), Whimsy(), (14, 14))
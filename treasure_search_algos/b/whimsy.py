@@ -1,6 +1,33 @@
 import math
+from collections.abc import Sequence
+from typing import List, Optional, Tuple
+
+CHUNK = 1024 # temperatures computed at a time, as a search reaches them
 
 class Whimsy:
+    def __init__(self, T_init: float = 10.0, alpha: float = 0.01) -> None:
+        '''
+        Initialize an exponential cooling schedule, T = T_init * e^(-alpha * t)
+
+        Parameters:
+            T_init (float): the initial temperature
+            alpha (float): the cooling factor
+        '''
+
+        self.T_init = T_init
+        self.alpha = alpha
+        self.computed: Optional[Tuple[tuple, List[float]]] = None # the settings, and the temperatures of the first timesteps computed with them
+
+    def __eq__(self, other: object) -> bool:
+        # schedules of the same kind with the same settings give the same temperatures
+        return type(other) is type(self) and self.settings() == other.settings()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.settings()))
+
+    def settings(self) -> tuple:
+        return tuple(value for name, value in sorted(vars(self).items()) if name != 'computed')
+
     def __call__(self, step: int) -> float:
         '''
         Return the temperature (T) corresponding to the provided timestep (t).
@@ -12,12 +39,160 @@ class Whimsy:
         Returns:
             float: The temperature of the given timestamp.
         '''
-        
+
         # initial temperature
-        T_init = 10.0
-        
+        T_init = self.T_init
+
         # alpha represents cooling factor
-        alpha = 0.01
+        alpha = self.alpha
 
         # calculating final temperature
-        return T_init * math.exp(-alpha * step)
\ No newline at end of file
+        return T_init * math.exp(-alpha * step)
+
+    def table(self, steps: int) -> Optional['Temperatures']:
+        '''
+        Return the temperature of every timestep up to steps. Nothing is computed up front: the temperatures are computed
+        a chunk at a time as they are first read, and kept for every later table, so a search that stops early only pays for the steps it took.
+        The values are exactly what calling the schedule gives.
+
+        Parameters:
+            steps (int): the number of timesteps
+
+        Returns:
+            Temperatures: the temperature of every timestep, or None if the schedule can't be computed ahead of time
+        '''
+
+        # a schedule whose __init__ doesn't call this one has nowhere to keep temperatures, it is called for every step instead
+        if not hasattr(self, 'computed'):
+            return Temperatures(self, steps, None)
+
+        # temperatures computed before the settings changed are no use any more
+        settings = self.settings()
+        if self.computed is None or self.computed[0] != settings:
+            self.computed = (settings, [])
+        return Temperatures(self, steps, self.computed[1])
+
+class Temperatures(Sequence):
+    def __init__(self, whimsy: Whimsy, steps: int, computed: Optional[List[float]]) -> None:
+        '''
+        Initialize the temperatures of a schedule up to a number of steps, read like a list
+
+        Parameters:
+            whimsy (Whimsy): the schedule
+            steps (int): the number of timesteps
+            computed (List[float]): the temperatures of the first timesteps, extended as later ones are read. None calls the schedule every time.
+        '''
+
+        self.whimsy = whimsy
+        self.steps = steps
+        self.computed = computed
+
+    def __len__(self) -> int:
+        return self.steps
+
+    def __getitem__(self, step: int) -> float:
+        if not 0 <= step < self.steps:
+            raise IndexError('timestep out of range')
+
+        computed = self.computed
+        if computed is None:
+            return self.whimsy(step)
+        if step >= len(computed):
+            # the next chunk, or up to the step asked for, never past the last step
+            end = min(max(step + 1, len(computed) + CHUNK), self.steps)
+            computed.extend([self.whimsy(t) for t in range(len(computed), end)])
+
+        return computed[step]
+
+class LinearWhimsy(Whimsy):
+    def __init__(self, T_init: float = 10.0, steps: int = 1000) -> None:
+        '''
+        Initialize a linear cooling schedule, from T_init at the first step down to 0 after the given number of steps
+
+        Parameters:
+            T_init (float): the initial temperature
+            steps (int): the timestep at which the temperature reaches 0
+        '''
+
+        super().__init__(T_init)
+        self.steps = steps
+
+    def __call__(self, step: int) -> float:
+        return max(0.0, self.T_init * (1 - step / self.steps))
+
+class LogarithmicWhimsy(Whimsy):
+    def __init__(self, T_init: float = 10.0) -> None:
+        '''
+        Initialize a logarithmic cooling schedule, T = T_init * log(2) / log(t + 2), which cools slowly enough
+        for annealing to settle on the best region given unlimited time, at the price of staying warm for very long
+
+        Parameters:
+            T_init (float): the initial temperature
+        '''
+
+        super().__init__(T_init)
+
+    def __call__(self, step: int) -> float:
+        return self.T_init * math.log(2) / math.log(step + 2)
+
+class ReheatingWhimsy(Whimsy):
+    def __init__(self, schedule: Optional[Whimsy] = None, window: int = 50, target: float = 0.05, factor: float = 2.0) -> None:
+        '''
+        Initialize an adaptive schedule that follows another schedule, but reheats when the search stops moving.
+        After every window of steps, the temperature is multiplied by factor if fewer than target of the moves were accepted,
+        and divided by it again (down to the plain schedule) once enough are.
+
+        Parameters:
+            schedule (Whimsy): the schedule to follow, an exponential Whimsy by default
+            window (int): the number of steps between adjustments
+            target (float): the smallest acceptance rate that doesn't reheat
+            factor (float): how much one reheat raises the temperature
+        '''
+
+        self.schedule = schedule if schedule is not None else Whimsy()
+        self.window = window
+        self.target = target
+        self.factor = factor
+        self.computed = None
+        self.reset()
+
+    def settings(self) -> tuple:
+        return (self.schedule, self.window, self.target, self.factor)
+
+    def reset(self) -> None:
+        '''
+        Start over at the plain schedule, called at the start of every search
+
+        Parameters:
+            self
+        '''
+
+        self.heat = 1.0
+        self.moves = 0
+        self.accepted = 0
+
+    def update(self, accepted: bool) -> None:
+        '''
+        Record whether a move was accepted, and adjust the heat at the end of every window
+
+        Parameters:
+            self
+            accepted (bool): whether the search took the move it considered
+        '''
+
+        self.moves += 1
+        self.accepted += accepted
+
+        if self.moves == self.window:
+            if self.accepted < self.target * self.window:
+                self.heat *= self.factor
+            else:
+                self.heat = max(1.0, self.heat / self.factor)
+            self.moves = self.accepted = 0
+
+    def __call__(self, step: int) -> float:
+        return self.heat * self.schedule(step)
+
+    def table(self, steps: int) -> Optional[Temperatures]:
+        # the temperature depends on how the search went, so it can't be computed ahead of time
+        return None